@@ -5,9 +5,43 @@ Main application file with all API endpoints
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import json
 import os
-from matching_logic import run_matching_algorithm
+import time
+from matching_logic import (
+    DEFAULT_TOP_K,
+    execute_matching,
+    run_weight_sweep,
+    summarize_scores
+)
+from incremental_matching import run_incremental_matching
+from verification import plan_bulk_verification, reassignment_updates
+from suggestions import SuggestionService
+from storage import create_storage
+from cache import DataCache
+from jobs import MatchingJobManager
+from ingestion import iter_csv_records
+from result_cache import DEFAULT_MAX_BYTES, MatchResultCache
+from run_history import RunHistory, input_hash
+from stats_tracker import StatsTracker
+from response_encoding import ResponseEncoding, json_stream_response
+from metrics import (
+    REGISTRY,
+    InstrumentedStorage,
+    RequestMetrics,
+    SlowRequestProfiler,
+    cache_collector,
+    observe_matching_phases
+)
+from pagination import (
+    PaginationError,
+    make_etag,
+    encode_cursor,
+    decode_cursor,
+    parse_limit,
+    parse_fields,
+    project,
+    paginate
+)
 
 app = Flask(__name__)
 # Enable CORS for React frontend with explicit configuration
@@ -30,29 +64,87 @@ CORS(app, resources={
     }
 })
 
-# Data storage paths
+# Data storage (SQLite by default, see storage.py); writes also update the
+# dashboard counters served by /api/stats
 DATA_DIR = 'data'
-MENTORS_FILE = os.path.join(DATA_DIR, 'mentors.json')
-MENTEES_FILE = os.path.join(DATA_DIR, 'mentees.json')
-MATCHES_FILE = os.path.join(DATA_DIR, 'matches.json')
+storage = StatsTracker(InstrumentedStorage(create_storage(DATA_DIR)))
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
+# Parsed data is served from memory until the storage reports a change
+cache = DataCache(storage)
 
-# Initialize empty data files if they don't exist
-def init_data_files():
-    """Initialize JSON data files if they don't exist"""
-    if not os.path.exists(MENTORS_FILE):
-        with open(MENTORS_FILE, 'w') as f:
-            json.dump([], f)
-    if not os.path.exists(MENTEES_FILE):
-        with open(MENTEES_FILE, 'w') as f:
-            json.dump([], f)
-    if not os.path.exists(MATCHES_FILE):
-        with open(MATCHES_FILE, 'w') as f:
-            json.dump([], f)
+# Request metrics for /api/metrics; slow-request profiling is off unless
+# PROFILE_SLOW_REQUESTS is set or enabled through /api/metrics/profiler
+profiler = SlowRequestProfiler(threshold_ms=int(os.environ.get('PROFILE_SLOW_REQUESTS_MS', 1000)))
+if os.environ.get('PROFILE_SLOW_REQUESTS'):
+    profiler.configure(True)
+RequestMetrics(profiler).init_app(app)
+REGISTRY.add_collector(cache_collector(cache))
 
-init_data_files()
+# Fast JSON, gzip/brotli compression and opt-in MessagePack for responses;
+# registered after the metrics hooks so response sizes are the sent sizes
+ResponseEncoding().init_app(app)
+
+# Weights used when a matching request doesn't send its own
+DEFAULT_MATCHING_WEIGHTS = {
+    'discipline': 0.5,  # Higher weight for career/field alignment
+    'location': 0.3,    # Moderate weight (can work remotely)
+    'mode': 0.2         # Lower weight (most flexible)
+}
+
+# Largest number of weight vectors accepted by /api/what-if
+MAX_WEIGHT_SWEEP = 100
+
+# Largest number of operations accepted by /api/verify-matches
+MAX_BULK_OPERATIONS = 10000
+
+# Processes used to score candidates when a request doesn't set 'workers'
+MATCHING_WORKERS = int(os.environ.get('MATCHING_WORKERS', 1))
+
+# Finished matching results on disk, so identical reruns skip the matcher
+# (MATCH_RESULT_CACHE_MB=0 turns it off)
+result_cache = MatchResultCache(
+    os.environ.get('MATCH_RESULT_CACHE_DIR', os.path.join(DATA_DIR, 'result_cache')),
+    max_bytes=int(float(os.environ.get('MATCH_RESULT_CACHE_MB', DEFAULT_MAX_BYTES / 2 ** 20)) * 2 ** 20)
+)
+REGISTRY.add_collector(cache_collector(result_cache, 'result_cache', 'Matching result cache'))
+
+# Ranked mentors per mentee for /api/suggestions, filtered by the live
+# load counters of the storage wrapper
+suggestion_service = SuggestionService(cache, storage)
+
+# Largest number of suggestions returned by /api/suggestions
+MAX_SUGGESTIONS = 50
+
+# Every matching run and rematch is kept as a version for /api/runs
+run_history = RunHistory(os.environ.get('RUN_HISTORY_DIR', os.path.join(DATA_DIR, 'run_history')))
+
+# Background matching jobs started with { 'async': true }
+job_manager = MatchingJobManager(
+    storage, cache, max_workers=int(os.environ.get('MATCHING_JOB_WORKERS', 2)),
+    result_cache=result_cache, run_history=run_history
+)
+
+
+def not_modified(etag):
+    """Empty 304 response for a conditional GET whose ETag still matches"""
+    response = app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def conditional_etag(collections):
+    """
+    Compute the ETag for the current request from the data versions of the
+    collections it reads
+
+    Returns:
+        tuple: (etag, versions, is_fresh) where is_fresh means the client's
+            If-None-Match already has this ETag
+    """
+    all_versions = storage.data_versions()
+    versions = {collection: all_versions[collection] for collection in collections}
+    etag = make_etag(versions, request.args.items(multi=True))
+    return etag, versions, request.if_none_match.contains_weak(etag)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -75,43 +167,47 @@ def upload_data():
         if data_type not in ['mentor', 'mentee']:
             return jsonify({'error': 'Invalid type. Must be "mentor" or "mentee"'}), 400
         
-        # Determine target file
-        target_file = MENTORS_FILE if data_type == 'mentor' else MENTEES_FILE
-        
-        # Read existing data
-        if os.path.exists(target_file):
-            with open(target_file, 'r') as f:
-                existing_data = json.load(f)
-        else:
-            existing_data = []
-        
-        # Add new records (with unique IDs)
-        max_id = max([r.get('id', 0) for r in existing_data], default=0)
-        for i, record in enumerate(records):
-            if 'id' not in record:
-                record['id'] = max_id + i + 1
-        
-        # Merge with existing data (update if ID exists, append if new)
-        existing_ids = {r['id'] for r in existing_data}
-        for record in records:
-            if record['id'] in existing_ids:
-                # Update existing record
-                for i, existing in enumerate(existing_data):
-                    if existing['id'] == record['id']:
-                        existing_data[i] = record
-                        break
-            else:
-                # Add new record
-                existing_data.append(record)
-        
-        # Save to file
-        with open(target_file, 'w') as f:
-            json.dump(existing_data, f, indent=2)
+        # Add new records (with unique IDs), updating any with an existing ID
+        total = storage.upsert_records(data_type, records)
         
         return jsonify({
             'success': True,
             'message': f'Successfully uploaded {len(records)} {data_type}(s)',
-            'total': len(existing_data)
+            'total': total
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload-csv', methods=['POST'])
+def upload_csv():
+    """
+    Upload mentor/mentee data from a Google Form CSV export
+    Expects: ?type=mentor or mentee, with the CSV as a multipart 'file' field
+    or as the raw request body (Content-Type: text/csv)
+    """
+    try:
+        data_type = request.args.get('type') or request.form.get('type')
+        
+        if data_type not in ['mentor', 'mentee']:
+            return jsonify({'error': 'Invalid type. Must be "mentor" or "mentee"'}), 400
+        
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        
+        # Rows are parsed, normalized and upserted one at a time
+        row_stats = {}
+        uploaded, total = storage.upsert_records_stream(
+            data_type, iter_csv_records(stream, data_type, row_stats)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': f'Successfully uploaded {uploaded} {data_type}(s)',
+            'uploaded': uploaded,
+            'skipped': row_stats['skipped'],
+            'total': total
         })
     
     except Exception as e:
@@ -120,22 +216,54 @@ def upload_data():
 
 @app.route('/api/get-data', methods=['GET'])
 def get_data():
-    """Get all mentors or mentees"""
+    """
+    Get mentors or mentees
+    Optional query parameters:
+        limit, cursor: page size and the next_cursor from the previous page
+        status, discipline: filters (discipline is a case-insensitive substring)
+        fields, exclude: comma-separated fields to keep or drop
+    Supports If-None-Match; unchanged data returns 304.
+    """
     try:
         data_type = request.args.get('type')  # 'mentor' or 'mentee'
         
         if data_type not in ['mentor', 'mentee']:
             return jsonify({'error': 'Invalid type. Must be "mentor" or "mentee"'}), 400
         
-        target_file = MENTORS_FILE if data_type == 'mentor' else MENTEES_FILE
-        
-        if os.path.exists(target_file):
-            with open(target_file, 'r') as f:
-                data = json.load(f)
-        else:
-            data = []
-        
-        return jsonify({'success': True, 'data': data})
+        etag, versions, is_fresh = conditional_etag([data_type])
+        if is_fresh:
+            return not_modified(etag)
+        
+        limit = parse_limit(request.args.get('limit'))
+        start = decode_cursor(request.args.get('cursor'), versions)
+        include, exclude = parse_fields(request.args)
+        status = request.args.get('status')
+        discipline = (request.args.get('discipline') or '').lower()
+        
+        def keep(record):
+            if status and record.get('status') != status:
+                return False
+            if discipline and discipline not in str(record.get('discipline') or '').lower():
+                return False
+            return True
+        
+        records = cache.get_records(data_type)
+        fields = {'success': True}
+        # Unfiltered full listings are streamed straight from the record store
+        if status or discipline or limit is not None or start:
+            records, next_position = paginate(records, keep, start, limit)
+            if limit is not None:
+                fields['next_cursor'] = (
+                    encode_cursor(next_position, versions) if next_position is not None else None
+                )
+        
+        response = json_stream_response(fields, 'data', records,
+                                        lambda r: project(r, include, exclude))
+        response.set_etag(etag, weak=True)
+        return response
+    
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), e.status
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -153,28 +281,10 @@ def update_record():
         if data_type not in ['mentor', 'mentee']:
             return jsonify({'error': 'Invalid type'}), 400
         
-        target_file = MENTORS_FILE if data_type == 'mentor' else MENTEES_FILE
-        
-        # Read existing data
-        with open(target_file, 'r') as f:
-            records = json.load(f)
-        
         # Find and update record
-        found = False
-        for i, record in enumerate(records):
-            if record.get('id') == record_id:
-                updated_record['id'] = record_id  # Preserve ID
-                records[i] = updated_record
-                found = True
-                break
-        
-        if not found:
+        if not storage.update_record(data_type, record_id, updated_record):
             return jsonify({'error': 'Record not found'}), 404
         
-        # Save to file
-        with open(target_file, 'w') as f:
-            json.dump(records, f, indent=2)
-        
         return jsonify({'success': True, 'message': 'Record updated'})
     
     except Exception as e:
@@ -191,43 +301,8 @@ def delete_record():
         if data_type not in ['mentor', 'mentee']:
             return jsonify({'error': 'Invalid type'}), 400
         
-        target_file = MENTORS_FILE if data_type == 'mentor' else MENTEES_FILE
-        
-        # Read existing data
-        with open(target_file, 'r') as f:
-            records = json.load(f)
-        
-        # Remove record
-        records = [r for r in records if r.get('id') != record_id]
-        
-        # Save to file
-        with open(target_file, 'w') as f:
-            json.dump(records, f, indent=2)
-        
-        # Clean up matches that reference the deleted record
-        if os.path.exists(MATCHES_FILE):
-            with open(MATCHES_FILE, 'r') as f:
-                match_data = json.load(f)
-            
-            matches = match_data.get('matches', [])
-            
-            # Remove matches that reference the deleted mentor or mentee
-            if data_type == 'mentor':
-                matches = [m for m in matches if m.get('mentor_id') != record_id]
-            else:  # mentee
-                matches = [m for m in matches if m.get('mentee_id') != record_id]
-            
-            # Also clean up unmatched_mentees if a mentee was deleted
-            if data_type == 'mentee':
-                unmatched_mentees = match_data.get('unmatched_mentees', [])
-                unmatched_mentees = [m for m in unmatched_mentees if m.get('id') != record_id]
-                match_data['unmatched_mentees'] = unmatched_mentees
-            
-            match_data['matches'] = matches
-            
-            # Save updated matches
-            with open(MATCHES_FILE, 'w') as f:
-                json.dump(match_data, f, indent=2)
+        # Remove record and clean up matches that reference it
+        storage.delete_record(data_type, record_id)
         
         return jsonify({'success': True, 'message': 'Record deleted and related matches cleaned up'})
     
@@ -239,81 +314,341 @@ def delete_record():
 def run_matching():
     """
     Run the matching algorithm with custom weights
-    Expects: { 'weights': { 'discipline': 0.4, 'location': 0.3, 'mode': 0.3 } }
+    Expects: { 'weights': { 'discipline': 0.4, 'location': 0.3, 'mode': 0.3 },
+               'algorithm': 'greedy' or 'optimal' (optional, default 'greedy'),
+               'top_k': int (optional, default 4: best match plus 3 alternatives),
+               'async': bool (optional, return a job_id immediately and run in the background),
+               'workers': int (optional, processes used to score candidates; default MATCHING_WORKERS),
+               'use_cache': bool (optional, default true; false always runs the matcher) }
     """
     try:
-        weights = request.json.get('weights', {
-            'discipline': 0.5,  # Higher weight for career/field alignment
-            'location': 0.3,    # Moderate weight (can work remotely)
-            'mode': 0.2         # Lower weight (most flexible)
-        })
+        weights = request.json.get('weights', DEFAULT_MATCHING_WEIGHTS)
+        algorithm = request.json.get('algorithm', 'greedy')
+        top_k = request.json.get('top_k', DEFAULT_TOP_K)
+        workers = request.json.get('workers', MATCHING_WORKERS)
+        use_cache = request.json.get('use_cache', True)
+        
+        if algorithm not in ['greedy', 'optimal']:
+            return jsonify({'error': 'Invalid algorithm. Must be "greedy" or "optimal"'}), 400
+        
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({'error': 'Invalid top_k. Must be a positive integer'}), 400
+        
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            return jsonify({'error': 'Invalid workers. Must be a positive integer'}), 400
+        workers = min(workers, os.cpu_count() or 1)
+        
+        if not isinstance(use_cache, bool):
+            return jsonify({'error': 'Invalid use_cache. Must be true or false'}), 400
+        use_cache = use_cache and result_cache.enabled
+        
+        # Run in the background and let the client poll for progress
+        if request.json.get('async'):
+            job, coalesced = job_manager.submit(weights, algorithm, top_k, workers, use_cache)
+            return jsonify({'success': True, 'coalesced': coalesced, **job}), 202
+        
+        # Load mentors and mentees, and look up an earlier result for them
+        began = time.perf_counter()
+        key = cached = None
+        mentors, mentor_hash = cache.get_records_and_hash('mentor')
+        mentees, mentee_hash = cache.get_records_and_hash('mentee')
+        if use_cache:
+            key = result_cache.key(mentor_hash, mentee_hash, weights, algorithm, top_k)
+            cached = result_cache.get(key)
+        phases = {'load': time.perf_counter() - began}
         
-        # Load mentors and mentees
-        with open(MENTORS_FILE, 'r') as f:
-            mentors = json.load(f)
+        # Run matching algorithm
+        parallel_stats = {}
+        if cached is not None:
+            match_data, comparison = cached
+        else:
+            match_data, comparison = execute_matching(
+                mentors, mentees, weights, algorithm, top_k, workers=workers, stats=parallel_stats,
+                phases=phases
+            )
+            if key is not None:
+                result_cache.put(key, match_data, comparison)
+        matches = match_data['matches']
+        unmatched_mentees = match_data['unmatched_mentees']
+        
+        # Save matches, unless the saved matches already are this result
+        began = time.perf_counter()
+        if cached is None or not result_cache.is_saved(key, storage.data_versions()['matches']):
+            storage.save_match_data(match_data)
+            if key is not None:
+                result_cache.mark_saved(key, storage.data_versions()['matches'])
+        phases['persist'] = time.perf_counter() - began
+        if cached is None:
+            observe_matching_phases(algorithm, phases)
+        
+        run = run_history.record(match_data, input_hash(mentor_hash, mentee_hash), weights,
+                                 algorithm, top_k, 'run-matching')
+        
+        response = {
+            'success': True,
+            'run_id': run['id'],
+            'cached': cached is not None,
+            'algorithm': algorithm,
+            'unmatched_mentees': unmatched_mentees,
+            'total_matches': len(matches),
+            'total_unmatched': len(unmatched_mentees),
+            **summarize_scores(matches)
+        }
+        if comparison:
+            response['comparison'] = comparison
+        if parallel_stats:
+            response['parallel'] = parallel_stats
+        
+        return json_stream_response(response, 'matches', matches)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/what-if', methods=['POST'])
+def what_if():
+    """
+    Compare matching results for several weight vectors without saving matches
+    Expects: { 'weights': [ { 'discipline': 0.5, 'location': 0.3, 'mode': 0.2 }, ... ],
+               'algorithm': 'greedy' or 'optimal' (optional, default 'greedy') }
+    """
+    try:
+        weight_sets = request.json.get('weights')
+        algorithm = request.json.get('algorithm', 'greedy')
         
-        with open(MENTEES_FILE, 'r') as f:
-            mentees = json.load(f)
+        if algorithm not in ['greedy', 'optimal']:
+            return jsonify({'error': 'Invalid algorithm. Must be "greedy" or "optimal"'}), 400
         
-        # Run matching algorithm
-        matches, unmatched_mentees = run_matching_algorithm(mentors, mentees, weights)
+        if (not isinstance(weight_sets, list) or not weight_sets or
+                not all(isinstance(weights, dict) for weights in weight_sets)):
+            return jsonify({'error': 'weights must be a non-empty list of weight objects'}), 400
+        
+        if len(weight_sets) > MAX_WEIGHT_SWEEP:
+            return jsonify({'error': f'At most {MAX_WEIGHT_SWEEP} weight vectors per request'}), 400
         
-        # Save matches
-        with open(MATCHES_FILE, 'w') as f:
-            json.dump({
-                'matches': matches,
-                'unmatched_mentees': unmatched_mentees,
-                'weights': weights
-            }, f, indent=2)
+        mentors = cache.get_records('mentor')
+        mentees = cache.get_records('mentee')
+        
+        results = run_weight_sweep(mentors, mentees, weight_sets, algorithm)
+        
+        return jsonify({'success': True, 'algorithm': algorithm, 'results': results})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/rematch', methods=['POST'])
+def rematch():
+    """
+    Update the saved matches after mentors or mentees were added, edited or deleted
+    Only mentees whose match is missing or no longer valid are re-placed;
+    verified matches are preserved.
+    Expects: { 'weights': {...} (optional, default: weights of the last run),
+               'top_k': int (optional, default 4) }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        match_data = cache.get_match_data()
+        weights = data.get('weights') or match_data.get('weights') or DEFAULT_MATCHING_WEIGHTS
+        top_k = data.get('top_k', DEFAULT_TOP_K)
+        
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({'error': 'Invalid top_k. Must be a positive integer'}), 400
+        
+        mentors, mentor_hash = cache.get_records_and_hash('mentor')
+        mentees, mentee_hash = cache.get_records_and_hash('mentee')
+        
+        match_data, diff = run_incremental_matching(mentors, mentees, match_data, weights, top_k)
+        storage.save_match_data(match_data)
+        run = run_history.record(match_data, input_hash(mentor_hash, mentee_hash), weights,
+                                 'incremental', top_k, 'rematch')
         
         return jsonify({
             'success': True,
-            'matches': matches,
-            'unmatched_mentees': unmatched_mentees,
-            'total_matches': len(matches),
-            'total_unmatched': len(unmatched_mentees)
+            'run_id': run['id'],
+            'total_matches': len(match_data['matches']),
+            'total_unmatched': len(match_data['unmatched_mentees']),
+            **summarize_scores(match_data['matches']),
+            'diff': diff
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/get-matches', methods=['GET'])
-def get_matches():
-    """Get all matches (pending and verified), filtering out invalid references"""
+@app.route('/api/matching-jobs/<job_id>', methods=['GET'])
+def get_matching_job(job_id):
+    """Get the status, progress and ETA of a background matching job"""
     try:
-        # Load mentors and mentees to validate match references
-        with open(MENTORS_FILE, 'r') as f:
-            mentors = json.load(f)
-        with open(MENTEES_FILE, 'r') as f:
-            mentees = json.load(f)
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
         
-        mentor_ids = {m.get('id') for m in mentors}
-        mentee_ids = {m.get('id') for m in mentees}
+        return jsonify({'success': True, **job})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/runs', methods=['GET'])
+def list_runs():
+    """
+    List stored matching runs, newest first
+    Optional query parameters:
+        limit: number of runs to return
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        runs = run_history.list_versions()[::-1]
         
-        if os.path.exists(MATCHES_FILE):
-            with open(MATCHES_FILE, 'r') as f:
-                data = json.load(f)
-        else:
-            data = {'matches': [], 'unmatched_mentees': [], 'weights': {}}
+        return jsonify({'success': True, 'total': len(runs), 'runs': runs[:limit]})
+    
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/runs/<int:run_id>', methods=['GET'])
+def get_run(run_id):
+    """
+    Get a stored matching run
+    Optional query parameters:
+        include=matches: also rebuild and return its matches and unmatched mentees
+    """
+    try:
+        run = run_history.get(run_id)
+        if run is None:
+            return jsonify({'error': 'Run not found'}), 404
         
-        # Filter out matches with invalid mentor or mentee references
-        valid_matches = []
-        for match in data.get('matches', []):
-            if (match.get('mentor_id') in mentor_ids and 
-                match.get('mentee_id') in mentee_ids):
-                valid_matches.append(match)
+        response = {'success': True, 'run': run}
+        if request.args.get('include') == 'matches':
+            match_data = run_history.load(run_id)
+            response['matches'] = match_data['matches']
+            response['unmatched_mentees'] = match_data['unmatched_mentees']
+        
+        return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/runs/diff', methods=['GET'])
+def diff_runs():
+    """
+    Compare two matching runs: which mentees changed mentor and how their scores moved
+    Query parameters:
+        from: earlier run ID (default: the parent of 'to')
+        to: later run ID (default: the latest run)
+        limit: number of changes to return, largest score movement first
+    """
+    try:
+        to_id = request.args.get('to', type=int)
+        from_id = request.args.get('from', type=int)
+        limit = parse_limit(request.args.get('limit'))
+        
+        if to_id is None:
+            runs = run_history.list_versions()
+            if not runs:
+                return jsonify({'error': 'No matching runs stored yet'}), 404
+            to_id = runs[-1]['id']
+        if from_id is None:
+            run = run_history.get(to_id)
+            if run is None or run['parent_id'] is None:
+                return jsonify({'error': 'Run has no earlier run to compare with; pass from'}), 400
+            from_id = run['parent_id']
+        
+        diff = run_history.diff(from_id, to_id)
+        if diff is None:
+            return jsonify({'error': 'Run not found'}), 404
+        
+        diff['total_changes'] = len(diff['changes'])
+        diff['changes'] = diff['changes'][:limit]
+        return jsonify({'success': True, **diff})
+    
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/get-matches', methods=['GET'])
+def get_matches():
+    """
+    Get all matches (pending and verified), filtering out invalid references
+    Optional query parameters:
+        limit, cursor: page size and the next_cursor from the previous page
+        status, mentor_id, mentee_id, min_score: filters
+        discipline: case-insensitive substring of the mentor's or mentee's discipline
+        fields, exclude: comma-separated match fields to keep or drop
+            (e.g. exclude=top_alternatives)
+    Supports If-None-Match; unchanged data returns 304.
+    """
+    try:
+        etag, versions, is_fresh = conditional_etag(['mentor', 'mentee', 'matches'])
+        if is_fresh:
+            return not_modified(etag)
+        
+        limit = parse_limit(request.args.get('limit'))
+        start = decode_cursor(request.args.get('cursor'), versions)
+        include, exclude = parse_fields(request.args)
+        status = request.args.get('status')
+        mentor_id = request.args.get('mentor_id', type=int)
+        mentee_id = request.args.get('mentee_id', type=int)
+        min_score = request.args.get('min_score', type=float)
+        discipline = (request.args.get('discipline') or '').lower()
+        
+        # Load mentors and mentees to validate match references
+        mentors_by_id = cache.get_records_by_id('mentor')
+        mentees_by_id = cache.get_records_by_id('mentee')
+        
+        data = cache.get_match_data()
+        
+        def keep(match):
+            # Filter out matches with invalid mentor or mentee references
+            if (match.get('mentor_id') not in mentors_by_id or
+                    match.get('mentee_id') not in mentees_by_id):
+                return False
+            if status and match.get('status') != status:
+                return False
+            if mentor_id is not None and match.get('mentor_id') != mentor_id:
+                return False
+            if mentee_id is not None and match.get('mentee_id') != mentee_id:
+                return False
+            if min_score is not None and match.get('score', 0) < min_score:
+                return False
+            if discipline:
+                mentor = mentors_by_id[match['mentor_id']]
+                mentee = mentees_by_id[match['mentee_id']]
+                if (discipline not in str(mentor.get('discipline') or '').lower() and
+                        discipline not in str(mentee.get('discipline') or '').lower()):
+                    return False
+            return True
+        
+        valid_matches, next_position = paginate(data.get('matches', []), keep, start, limit)
         
         # Filter out unmatched mentees that no longer exist
         valid_unmatched = [
             m for m in data.get('unmatched_mentees', [])
-            if m.get('id') in mentee_ids
+            if m.get('id') in mentees_by_id
         ]
         
-        data['matches'] = valid_matches
+        data.pop('matches', None)
         data['unmatched_mentees'] = valid_unmatched
-        
-        return jsonify({'success': True, **data})
+        if limit is not None:
+            data['next_cursor'] = (
+                encode_cursor(next_position, versions) if next_position is not None else None
+            )
+        
+        response = json_stream_response({'success': True, **data}, 'matches', valid_matches,
+                                        lambda m: project(m, include, exclude))
+        response.set_etag(etag, weak=True)
+        return response
+    
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), e.status
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -323,12 +658,7 @@ def get_matches():
 def clear_matches():
     """Clear all matches"""
     try:
-        with open(MATCHES_FILE, 'w') as f:
-            json.dump({
-                'matches': [],
-                'unmatched_mentees': [],
-                'weights': {}
-            }, f, indent=2)
+        storage.clear_matches()
         
         return jsonify({'success': True, 'message': 'All matches cleared'})
     
@@ -346,33 +676,8 @@ def clear_all():
         if data_type not in ['mentor', 'mentee']:
             return jsonify({'error': 'Invalid type. Must be "mentor" or "mentee"'}), 400
         
-        target_file = MENTORS_FILE if data_type == 'mentor' else MENTEES_FILE
-        
-        # Clear the file
-        with open(target_file, 'w') as f:
-            json.dump([], f, indent=2)
-        
-        # Also clear matches that reference the deleted records
-        if os.path.exists(MATCHES_FILE):
-            with open(MATCHES_FILE, 'r') as f:
-                match_data = json.load(f)
-            
-            matches = match_data.get('matches', [])
-            unmatched_mentees = match_data.get('unmatched_mentees', [])
-            
-            if data_type == 'mentor':
-                # Remove all matches (since all mentors are deleted)
-                matches = []
-            else:  # mentee
-                # Remove all matches and unmatched mentees
-                matches = []
-                unmatched_mentees = []
-            
-            match_data['matches'] = matches
-            match_data['unmatched_mentees'] = unmatched_mentees
-            
-            with open(MATCHES_FILE, 'w') as f:
-                json.dump(match_data, f, indent=2)
+        # Clear the records and the matches that reference them
+        storage.clear_records(data_type)
         
         return jsonify({'success': True, 'message': f'All {data_type}s cleared and related matches cleaned up'})
     
@@ -380,6 +685,38 @@ def clear_all():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/suggestions', methods=['GET'])
+def get_suggestions():
+    """
+    Get the best mentors with capacity left for a mentee, for reassignment
+    Query parameters:
+        mentee_id: mentee to suggest mentors for
+        k: number of suggestions (optional, default 3)
+    Scores use the weights of the last matching run; a mentor's load is
+    its current number of saved matches, including earlier reassignments.
+    """
+    try:
+        mentee_id = request.args.get('mentee_id', type=int)
+        k = request.args.get('k', '3')
+        
+        if mentee_id is None:
+            return jsonify({'error': 'mentee_id required'}), 400
+        
+        if not k.isdigit() or not 1 <= int(k) <= MAX_SUGGESTIONS:
+            return jsonify({'error': f'Invalid k. Must be an integer from 1 to {MAX_SUGGESTIONS}'}), 400
+        k = int(k)
+        
+        weights = cache.get_match_data().get('weights') or DEFAULT_MATCHING_WEIGHTS
+        result = suggestion_service.suggest(mentee_id, k, weights)
+        if result is None:
+            return jsonify({'error': 'Mentee not found'}), 404
+        
+        return jsonify({'success': True, 'mentee_id': mentee_id, 'weights': weights, **result})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/verify-match', methods=['POST'])
 def verify_match():
     """
@@ -392,86 +729,163 @@ def verify_match():
         mentor_id = data.get('mentor_id')
         action = data.get('action')  # 'approve' or 'reassign'
         
-        # Load matches
-        with open(MATCHES_FILE, 'r') as f:
-            match_data = json.load(f)
-        
-        matches = match_data.get('matches', [])
-        
-        # Find the match
-        match_found = False
-        for match in matches:
-            if match.get('mentee_id') == mentee_id and match.get('mentor_id') == mentor_id:
-                if action == 'approve':
-                    match['status'] = 'verified'
-                    match['verified'] = True
-                elif action == 'reassign':
-                    new_mentor_id = data.get('new_mentor_id')
-                    if new_mentor_id:
-                        match['mentor_id'] = new_mentor_id
-                        match['status'] = 'pending'
-                    else:
-                        return jsonify({'error': 'new_mentor_id required for reassign'}), 400
-                match_found = True
-                break
-        
-        if not match_found:
+        updates = {}
+        if action == 'approve':
+            updates = {'status': 'verified', 'verified': True}
+        elif action == 'reassign':
+            new_mentor_id = data.get('new_mentor_id')
+            if not new_mentor_id:
+                if storage.get_match(mentee_id, mentor_id) is None:
+                    return jsonify({'error': 'Match not found'}), 404
+                return jsonify({'error': 'new_mentor_id required for reassign'}), 400
+            updates = reassignment_updates(
+                new_mentor_id,
+                cache.get_records_by_id('mentor').get(new_mentor_id),
+                cache.get_records_by_id('mentee').get(mentee_id),
+                cache.get_match_data().get('weights') or DEFAULT_MATCHING_WEIGHTS
+            )
+        
+        # Find and update the match
+        if not storage.update_match(mentee_id, mentor_id, updates):
             return jsonify({'error': 'Match not found'}), 404
         
-        # Save updated matches
-        with open(MATCHES_FILE, 'w') as f:
-            json.dump(match_data, f, indent=2)
-        
         return jsonify({'success': True, 'message': f'Match {action}d successfully'})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/verify-matches', methods=['POST'])
+def verify_matches():
+    """
+    Approve or reassign many matches in one write
+    Expects: { 'operations': [ { 'mentee_id', 'mentor_id', 'action', 'new_mentor_id' }, ... ],
+               'approve_min_score': float (optional, also approve every pending match scoring at least this) }
+    
+    Operations are validated in order (reassignments against the new
+    mentor's max_mentees) and the valid ones are saved together.
+    """
+    try:
+        data = request.json
+        operations = data.get('operations', [])
+        approve_min_score = data.get('approve_min_score')
+        
+        if (not isinstance(operations, list) or len(operations) > MAX_BULK_OPERATIONS
+                or not all(isinstance(operation, dict) for operation in operations)):
+            return jsonify({'error': f'Invalid operations. Must be a list of at most {MAX_BULK_OPERATIONS} objects'}), 400
+        
+        if approve_min_score is not None and (
+                isinstance(approve_min_score, bool) or not isinstance(approve_min_score, (int, float))):
+            return jsonify({'error': 'Invalid approve_min_score. Must be a number'}), 400
+        
+        match_data = cache.get_match_data()
+        changes, results, approved_by_score = plan_bulk_verification(
+            operations,
+            match_data.get('matches', []),
+            cache.get_records_by_id('mentor'),
+            cache.get_records_by_id('mentee'),
+            match_data.get('weights') or DEFAULT_MATCHING_WEIGHTS,
+            approve_min_score
+        )
+        
+        # A concurrent change to the matches leaves a planned pair missing
+        if changes and not storage.update_matches(changes):
+            return jsonify({'error': 'Matches changed while verifying; try again'}), 409
+        
+        succeeded = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': True,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'approved_by_score': approved_by_score,
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Get dashboard statistics"""
+    """
+    Get dashboard statistics
+    
+    Served from counters that are updated with every write, so this doesn't
+    reread mentors, mentees or matches.
+    """
     try:
-        # Load all data
-        with open(MENTORS_FILE, 'r') as f:
-            mentors = json.load(f)
-        
-        with open(MENTEES_FILE, 'r') as f:
-            mentees = json.load(f)
-        
-        if os.path.exists(MATCHES_FILE):
-            with open(MATCHES_FILE, 'r') as f:
-                match_data = json.load(f)
-            matches = match_data.get('matches', [])
-            verified_matches = [m for m in matches if m.get('status') == 'verified']
-        else:
-            matches = []
-            verified_matches = []
+        return jsonify({'success': True, 'stats': storage.get_stats()})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/stats/check', methods=['GET'])
+def check_stats():
+    """Recount the dashboard statistics from storage and report any drift in the counters"""
+    try:
+        return jsonify({'success': True, **storage.check()})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request, storage, matcher and cache metrics in Prometheus text format"""
+    return app.response_class(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/metrics/profiler', methods=['POST'])
+def configure_profiler():
+    """
+    Turn slow-request stack sampling on or off
+    Expects: { 'enabled': bool, 'threshold_ms': int (optional) }
+    """
+    try:
+        data = request.json
+        threshold_ms = data.get('threshold_ms')
         
-        # Calculate mentor capacity usage
-        mentor_capacity = {}
-        for match in verified_matches:
-            mentor_id = match.get('mentor_id')
-            if mentor_id not in mentor_capacity:
-                mentor_capacity[mentor_id] = 0
-            mentor_capacity[mentor_id] += 1
+        if threshold_ms is not None and (not isinstance(threshold_ms, (int, float)) or
+                                         isinstance(threshold_ms, bool) or threshold_ms < 0):
+            return jsonify({'error': 'Invalid threshold_ms. Must be a non-negative number'}), 400
         
+        profiler.configure(data.get('enabled', False), threshold_ms)
+        
+        return jsonify({'success': True, 'enabled': profiler.enabled,
+                        'threshold_ms': profiler.threshold_ms})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/metrics/slow-requests', methods=['GET'])
+def get_slow_requests():
+    """Get sampled stacks of recent requests slower than the profiler threshold"""
+    try:
         return jsonify({
             'success': True,
-            'stats': {
-                'total_mentors': len(mentors),
-                'total_mentees': len(mentees),
-                'total_matches': len(matches),
-                'verified_matches': len(verified_matches),
-                'unmatched_mentees': len(mentees) - len(verified_matches),
-                'mentor_capacity_usage': mentor_capacity
-            }
+            'enabled': profiler.enabled,
+            'threshold_ms': profiler.threshold_ms,
+            'requests': profiler.profiles()
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get read cache, matching result cache and run history counters"""
+    try:
+        return jsonify({'success': True, 'cache': cache.get_stats(),
+                        'result_cache': result_cache.get_stats(),
+                        'run_history': run_history.get_stats()})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
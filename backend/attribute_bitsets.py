@@ -0,0 +1,225 @@
+"""
+Attribute Bitsets for the Matching Algorithm
+First-generation, transfer and military answers, languages and volunteer
+communities encoded as integer bitsets and scored with AND/popcount
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from record_store import factorize_field, field_names, first_appearance_codes
+
+
+# Criteria scored from bitsets, in the order they are summed, and the record
+# fields each one covers
+ATTRIBUTE_CRITERIA = {
+    'background': ('first_generation', 'transfer', 'military'),
+    'language': ('languages',),
+    'community': ('communities',),
+}
+
+# Google Form questions holding each field. Headers are lowercased by
+# ingestion; a column is used when it is the field name itself or starts
+# with one of these.
+ATTRIBUTE_COLUMNS = {
+    'mentor': {
+        'first_generation': 'were you a first-generation college student',
+        'transfer': 'were you a transfer student',
+        'military': 'are you serving or did you formerly serve in the us military',
+        'languages': 'which languages do you speak fluently',
+        'communities': 'which nc state alumni volunteer communities',
+    },
+    'mentee': {
+        'first_generation': 'are you a first-generation college student',
+        'transfer': 'are you a transfer student',
+        'military': 'are you serving or did you formerly serve in the us military',
+        'languages': 'languages you speak fluently',
+        'communities': 'alumni volunteer communities',
+    },
+}
+
+# Yes/no questions; a "yes" sets the field's own bit
+FLAG_FIELDS = frozenset({'first_generation', 'transfer', 'military'})
+
+# Spoken by (nearly) every respondent, so sharing it says nothing
+COMMON_LANGUAGES = frozenset({'english'})
+
+# List answers that mean "none"
+EMPTY_ANSWERS = frozenset({'n/a', 'na', 'none', 'no', 'not yet', 'not sure', '-'})
+
+_ITEM_SEPARATOR = re.compile(r'[,;\n&]|\band\b')
+_PARENTHESES = re.compile(r'\([^)]*\)')
+
+# Largest number of 64-bit words ANDed at once when building a table
+_BLOCK_WORDS = 2 ** 22
+
+# Masks of the SWAR popcount used on NumPy versions without bitwise_count
+_M1, _M2, _M4, _H01 = (np.uint64(mask) for mask in (
+    0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F, 0x0101010101010101
+))
+
+
+def parse_items(value):
+    """Lowercase items of a comma-separated answer, without parenthesized notes"""
+    text = _PARENTHESES.sub(' ', str(value or '').lower())
+    items = (' '.join(item.split()) for item in _ITEM_SEPARATOR.split(text))
+    return tuple(sorted({item for item in items if item and item not in EMPTY_ANSWERS}))
+
+
+def field_tokens(field, value):
+    """Tokens (bit names) set by one field's answer"""
+    if field in FLAG_FIELDS:
+        return (field,) if str(value or '').strip().lower().startswith('yes') else ()
+    items = parse_items(value)
+    if field == 'languages':
+        return tuple(item for item in items if item not in COMMON_LANGUAGES)
+    return items
+
+
+@lru_cache(maxsize=None)
+def column_field(data_type, column):
+    """The attribute field a column holds, or None"""
+    for field, question in ATTRIBUTE_COLUMNS[data_type].items():
+        if column == field or column.startswith(question):
+            return field
+    return None
+
+
+def record_tokens(record, data_type, criterion):
+    """Set of tokens of one record for one criterion"""
+    fields = ATTRIBUTE_CRITERIA[criterion]
+    tokens = set()
+    for column, value in record.items():
+        field = column_field(data_type, column)
+        if field in fields:
+            tokens.update(field_tokens(field, value))
+    return tokens
+
+
+def attribute_affinity(mentor, mentee, criterion):
+    """
+    Share of the mentee's tokens the mentor also has (0.0 to 1.0)
+
+    0.0 when the mentee has none, e.g. no "yes" answers for 'background'.
+    """
+    mentee_tokens = record_tokens(mentee, 'mentee', criterion)
+    if not mentee_tokens:
+        return 0.0
+    return len(mentee_tokens & record_tokens(mentor, 'mentor', criterion)) / len(mentee_tokens)
+
+
+def popcount(words):
+    """
+    Number of set bits along the last axis of a uint64 array
+
+    Without np.bitwise_count (NumPy < 2.0) the bits are counted in place
+    with the usual shift-and-mask steps, so words is overwritten.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    shifted = words >> np.uint64(1)
+    shifted &= _M1
+    words -= shifted
+    np.right_shift(words, np.uint64(2), out=shifted)
+    shifted &= _M2
+    words &= _M2
+    words += shifted
+    np.right_shift(words, np.uint64(4), out=shifted)
+    words += shifted
+    words &= _M4
+    words *= _H01
+    words >>= np.uint64(56)
+    return words.sum(axis=-1, dtype=np.int64)
+
+
+def _column_tokens(records, data_type, criterion):
+    """(codes, token tuples) of every column holding one of the criterion's fields"""
+    fields = ATTRIBUTE_CRITERIA[criterion]
+    parts = []
+    for column in field_names(records):
+        field = column_field(data_type, column)
+        if field in fields:
+            parts.append(factorize_field(
+                records, column, lambda value, field=field: field_tokens(field, value)
+            ))
+    return parts
+
+
+def _pack(parts, num_records, vocabulary, num_words):
+    """Bitset of every record: one row of num_words uint64 words per record"""
+    bits = np.zeros((num_records, num_words), dtype=np.uint64)
+    for codes, token_sets in parts:
+        value_bits = np.zeros((len(token_sets), num_words), dtype=np.uint64)
+        for code, tokens in enumerate(token_sets):
+            for token in tokens:
+                position = vocabulary[token]
+                value_bits[code, position // 64] |= np.uint64(1 << (position % 64))
+        bits |= value_bits[codes]
+    return bits
+
+
+def _factorize_rows(bits):
+    """
+    Integer codes over the distinct bitsets, in order of first appearance
+
+    Returns:
+        tuple: (codes, uniques) where uniques[codes[i]] == bits[i]
+    """
+    if not len(bits):
+        return np.zeros(0, dtype=np.intp), bits
+    uniques, inverse = np.unique(bits, axis=0, return_inverse=True)
+    codes, order = first_appearance_codes(inverse.reshape(-1))
+    return codes, uniques[order]
+
+
+def affinity_table(mentee_bits, mentor_bits):
+    """
+    Affinity of every mentee bitset with every mentor bitset
+
+    table[i, j] = popcount(mentee_bits[i] & mentor_bits[j]) / popcount(mentee_bits[i]),
+    computed for blocks of mentee rows against the whole mentor table at once.
+    """
+    table = np.zeros((len(mentee_bits), len(mentor_bits)))
+    mentee_counts = popcount(mentee_bits.copy())
+    rows = np.flatnonzero(mentee_counts)
+    step = max(1, _BLOCK_WORDS // max(1, mentor_bits.size))
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        shared = popcount(mentee_bits[block, None, :] & mentor_bits[None, :, :])
+        table[block] = shared / mentee_counts[block, None]
+    return table
+
+
+def encode_attributes(mentors, mentees, criterion):
+    """
+    Encode one bitset criterion
+
+    Every distinct answer is parsed once, records sharing a bitset share a
+    code, and the table is scored over the distinct bitsets only.
+
+    Returns:
+        dict: {'mentor_codes', 'mentee_codes', 'table'} in the layout of
+            feature_encoding.encode_features
+    """
+    mentor_parts = _column_tokens(mentors, 'mentor', criterion)
+    mentee_parts = _column_tokens(mentees, 'mentee', criterion)
+    vocabulary = {}
+    for _, token_sets in mentor_parts + mentee_parts:
+        for tokens in token_sets:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+    num_words = max(1, -(-len(vocabulary) // 64))
+
+    mentor_codes, mentor_bits = _factorize_rows(
+        _pack(mentor_parts, len(mentors), vocabulary, num_words)
+    )
+    mentee_codes, mentee_bits = _factorize_rows(
+        _pack(mentee_parts, len(mentees), vocabulary, num_words)
+    )
+    return {
+        'mentor_codes': mentor_codes,
+        'mentee_codes': mentee_codes,
+        'table': affinity_table(mentee_bits, mentor_bits),
+    }
@@ -0,0 +1,7 @@
+"""
+Benchmarks for Alumni Mentorship Matching Platform
+Synthetic cohorts and timing of the matcher and API endpoints
+
+Run from the backend directory:
+    python -m benchmarks.run --sizes 100 1000 10000 --output bench.json
+"""
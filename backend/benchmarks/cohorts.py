@@ -0,0 +1,189 @@
+"""
+Synthetic Cohort Generator for Alumni Mentorship Matching Platform
+Builds mentor and mentee records that follow the sample Google Form exports
+"""
+
+import os
+import random
+from collections import Counter
+
+from ingestion import iter_csv_records
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_FILES = {
+    'mentor': os.path.join(REPO_DIR, 'sample_mentors.csv'),
+    'mentee': os.path.join(REPO_DIR, 'sample_mentees.csv'),
+}
+
+# Short answer columns copied into synthetic records, per record type
+ATTRIBUTE_COLUMNS = {
+    'mentor': [
+        'were you a first-generation college student?',
+        'were you a transfer student?',
+        'are you serving or did you formerly serve in the us military?',
+        'which languages do you speak fluently?',
+        'which nc state alumni volunteer communities are you currently connected to or interested in joining?',
+    ],
+    'mentee': [
+        'class level?',
+        'are you a first-generation college student?',
+        'are you a transfer student?',
+        'are you serving or did you formerly serve in the us military?',
+        'languages you speak fluently',
+        'alumni volunteer communities',
+    ],
+}
+
+# The samples only have a handful of rows, so field values are drawn from
+# the samples SAMPLE_SHARE of the time and from these lists otherwise.
+# Values are written the way respondents type them (mixed case, state
+# suffixes, compound majors) so the matcher sees realistic variety.
+SAMPLE_SHARE = 0.3
+
+DISCIPLINES = [
+    'Computer Science', 'Computer Engineering', 'Electrical Engineering',
+    'Mechanical Engineering', 'Civil Engineering', 'Chemical Engineering',
+    'Industrial Engineering', 'Biomedical Engineering', 'Aerospace Engineering',
+    'Business Administration', 'Business Admin', 'Accounting', 'Finance',
+    'Marketing', 'Economics', 'Supply Chain Management', 'Statistics',
+    'Mathematics', 'Physics', 'Chemistry', 'Biology', 'Biological Sciences',
+    'Zoology', 'Animal Science', 'Agricultural Business Management',
+    'Agricultural Science', 'Environmental Science', 'Forestry',
+    'Textile Engineering', 'Fashion and Textile Management', 'Architecture',
+    'Graphic Design', 'Industrial Design', 'Communication', 'English',
+    'History', 'Political Science', 'Psychology', 'Criminology',
+    'Psychology and Criminology', 'Sociology', 'Social Work', 'Education',
+    'Higher Education', 'Nutrition Science', 'Public Health', 'Nursing',
+    'Data Science', 'Software Engineering', 'Information Technology',
+    'Healthcare', 'Law', 'Real Estate', 'Consulting', 'Research', 'Nonprofit',
+]
+
+LOCATIONS = [
+    'Raleigh, NC', 'Raleigh', 'raleigh', 'Durham, NC', 'Durham', 'Cary, NC',
+    'Chapel Hill, NC', 'Charlotte, NC', 'Charlotte', 'Greensboro, NC',
+    'Winston-Salem, NC', 'Wilmington, NC', 'Asheville, NC', 'Fayetteville, NC',
+    'Greenville, NC', 'Apex, NC', 'Wake Forest, NC', 'Morrisville, NC',
+    'North Carolina', 'NC', 'Research Triangle Park', 'Richmond, VA',
+    'Arlington, VA', 'Washington, DC', 'Atlanta, GA', 'Charleston, SC',
+    'Nashville, TN', 'New York, NY', 'Boston, MA', 'Chicago, IL', 'Austin, TX',
+    'Denver, CO', 'Seattle, WA', 'San Francisco, CA', 'Remote', 'Not sure',
+    'Anywhere', '',
+]
+
+MODES = ['Hybrid', 'Remote', 'In-Person', '']
+MODE_WEIGHTS = [0.45, 0.25, 0.25, 0.05]
+
+CAPACITIES = [1, 2, 3]
+CAPACITY_WEIGHTS = [0.2, 0.3, 0.5]
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie',
+               'Avery', 'Quinn', 'Parker', 'Drew', 'Reese', 'Skyler', 'Rowan']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
+              'Davis', 'Martinez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Moore']
+
+
+def _zipf_weights(count, exponent=1.1):
+    """Popularity weights so a few values are common and most are rare"""
+    return [1.0 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def load_sample_distributions(data_type):
+    """
+    Count the values of each matching field and attribute column in a sample CSV
+
+    Returns:
+        dict: field -> Counter of values (empty if the sample file is missing)
+    """
+    fields = ['discipline', 'location', 'mode'] + ATTRIBUTE_COLUMNS[data_type]
+    if data_type == 'mentor':
+        fields.append('max_mentees')
+    distributions = {field: Counter() for field in fields}
+
+    path = SAMPLE_FILES[data_type]
+    if not os.path.exists(path):
+        return distributions
+    with open(path, 'rb') as stream:
+        for record in iter_csv_records(stream, data_type):
+            for field in fields:
+                distributions[field][record.get(field, '')] += 1
+    return distributions
+
+
+class CohortGenerator:
+    """
+    Generates mentor and mentee records with a fixed random seed
+
+    Matching fields mix values seen in the sample CSVs with the built-in
+    vocabularies; attribute columns (first-gen, transfer, military,
+    languages, communities) follow the sample frequencies.
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.samples = {
+            data_type: load_sample_distributions(data_type)
+            for data_type in ('mentor', 'mentee')
+        }
+        self._discipline_weights = _zipf_weights(len(DISCIPLINES))
+        self._location_weights = _zipf_weights(len(LOCATIONS))
+
+    def _from_sample(self, data_type, field):
+        counts = self.samples[data_type].get(field)
+        if not counts:
+            return None
+        values = list(counts)
+        return self.random.choices(values, weights=[counts[v] for v in values])[0]
+
+    def _field(self, data_type, field, values, weights):
+        if self.random.random() < SAMPLE_SHARE:
+            sampled = self._from_sample(data_type, field)
+            if sampled is not None:
+                return sampled
+        return self.random.choices(values, weights=weights)[0]
+
+    def _record(self, data_type, index):
+        first_name = self.random.choice(FIRST_NAMES)
+        last_name = self.random.choice(LAST_NAMES)
+        record = {
+            'name': f'{first_name} {last_name} {index}',
+            'first name': first_name,
+            'last name': last_name,
+            'email': f'{first_name}.{last_name}.{index}@example.com'.lower(),
+            'discipline': self._field(data_type, 'discipline', DISCIPLINES, self._discipline_weights),
+            'location': self._field(data_type, 'location', LOCATIONS, self._location_weights),
+            'mode': self._field(data_type, 'mode', MODES, MODE_WEIGHTS),
+            'status': 'active',
+        }
+        for column in ATTRIBUTE_COLUMNS[data_type]:
+            record[column] = self._from_sample(data_type, column) or ''
+        if data_type == 'mentor':
+            record['max_mentees'] = self._field(data_type, 'max_mentees', CAPACITIES, CAPACITY_WEIGHTS)
+            record['current_mentees'] = 0
+        return record
+
+    def mentors(self, count):
+        """Generate count mentor records (without IDs)"""
+        return [self._record('mentor', i) for i in range(count)]
+
+    def mentees(self, count):
+        """Generate count mentee records (without IDs)"""
+        return [self._record('mentee', i) for i in range(count)]
+
+
+def generate_cohort(num_mentees, num_mentors=None, seed=0):
+    """
+    Generate a cohort of mentees and mentors
+
+    Args:
+        num_mentees: Number of mentees
+        num_mentors: Number of mentors (default: half the mentees, at least 1)
+        seed: Random seed; the same arguments always give the same records
+
+    Returns:
+        tuple: (mentors, mentees) lists of records without IDs
+    """
+    if num_mentors is None:
+        num_mentors = max(1, num_mentees // 2)
+    generator = CohortGenerator(seed)
+    return generator.mentors(num_mentors), generator.mentees(num_mentees)
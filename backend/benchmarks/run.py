@@ -0,0 +1,300 @@
+"""
+Benchmark Runner for Alumni Mentorship Matching Platform
+Times the matcher and the API endpoints on synthetic cohorts and writes JSON
+
+Usage (from the backend directory):
+    python -m benchmarks.run --sizes 100 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --sizes 1000 --baseline bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.cohorts import generate_cohort  # noqa: E402
+
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+# Records per /api/upload-data request
+UPLOAD_BATCH_SIZE = 1000
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, items_per_run=1, peak_bytes=None):
+    """
+    Summarize the latencies (seconds) of repeated runs of one operation
+
+    Returns:
+        dict: runs, total_seconds, throughput_per_second (items per second),
+            p50_ms, p95_ms, p99_ms and peak_memory_mb
+    """
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'runs': len(ordered),
+        'items_per_run': round(items_per_run, 2),
+        'total_seconds': round(total, 6),
+        'throughput_per_second': round(len(ordered) * items_per_run / total, 2) if total else None,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'peak_memory_mb': round(peak_bytes / 2 ** 20, 3) if peak_bytes is not None else None,
+    }
+
+
+def time_calls(calls):
+    """Run each zero-argument callable once and return the latencies"""
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def traced_peak(call):
+    """Peak Python heap allocation in bytes while running call once"""
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def check(response):
+    """Fail loudly if an endpoint returned an error instead of timing it"""
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.request.path} returned {response.status_code}: '
+                           f'{response.get_data(as_text=True)[:200]}')
+    return response
+
+
+def use_fresh_storage(app_module, data_dir):
+    """Point the Flask app at an empty storage backend in data_dir"""
+    from storage import create_storage
+    from cache import DataCache
+    from jobs import MatchingJobManager
+    from metrics import InstrumentedStorage
+    from result_cache import MatchResultCache
+    from run_history import RunHistory
+    from stats_tracker import StatsTracker
+    from suggestions import SuggestionService
+
+    app_module.storage = StatsTracker(InstrumentedStorage(create_storage(data_dir)))
+    app_module.cache = DataCache(app_module.storage)
+    app_module.suggestion_service = SuggestionService(app_module.cache, app_module.storage)
+    app_module.result_cache = MatchResultCache(os.path.join(data_dir, 'result_cache'))
+    app_module.run_history = RunHistory(os.path.join(data_dir, 'run_history'))
+    app_module.job_manager = MatchingJobManager(app_module.storage, app_module.cache,
+                                                result_cache=app_module.result_cache,
+                                                run_history=app_module.run_history)
+
+
+def benchmark_size(app_module, num_mentees, num_mentors, options):
+    """
+    Benchmark one cohort size against a fresh database
+
+    Operations run in workflow order: upload, matching (direct, through
+    /api/run-matching, and repeated with a result cache hit), get-matches
+    (full and one page), stats, verify (single and bulk).
+    """
+    from matching_logic import execute_matching
+
+    mentors, mentees = generate_cohort(num_mentees, num_mentors, options.seed)
+    client = app_module.app.test_client()
+    weights = {'discipline': 0.5, 'location': 0.3, 'mode': 0.2}
+    repeat = options.repeat
+    measure_memory = not options.no_memory
+    results = {}
+
+    # Upload in batches, one request per batch
+    batches = [
+        (data_type, records[i:i + UPLOAD_BATCH_SIZE])
+        for data_type, records in (('mentor', mentors), ('mentee', mentees))
+        for i in range(0, len(records), UPLOAD_BATCH_SIZE)
+    ]
+    latencies = time_calls([
+        lambda data_type=data_type, batch=batch: check(client.post(
+            '/api/upload-data', json={'type': data_type, 'data': batch}
+        ))
+        for data_type, batch in batches
+    ])
+    results['upload'] = summarize(latencies, (len(mentors) + len(mentees)) / len(batches))
+
+    stored_mentors = app_module.cache.get_records('mentor')
+    stored_mentees = app_module.cache.get_records('mentee')
+
+    def match():
+        execute_matching(stored_mentors, stored_mentees, weights, options.algorithm,
+                         workers=options.workers)
+
+    def run_matching(use_cache=False):
+        check(client.post('/api/run-matching', json={
+            'weights': weights, 'algorithm': options.algorithm, 'workers': options.workers,
+            'use_cache': use_cache
+        }))
+
+    def run_matching_cached():
+        run_matching(use_cache=True)
+
+    endpoints = [
+        ('matching', match, options.matching_repeat, num_mentees),
+        ('run_matching', run_matching, options.matching_repeat, num_mentees),
+        ('run_matching_cached', run_matching_cached, repeat, num_mentees),
+        ('get_matches', lambda: check(client.get('/api/get-matches')), repeat, 1),
+        ('get_matches_page',
+         lambda: check(client.get('/api/get-matches?limit=100&exclude=top_alternatives')), repeat, 1),
+        ('stats', lambda: check(client.get('/api/stats')), repeat, 1),
+    ]
+    run_matching_cached()  # store the result so run_matching_cached times hits
+    for name, call, runs, items in endpoints:
+        latencies = time_calls([call] * runs)
+        peak = traced_peak(call) if measure_memory else None
+        results[name] = summarize(latencies, items, peak)
+
+    # Approve distinct pending matches, one request each
+    matches = client.get('/api/get-matches').get_json()['matches'][:repeat]
+    latencies = time_calls([
+        lambda match=match: check(client.post('/api/verify-match', json={
+            'mentee_id': match['mentee_id'],
+            'mentor_id': match['mentor_id'],
+            'action': 'approve'
+        }))
+        for match in matches
+    ])
+    results['verify'] = summarize(latencies)
+
+    # Approve the remaining pending matches, one bulk request each run
+    pending = client.get('/api/get-matches?status=pending').get_json()['matches']
+    chunks = [pending[i::repeat] for i in range(repeat)]
+    latencies = time_calls([
+        lambda chunk=chunk: check(client.post('/api/verify-matches', json={'operations': [
+            {'mentee_id': m['mentee_id'], 'mentor_id': m['mentor_id'], 'action': 'approve'}
+            for m in chunk
+        ]}))
+        for chunk in chunks
+    ])
+    results['verify_bulk'] = summarize(latencies, len(pending) / repeat)
+
+    return {'mentees': num_mentees, 'mentors': len(mentors), 'operations': results}
+
+
+def git_revision():
+    """Short commit hash of the working tree, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """Print the p50 latency change of every operation against a baseline report"""
+    previous = {
+        (size['mentees'], name): operation
+        for size in baseline.get('results', [])
+        for name, operation in size['operations'].items()
+    }
+    print(f"{'mentees':>8}  {'operation':<18}{'baseline p50':>14}{'p50':>12}{'change':>10}",
+          file=sys.stderr)
+    for size in report['results']:
+        for name, operation in size['operations'].items():
+            before = previous.get((size['mentees'], name))
+            if not before or not before['p50_ms']:
+                continue
+            change = (operation['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            print(f"{size['mentees']:>8}  {name:<18}{before['p50_ms']:>12.2f}ms"
+                  f"{operation['p50_ms']:>10.2f}ms{change:>+9.1f}%", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark matching and API endpoints')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Numbers of mentees to benchmark (default: 100 1000 10000 100000)')
+    parser.add_argument('--mentor-ratio', type=float, default=0.5,
+                        help='Mentors per mentee (default: 0.5)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Runs per read/verify endpoint (default: 20)')
+    parser.add_argument('--matching-repeat', type=int, default=3,
+                        help='Runs per matching operation (default: 3)')
+    parser.add_argument('--algorithm', choices=['greedy', 'optimal'], default='greedy')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes used to score candidates (default: 1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the traced run that measures peak memory')
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+    parser.add_argument('--baseline', help='Earlier JSON report to compare p50 latencies against')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    output = os.path.abspath(options.output) if options.output else None
+    baseline = os.path.abspath(options.baseline) if options.baseline else None
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='mentor-match-bench-') as workdir:
+        # The app creates its default storage on import; keep it out of the repo
+        os.environ.pop('DATABASE_PATH', None)
+        os.chdir(workdir)
+        try:
+            import app as app_module
+
+            results = []
+            for num_mentees in options.sizes:
+                num_mentors = max(1, int(num_mentees * options.mentor_ratio))
+                use_fresh_storage(app_module, os.path.join(workdir, f'size-{num_mentees}'))
+                print(f'Benchmarking {num_mentees} mentees / {num_mentors} mentors...',
+                      file=sys.stderr)
+                results.append(benchmark_size(app_module, num_mentees, num_mentors, options))
+        finally:
+            os.chdir(original_dir)
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'storage_backend': os.environ.get('STORAGE_BACKEND', 'sqlite'),
+        'options': vars(options),
+        'results': results,
+    }
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if baseline:
+        with open(baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+In-Process Read Cache for Alumni Mentorship Matching Platform
+Keeps parsed mentors, mentees and matches in memory between requests
+"""
+
+import threading
+
+from record_store import RecordStore
+from result_cache import content_hash
+
+
+class DataCache:
+    """
+    Read-through cache in front of a storage backend
+
+    Each collection is reloaded only when the storage reports a new data
+    version for it (file mtime/size for JSON storage, a version counter for
+    SQLite), so writes from any worker invalidate the cache on the next
+    read. Derived indexes (ID sets and ID -> record maps) are built with
+    the collection and stay warm until it changes.
+
+    Mentors and mentees are held as a columnar RecordStore (see
+    record_store.py) that hands out a new dict for each record read; the
+    match document is shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, collection):
+        """Return the cache entry for a collection, reloading it if stale"""
+        version = self.storage.data_versions()[collection]
+        with self._lock:
+            entry = self._entries.get(collection)
+            if entry is not None and entry['version'] == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        if collection == 'matches':
+            data = self.storage.get_match_data()
+            entry = {'version': version, 'data': data}
+        else:
+            data = RecordStore(self.storage.get_records(collection))
+            by_id = data.index('id')
+            entry = {'version': version, 'data': data, 'by_id': by_id, 'ids': set(by_id)}
+
+        with self._lock:
+            self._entries[collection] = entry
+        return entry
+
+    def get_records(self, data_type):
+        """Get all mentors or mentees (a RecordStore, indexed and iterated like a list)"""
+        return self._get(data_type)['data']
+
+    def get_record_ids(self, data_type):
+        """Get the set of mentor or mentee IDs"""
+        return self._get(data_type)['ids']
+
+    def get_records_and_hash(self, data_type):
+        """
+        Get all mentors or mentees with the content hash of that same list
+
+        The hash is computed on first use and kept until the data version
+        changes.
+
+        Returns:
+            tuple: (records, content_hash)
+        """
+        entry = self._get(data_type)
+        digest = entry.get('content_hash')
+        if digest is None:
+            digest = entry['content_hash'] = content_hash(entry['data'])
+        return entry['data'], digest
+
+    def get_records_by_id(self, data_type):
+        """Get a read-only map from ID to mentor or mentee record (first record wins)"""
+        return self._get(data_type)['by_id']
+
+    def get_match_data(self):
+        """Get the match document; the top-level dict is a copy and may be modified"""
+        return dict(self._get('matches')['data'])
+
+    def invalidate(self):
+        """Drop every cached collection"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Hit/miss counters and the data version of each cached collection"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'cached_versions': {
+                    collection: str(entry['version'])
+                    for collection, entry in self._entries.items()
+                }
+            }
@@ -0,0 +1,489 @@
+"""
+Feature Encoding for the Matching Algorithm
+Normalizes mentor/mentee records once and builds score matrices with NumPy
+"""
+
+import numpy as np
+from scipy import sparse
+
+from attribute_bitsets import ATTRIBUTE_CRITERIA, encode_attributes
+from geocoding import GAZETTEER, distance_score
+from record_store import factorize_field
+from text_similarity import TEXT_VECTORIZER
+
+
+# Order of the criteria in the component score tables
+CRITERIA = ('discipline', 'location', 'mode')
+
+# Free-text similarity of the long-form answers (see text_similarity.py).
+# Only encoded when it has a positive weight, after the other criteria.
+TEXT_CRITERION = 'text'
+
+# Shared first-gen/transfer/military answers, languages and volunteer
+# communities (see attribute_bitsets.py). Each is only encoded when it has a
+# positive weight, after the text criterion.
+
+# Default weights used by calculate_compatibility_score when a key is missing
+DEFAULT_WEIGHTS = {
+    'discipline': 0.4, 'location': 0.3, 'mode': 0.3, TEXT_CRITERION: 0.0,
+    **{criterion: 0.0 for criterion in ATTRIBUTE_CRITERIA}
+}
+
+
+def _normalize(value):
+    """Lowercase a raw field value, treating missing values as empty strings"""
+    if value is None:
+        return ''
+    return str(value).lower()
+
+
+def _factorize(values):
+    """
+    Map each value to an integer code
+
+    Returns:
+        tuple: (codes, uniques) where uniques[codes[i]] == values[i]
+    """
+    index = {}
+    codes = np.empty(len(values), dtype=np.intp)
+    for i, value in enumerate(values):
+        codes[i] = index.setdefault(value, len(index))
+    return codes, list(index)
+
+
+def _contains_matrix(needles, haystacks):
+    """
+    Boolean matrix where [i, j] is True when needles[i] is a substring of haystacks[j]
+
+    Loops once per unique needle; the scan over haystacks runs inside NumPy.
+    """
+    result = np.zeros((len(needles), len(haystacks)), dtype=bool)
+    if not haystacks:
+        return result
+    hay = np.array(haystacks, dtype=str)
+    for i, needle in enumerate(needles):
+        result[i] = np.char.find(hay, needle) >= 0
+    return result
+
+
+def _equal_matrix(mentee_values, mentor_values):
+    """Boolean matrix where [i, j] is True when mentee_values[i] == mentor_values[j]"""
+    result = np.zeros((len(mentee_values), len(mentor_values)), dtype=bool)
+    mentor_index = {value: j for j, value in enumerate(mentor_values)}
+    for i, value in enumerate(mentee_values):
+        j = mentor_index.get(value)
+        if j is not None:
+            result[i, j] = True
+    return result
+
+
+def _word_overlap_matrix(source_values, target_values):
+    """
+    Boolean matrix where [i, j] is True when any word of source_values[i]
+    is a substring of target_values[j]
+    """
+    word_index = {}
+    rows, cols = [], []
+    for i, value in enumerate(source_values):
+        for word in value.split():
+            rows.append(i)
+            cols.append(word_index.setdefault(word, len(word_index)))
+
+    if not word_index:
+        return np.zeros((len(source_values), len(target_values)), dtype=bool)
+
+    # incidence[i, w] = 1 when word w appears in source value i
+    incidence = np.zeros((len(source_values), len(word_index)), dtype=np.float32)
+    incidence[rows, cols] = 1.0
+    word_in_target = _contains_matrix(list(word_index), target_values).astype(np.float32)
+    return (incidence @ word_in_target) > 0
+
+
+def _discipline_table(mentee_values, mentor_values):
+    """Discipline component scores between unique mentee and mentor values"""
+    partial = (
+        _contains_matrix(mentor_values, mentee_values).T |
+        _contains_matrix(mentee_values, mentor_values)
+    )
+    table = np.where(partial, 0.5, 0.0)
+    table[_equal_matrix(mentee_values, mentor_values)] = 1.0
+    return table
+
+
+def _location_table(mentee_values, mentor_values):
+    """
+    Location component scores between unique mentee and mentor values
+
+    Pairs of values that both resolve to gazetteer places are scored by
+    distance; only the mentor places within MAX_MATCH_DISTANCE_MILES of
+    each mentee place (a KD-tree query) are evaluated, the rest score 0.0.
+    Other pairs fall back to word overlap.
+    """
+    partial = (
+        _word_overlap_matrix(mentee_values, mentor_values) |
+        _word_overlap_matrix(mentor_values, mentee_values).T
+    )
+    table = np.where(partial, 0.5, 0.0)
+
+    mentee_places = [GAZETTEER.resolve(value) for value in mentee_values]
+    mentor_columns = {}
+    for j, value in enumerate(mentor_values):
+        place = GAZETTEER.resolve(value)
+        if place is not None:
+            mentor_columns.setdefault(place, []).append(j)
+    resolved_columns = [j for columns in mentor_columns.values() for j in columns]
+    for i, mentee_place in enumerate(mentee_places):
+        if mentee_place is None or not resolved_columns:
+            continue
+        table[i, resolved_columns] = 0.0
+        for mentor_place in GAZETTEER.nearby(mentee_place):
+            columns = mentor_columns.get(mentor_place)
+            if columns:
+                table[i, columns] = distance_score(mentee_place, mentor_place)
+
+    table[_equal_matrix(mentee_values, mentor_values)] = 1.0
+    return table
+
+
+def _mode_table(mentee_values, mentor_values):
+    """Mode component scores between unique mentee and mentor values"""
+    mentee_hybrid = np.array(['hybrid' in value for value in mentee_values], dtype=bool)
+    mentor_hybrid = np.array(['hybrid' in value for value in mentor_values], dtype=bool)
+    table = np.where(mentee_hybrid[:, None] | mentor_hybrid[None, :], 0.7, 0.0)
+    table[_equal_matrix(mentee_values, mentor_values)] = 1.0
+    return table
+
+
+_TABLE_BUILDERS = {
+    'discipline': _discipline_table,
+    'location': _location_table,
+    'mode': _mode_table,
+}
+
+
+def _encode_text(mentors, mentees):
+    """
+    Encode the text criterion
+
+    Records with identical text share a code, and the table holds the
+    cosine similarity of every unique mentee text with every unique mentor
+    text as a sparse matrix (most pairs share no term).
+    """
+    mentor_entries, mentee_entries = TEXT_VECTORIZER.fit(mentors, mentees)
+    mentor_codes, mentor_texts = _factorize([entry[0] for entry in mentor_entries])
+    mentee_codes, mentee_texts = _factorize([entry[0] for entry in mentee_entries])
+    mentor_by_text = {entry[0]: entry for entry in mentor_entries}
+    mentee_by_text = {entry[0]: entry for entry in mentee_entries}
+    return {
+        'mentor_codes': mentor_codes,
+        'mentee_codes': mentee_codes,
+        'table': TEXT_VECTORIZER.similarity_table(
+            [mentee_by_text[text] for text in mentee_texts],
+            [mentor_by_text[text] for text in mentor_texts]
+        ),
+    }
+
+
+def text_weighted(*weight_sets):
+    """Whether any of the weight dicts gives the text criterion a positive weight"""
+    return any(
+        weights.get(TEXT_CRITERION, DEFAULT_WEIGHTS[TEXT_CRITERION]) > 0
+        for weights in weight_sets
+    )
+
+
+def weighted_attributes(*weight_sets):
+    """Bitset criteria that any of the weight dicts gives a positive weight, in scoring order"""
+    return tuple(
+        criterion for criterion in ATTRIBUTE_CRITERIA
+        if any(weights.get(criterion, DEFAULT_WEIGHTS[criterion]) > 0 for weights in weight_sets)
+    )
+
+
+def encode_features(mentors, mentees, text=False, attributes=()):
+    """
+    Normalize every record once and precompute per-criterion score tables
+
+    Each criterion is factorized into integer codes over its unique lowercased
+    values, and the component score is evaluated once per unique
+    (mentee value, mentor value) pair instead of once per record pair.
+
+    Args:
+        mentors: List of mentor dictionaries
+        mentees: List of mentee dictionaries
+        text: Also encode the text criterion, whose table is a
+            scipy.sparse CSR matrix (see text_weighted)
+        attributes: Bitset criteria to encode as well (see weighted_attributes)
+
+    Returns:
+        dict: {criterion: {'mentor_codes', 'mentee_codes', 'table'}} where
+            table[mentee_code, mentor_code] is the component score (0.0 to 1.0)
+    """
+    features = {}
+    for criterion in CRITERIA:
+        mentor_codes, mentor_values = factorize_field(mentors, criterion, _normalize, '')
+        mentee_codes, mentee_values = factorize_field(mentees, criterion, _normalize, '')
+        features[criterion] = {
+            'mentor_codes': mentor_codes,
+            'mentee_codes': mentee_codes,
+            'table': _TABLE_BUILDERS[criterion](mentee_values, mentor_values),
+        }
+    if text:
+        features[TEXT_CRITERION] = _encode_text(mentors, mentees)
+    for criterion in ATTRIBUTE_CRITERIA:
+        if criterion in attributes:
+            features[criterion] = encode_attributes(mentors, mentees, criterion)
+    return features
+
+
+def _table_values(table, row, cols):
+    """Entries table[row, cols] of a dense table or a CSR table with sorted indices"""
+    if not sparse.issparse(table):
+        return table[row][cols]
+    start, stop = table.indptr[row], table.indptr[row + 1]
+    indices = table.indices[start:stop]
+    values = np.zeros(len(cols))
+    if stop > start:
+        found = np.minimum(np.searchsorted(indices, cols), len(indices) - 1)
+        hit = indices[found] == cols
+        values[hit] = table.data[start:stop][found[hit]]
+    return values
+
+
+def _positive_columns(table, row):
+    """Columns of one table row with a positive score"""
+    if not sparse.issparse(table):
+        return np.flatnonzero(table[row] > 0)
+    start, stop = table.indptr[row], table.indptr[row + 1]
+    return table.indices[start:stop][table.data[start:stop] > 0]
+
+
+def component_matrix(features, criterion, mentee_rows=None, mentor_cols=None):
+    """
+    Expand one criterion's table to a full mentee x mentor matrix
+
+    Args:
+        features: Output of encode_features
+        criterion: 'discipline', 'location', 'mode', 'text' or a bitset criterion
+        mentee_rows: Optional index array selecting a subset of mentees
+        mentor_cols: Optional index array selecting a subset of mentors
+
+    Returns:
+        numpy.ndarray: float64 matrix of shape (len(mentee_rows), len(mentor_cols))
+    """
+    encoded = features[criterion]
+    mentee_codes = encoded['mentee_codes']
+    mentor_codes = encoded['mentor_codes']
+    if mentee_rows is not None:
+        mentee_codes = mentee_codes[mentee_rows]
+    if mentor_cols is not None:
+        mentor_codes = mentor_codes[mentor_cols]
+    table = encoded['table']
+    if sparse.issparse(table):
+        return table[mentee_codes][:, mentor_codes].toarray()
+    return table[np.ix_(mentee_codes, mentor_codes)]
+
+
+def feature_groups(features, side):
+    """
+    Group records that share the same code for every criterion
+
+    Records in the same group score identically against any counterpart.
+
+    Args:
+        features: Output of encode_features
+        side: 'mentor' or 'mentee'
+
+    Returns:
+        tuple: (representatives, group_of) where representatives[g] is the
+            index of the first record in group g and group_of[i] is the
+            group of record i
+    """
+    codes = np.stack([features[c][f'{side}_codes'] for c in features], axis=1)
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    _, representatives, group_of = np.unique(
+        codes, axis=0, return_index=True, return_inverse=True
+    )
+    return representatives, group_of.reshape(-1)
+
+
+def weight_features(features, weights):
+    """
+    Scale each criterion's unique-value table by its weight
+
+    Done once per run so that scoring a pair is just a table lookup and a sum.
+
+    Returns:
+        dict: Same layout as encode_features with weighted tables
+    """
+    return {
+        criterion: {
+            **features[criterion],
+            'table': weights.get(criterion, DEFAULT_WEIGHTS[criterion]) * features[criterion]['table']
+        }
+        for criterion in features
+    }
+
+
+def build_score_matrix(features, weights, mentee_rows=None, mentor_cols=None):
+    """
+    Build the weighted mentee x mentor compatibility score matrix
+
+    Produces exactly the same values as calling calculate_compatibility_score
+    for every pair: the weighted components are summed in the same order and
+    the result is capped at 1.0.
+
+    Args:
+        features: Output of encode_features
+        weights: Dict with weights for each attribute (discipline, location, mode, text,
+            background, language, community)
+        mentee_rows: Optional index array selecting a subset of mentees
+        mentor_cols: Optional index array selecting a subset of mentors
+
+    Returns:
+        numpy.ndarray: float64 matrix of shape (num_mentees, num_mentors)
+    """
+    weighted = weight_features(features, weights)
+    scores = None
+    for criterion in features:
+        component = component_matrix(weighted, criterion, mentee_rows, mentor_cols)
+        if scores is None:
+            scores = component
+        else:
+            scores += component
+    np.minimum(scores, 1.0, out=scores)
+    return scores
+
+
+def score_mentee(weighted, mentee_row, mentor_cols):
+    """
+    Score one mentee against selected mentors
+
+    Args:
+        weighted: Output of weight_features
+        mentee_row: Index of the mentee
+        mentor_cols: Index array of mentor positions
+
+    Returns:
+        numpy.ndarray: float64 scores aligned with mentor_cols
+    """
+    scores = None
+    for criterion in weighted:
+        encoded = weighted[criterion]
+        component = _table_values(
+            encoded['table'], encoded['mentee_codes'][mentee_row], encoded['mentor_codes'][mentor_cols]
+        )
+        if scores is None:
+            scores = component
+        else:
+            scores += component
+    np.minimum(scores, 1.0, out=scores)
+    return scores
+
+
+def build_candidate_index(features, weights):
+    """
+    Build an inverted index from mentee feature values to candidate mentors
+
+    For every criterion with a positive weight, each unique normalized mentor
+    value gets a posting list of mentor positions, and each unique mentee
+    value is linked to the mentor values it scores above zero against
+    (distance or token overlap for location, substring overlap for
+    discipline, equality or hybrid for mode, a shared term for text, a
+    shared answer, language or community for the bitset criteria). A
+    mentor that is not reachable through any criterion can only score 0.0,
+    so it never needs to be scored.
+
+    Args:
+        features: Output of encode_features
+        weights: Dict with weights for each attribute (discipline, location, mode, text,
+            background, language, community)
+
+    Returns:
+        dict: {'features', 'postings', 'cache'} used by candidate_mentors
+    """
+    postings = {}
+    for criterion in features:
+        if not weights.get(criterion, DEFAULT_WEIGHTS[criterion]) > 0:
+            continue
+        encoded = features[criterion]
+        mentor_codes = encoded['mentor_codes']
+        order = np.argsort(mentor_codes, kind='stable')
+        bounds = np.searchsorted(
+            mentor_codes[order], np.arange(encoded['table'].shape[1] + 1)
+        )
+        # Mentors with value c are order[bounds[c]:bounds[c + 1]]
+        postings[criterion] = {
+            'order': order,
+            'bounds': bounds,
+            'by_mentee_value': {},
+        }
+    return {
+        'features': features,
+        'postings': postings,
+        'cache': {},
+        'num_mentors': len(features[CRITERIA[0]]['mentor_codes'])
+    }
+
+
+def _mentee_value_postings(index, criterion, mentee_code):
+    """
+    Mentor positions with a positive component score for one mentee value
+
+    Results are cached per mentee value, except for text, where values are
+    nearly unique per record.
+    """
+    posting = index['postings'][criterion]
+    positions = posting['by_mentee_value'].get(mentee_code)
+    if positions is None:
+        matching_values = _positive_columns(index['features'][criterion]['table'], mentee_code)
+        starts = posting['bounds'][matching_values]
+        lengths = posting['bounds'][matching_values + 1] - starts
+        # Concatenate the posting lists of all matching values in one gather
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = posting['order'][offsets + np.arange(len(offsets))]
+        if criterion != TEXT_CRITERION:
+            posting['by_mentee_value'][mentee_code] = positions
+    return positions
+
+
+def candidate_mentors(index, mentee_row):
+    """
+    Look up the mentors that can reach a positive score with one mentee
+
+    Mentees with the same discipline, location and mode values share a
+    cached result. Text is nearly unique per record, and the bitset
+    criteria reach a large share of the mentors, so their candidates are
+    merged in after the cache lookup instead of being part of the key
+    (which would cache a near-full candidate list per mentee).
+
+    Returns:
+        numpy.ndarray: Sorted mentor positions
+    """
+    features = index['features']
+    criteria = [criterion for criterion in index['postings'] if criterion in CRITERIA]
+    key = tuple(
+        int(features[criterion]['mentee_codes'][mentee_row])
+        for criterion in criteria
+    )
+    candidates = index['cache'].get(key)
+    if candidates is None:
+        parts = [
+            _mentee_value_postings(index, criterion, code)
+            for criterion, code in zip(criteria, key)
+        ]
+        if parts:
+            candidates = np.unique(np.concatenate(parts))
+        else:
+            candidates = np.zeros(0, dtype=np.intp)
+        index['cache'][key] = candidates
+    merged = [criterion for criterion in index['postings'] if criterion not in CRITERIA]
+    if merged:
+        reachable = np.zeros(index['num_mentors'], dtype=bool)
+        reachable[candidates] = True
+        for criterion in merged:
+            code = int(features[criterion]['mentee_codes'][mentee_row])
+            reachable[_mentee_value_postings(index, criterion, code)] = True
+        candidates = np.flatnonzero(reachable)
+    return candidates
@@ -0,0 +1,224 @@
+"""
+Location Geocoding for the Matching Algorithm
+Resolves free-text locations against an offline US city gazetteer and scores
+pairs of places by great-circle distance
+"""
+
+import csv
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# US places with at least 5,000 inhabitants, extracted from GeoNames
+# (https://www.geonames.org, CC BY 4.0): name, state, latitude, longitude, population
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'us_cities.csv')
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Location score of two places: halves every DISTANCE_HALF_LIFE_MILES and
+# is 0.0 beyond MAX_MATCH_DISTANCE_MILES (Durham-Raleigh ~0.85,
+# Charlotte-Raleigh ~0.4, Atlanta-Raleigh 0.0)
+DISTANCE_HALF_LIFE_MILES = 100.0
+MAX_MATCH_DISTANCE_MILES = 300.0
+
+US_STATES = {
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR', 'california': 'CA',
+    'colorado': 'CO', 'connecticut': 'CT', 'delaware': 'DE', 'district of columbia': 'DC',
+    'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID', 'illinois': 'IL',
+    'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS', 'kentucky': 'KY', 'louisiana': 'LA',
+    'maine': 'ME', 'maryland': 'MD', 'massachusetts': 'MA', 'michigan': 'MI',
+    'minnesota': 'MN', 'mississippi': 'MS', 'missouri': 'MO', 'montana': 'MT',
+    'nebraska': 'NE', 'nevada': 'NV', 'new hampshire': 'NH', 'new jersey': 'NJ',
+    'new mexico': 'NM', 'new york': 'NY', 'north carolina': 'NC', 'north dakota': 'ND',
+    'ohio': 'OH', 'oklahoma': 'OK', 'oregon': 'OR', 'pennsylvania': 'PA',
+    'rhode island': 'RI', 'south carolina': 'SC', 'south dakota': 'SD', 'tennessee': 'TN',
+    'texas': 'TX', 'utah': 'UT', 'vermont': 'VT', 'virginia': 'VA', 'washington': 'WA',
+    'west virginia': 'WV', 'wisconsin': 'WI', 'wyoming': 'WY',
+}
+STATE_CODES = frozenset(US_STATES.values())
+
+# Common ways of writing places that aren't a gazetteer name
+ALIASES = {
+    'nyc': 'new york city, ny',
+    'new york, ny': 'new york city, ny',
+    'dc': 'washington, dc',
+    'washington dc': 'washington, dc',
+    'sf': 'san francisco, ca',
+    'rtp': 'morrisville, nc',
+    'research triangle park': 'morrisville, nc',
+    'research triangle park, nc': 'morrisville, nc',
+}
+
+_ZIP_CODE = re.compile(r'\b\d{5}(?:-\d{4})?\b')
+
+
+def _normalize(text):
+    """Lowercase, drop periods and ZIP codes, and collapse whitespace"""
+    text = _ZIP_CODE.sub(' ', str(text).lower().replace('.', ''))
+    return ' '.join(text.split()).strip(' ,')
+
+
+def _name_keys(name):
+    """Lookup keys of a place name; 'St' and 'Saint' are interchangeable"""
+    key = _normalize(name)
+    keys = [key]
+    if key.startswith('st '):
+        keys.append('saint ' + key[3:])
+    elif key.startswith('saint '):
+        keys.append('st ' + key[6:])
+    return keys
+
+
+def _split_state(text):
+    """
+    Split "city, state" / "city st" / "city state name" into (city, state code)
+
+    Returns:
+        tuple: (city, state code or None)
+    """
+    if ',' in text:
+        city, _, state = text.partition(',')
+        state = state.strip(' ,')
+        if state in US_STATES:
+            return city.strip(), US_STATES[state]
+        if state.upper() in STATE_CODES:
+            return city.strip(), state.upper()
+        return city.strip(), None
+
+    words = text.split()
+    if len(words) > 1 and words[-1].upper() in STATE_CODES:
+        return ' '.join(words[:-1]), words[-1].upper()
+    for state_name, code in US_STATES.items():
+        if text.endswith(' ' + state_name):
+            return text[:-len(state_name) - 1], code
+    return text, None
+
+
+class Gazetteer:
+    """
+    Offline US place lookup with a KD-tree over place coordinates
+
+    The CSV is loaded on first use. Places are points on the unit sphere,
+    so the tree's Euclidean (chord) distance is monotonic in the
+    great-circle distance and radius queries are exact after converting
+    miles to chord length.
+    """
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.places = []
+        self._by_name = {}
+        self._tree = None
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            places = []
+            by_name = {}
+            with open(self.path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    place = (row['name'], row['state'], float(row['latitude']),
+                             float(row['longitude']), int(row['population']))
+                    for key in _name_keys(place[0]):
+                        by_name.setdefault(key, []).append(len(places))
+                    places.append(place)
+            # Unqualified names resolve to the most populous place
+            for indices in by_name.values():
+                indices.sort(key=lambda i: -places[i][4])
+
+            latitudes = np.radians([place[2] for place in places])
+            longitudes = np.radians([place[3] for place in places])
+            points = np.column_stack([
+                np.cos(latitudes) * np.cos(longitudes),
+                np.cos(latitudes) * np.sin(longitudes),
+                np.sin(latitudes)
+            ])
+            self.places = places
+            self._by_name = by_name
+            self._tree = cKDTree(points)
+            self._loaded = True
+
+    @lru_cache(maxsize=65536)
+    def resolve(self, location):
+        """
+        Look up a free-text location
+
+        Accepts "City, ST", "City, State", "City ST" and bare city names;
+        ZIP codes and periods are ignored. State-only values ("NC",
+        "North Carolina") and non-places ("Remote") do not resolve.
+
+        Returns:
+            int: Index into places, or None if the location is not a known city
+        """
+        if not self._loaded:
+            self._load()
+        text = _normalize(location)
+        text = ALIASES.get(text, text)
+        if not text or text in US_STATES or text.upper() in STATE_CODES:
+            return None
+        city, state = _split_state(text)
+        for index in self._by_name.get(_normalize(city), ()):
+            if state is None or self.places[index][1] == state:
+                return index
+        return None
+
+    @lru_cache(maxsize=65536)
+    def nearby(self, place, miles=MAX_MATCH_DISTANCE_MILES):
+        """
+        Places within miles of a place, through the KD-tree
+
+        Returns:
+            list: Place indices, including the place itself
+        """
+        chord = 2 * math.sin(min(miles / EARTH_RADIUS_MILES, math.pi) / 2)
+        return self._tree.query_ball_point(self._tree.data[place], chord * (1 + 1e-9))
+
+
+def haversine_miles(place_a, place_b):
+    """Great-circle distance in miles between two gazetteer places"""
+    _, _, lat_a, lon_a, _ = GAZETTEER.places[place_a]
+    _, _, lat_b, lon_b, _ = GAZETTEER.places[place_b]
+    phi_a, phi_b = math.radians(lat_a), math.radians(lat_b)
+    half_dphi = (phi_b - phi_a) / 2
+    half_dlambda = math.radians(lon_b - lon_a) / 2
+    h = math.sin(half_dphi) ** 2 + math.cos(phi_a) * math.cos(phi_b) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(h)))
+
+
+@lru_cache(maxsize=262144)
+def distance_score(mentee_place, mentor_place):
+    """Location score of two gazetteer places, from 1.0 (same place) down to 0.0"""
+    miles = haversine_miles(mentee_place, mentor_place)
+    if miles > MAX_MATCH_DISTANCE_MILES:
+        return 0.0
+    return 0.5 ** (miles / DISTANCE_HALF_LIFE_MILES)
+
+
+def geographic_score(mentee_location, mentor_location):
+    """
+    Distance-based location score of two free-text locations
+
+    Returns:
+        float: Score from distance_score, or None when either location
+            does not resolve to a gazetteer place
+    """
+    mentee_place = GAZETTEER.resolve(mentee_location)
+    if mentee_place is None:
+        return None
+    mentor_place = GAZETTEER.resolve(mentor_location)
+    if mentor_place is None:
+        return None
+    return distance_score(mentee_place, mentor_place)
+
+
+# Loaded on first use and shared by every matching run in the process
+GAZETTEER = Gazetteer()
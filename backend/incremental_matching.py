@@ -0,0 +1,183 @@
+"""
+Incremental Re-Matching for Alumni Mentorship Matching Platform
+Re-places only the mentees affected by record changes since the last run
+"""
+
+from collections import Counter, defaultdict
+
+from feature_encoding import text_weighted
+from matching_logic import (
+    DEFAULT_TOP_K,
+    calculate_compatibility_score,
+    parse_max_mentees,
+    run_matching_algorithm
+)
+from text_similarity import TEXT_VECTORIZER
+
+
+def _is_verified(match):
+    return bool(match.get('verified')) or match.get('status') == 'verified'
+
+
+def _first_by_id(records, key='id'):
+    by_id = {}
+    for record in records:
+        by_id.setdefault(record.get(key), record)
+    return by_id
+
+
+def run_incremental_matching(mentors, mentees, match_data, weights, top_k=DEFAULT_TOP_K):
+    """
+    Update an existing assignment after mentors or mentees changed
+
+    Existing matches are kept, with their mentor capacity still counted,
+    unless one of the following applies to a pending match:
+        - its mentor was deleted ('mentor_removed')
+        - the pair's score under the current records and weights differs
+          from the stored score, i.e. an edit changed it ('score_changed')
+        - its mentor's max_mentees dropped below the number of kept matches;
+          the lowest-scoring pending matches are released ('over_capacity')
+    Verified matches are always kept unless their mentor or mentee was
+    deleted. The released mentees, previously unmatched mentees
+    ('unmatched_retry') and mentees with no entry at all, i.e. added since
+    the last run or whose match was deleted with its mentor ('unassigned'),
+    are then placed greedily, in mentees.json order, into the remaining
+    capacity.
+
+    With a text weight, the text similarity depends on the IDF of all
+    current records, so adding or deleting records can change the score of
+    pending matches whose text shares affected terms ('score_changed').
+
+    Args:
+        mentors: List of mentor dictionaries
+        mentees: List of mentee dictionaries
+        match_data: Current match document (matches, unmatched_mentees, ...)
+        weights: Dict with weights for matching criteria
+        top_k: Number of ranked candidates kept per re-placed mentee
+
+    Returns:
+        tuple: (match_data, diff)
+            match_data: Updated match document, ordered like mentees.json
+            diff: Summary plus one entry per mentee whose match changed
+    """
+    mentors_by_id = _first_by_id(mentors)
+    mentees_by_id = _first_by_id(mentees)
+    previous = _first_by_id(match_data.get('matches', []), 'mentee_id')
+    previously_unmatched = {m.get('id') for m in match_data.get('unmatched_mentees', [])}
+
+    kept = {}
+    reasons = {}
+    removed = sorted(
+        (mentee_id for mentee_id in set(previous) | previously_unmatched
+         if mentee_id not in mentees_by_id),
+        key=str
+    )
+
+    # Score checks below use the IDF of the current records
+    if text_weighted(weights):
+        TEXT_VECTORIZER.fit(mentors, mentees)
+
+    # Keep matches whose mentor still exists and whose score is unchanged
+    for mentee_id, match in previous.items():
+        if mentee_id not in mentees_by_id:
+            continue
+        mentor = mentors_by_id.get(match.get('mentor_id'))
+        if mentor is None:
+            reasons[mentee_id] = 'mentor_removed'
+        elif _is_verified(match):
+            kept[mentee_id] = match
+        elif calculate_compatibility_score(mentor, mentees_by_id[mentee_id], weights) != match.get('score'):
+            reasons[mentee_id] = 'score_changed'
+        else:
+            kept[mentee_id] = match
+
+    # Release the lowest-scoring pending matches of mentors over capacity
+    by_mentor = defaultdict(list)
+    for mentee_id, match in kept.items():
+        by_mentor[match['mentor_id']].append(mentee_id)
+    load = Counter()
+    for mentor_id, mentee_ids in by_mentor.items():
+        overflow = len(mentee_ids) - max(parse_max_mentees(mentors_by_id[mentor_id]), 0)
+        if overflow > 0:
+            pending = [i for i in mentee_ids if not _is_verified(kept[i])]
+            pending.sort(key=lambda i: kept[i].get('score', 0))
+            for mentee_id in pending[:overflow]:
+                del kept[mentee_id]
+                reasons[mentee_id] = 'over_capacity'
+        load[mentor_id] = sum(1 for i in mentee_ids if i in kept)
+
+    # Everyone without a kept match is re-placed
+    affected = []
+    seen = set()
+    for mentee in mentees:
+        mentee_id = mentee.get('id')
+        if mentee_id in kept or mentee_id in seen:
+            continue
+        seen.add(mentee_id)
+        if mentee_id not in reasons:
+            reasons[mentee_id] = 'unmatched_retry' if mentee_id in previously_unmatched else 'unassigned'
+        affected.append(mentee)
+
+    placed, _ = run_matching_algorithm(
+        mentors, affected, weights, top_k, initial_load=load
+    )
+    placed = {match['mentee_id']: match for match in placed}
+
+    # Rebuild the document in mentees.json order
+    matches = []
+    unmatched_mentees = []
+    for mentee in mentees:
+        mentee_id = mentee.get('id')
+        match = kept.get(mentee_id) or placed.get(mentee_id)
+        if match is not None:
+            matches.append(match)
+        else:
+            unmatched_mentees.append({'id': mentee_id, 'name': mentee.get('name', 'Unknown')})
+
+    changes = []
+    for mentee in affected:
+        mentee_id = mentee['id']
+        before = previous.get(mentee_id)
+        after = placed.get(mentee_id)
+        before_mentor = before.get('mentor_id') if before else None
+        after_mentor = after.get('mentor_id') if after else None
+        before_score = before.get('score') if before else None
+        after_score = after.get('score') if after else None
+
+        if before_mentor is None and after_mentor is None:
+            continue
+        if before_mentor is None:
+            change = 'assigned'
+        elif after_mentor is None:
+            change = 'unmatched'
+        elif before_mentor != after_mentor:
+            change = 'reassigned'
+        elif before_score != after_score:
+            change = 'rescored'
+        else:
+            continue
+
+        changes.append({
+            'mentee_id': mentee_id,
+            'change': change,
+            'reason': reasons[mentee_id],
+            'previous_mentor_id': before_mentor,
+            'mentor_id': after_mentor,
+            'previous_score': before_score,
+            'score': after_score
+        })
+
+    updated = dict(match_data)
+    updated['matches'] = matches
+    updated['unmatched_mentees'] = unmatched_mentees
+    updated['weights'] = weights
+
+    diff = {
+        'kept': len(kept),
+        'preserved_verified': sum(1 for match in kept.values() if _is_verified(match)),
+        'reprocessed': len(affected),
+        'reasons': dict(Counter(reasons[m['id']] for m in affected)),
+        'removed_mentees': removed,
+        'changes': changes
+    }
+    return updated, diff
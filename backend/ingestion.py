@@ -0,0 +1,141 @@
+"""
+CSV Ingestion for Alumni Mentorship Matching Platform
+Streams Google Form exports row by row into normalized mentor/mentee records
+"""
+
+import codecs
+import csv
+
+
+# Long Google Form questions mapped to the fields used by the matcher.
+# Headers are compared lowercased and trimmed; the first non-empty column wins.
+MENTEE_FIELD_COLUMNS = {
+    'discipline': ['discipline', 'major(s)', 'major', 'major(s).'],
+    'location': ['location', 'location of interest after graduation'],
+}
+
+MENTOR_FIELD_COLUMNS = {
+    'discipline': ['discipline', 'primary industry/field', 'degree(s) and preferred class year(s)'],
+    'location': ['location', 'city and state'],
+}
+
+MENTEE_MODE_COLUMN = 'which way would you prefer to meet with your mentor?'
+MENTOR_MODE_COLUMN = 'what type of mentorship format do you prefer?'
+MENTOR_CAPACITY_COLUMN = 'are you open to mentoring multiple students?'
+
+
+def map_mode(value):
+    """Map a free-text meeting preference to Hybrid, Remote or In-Person"""
+    if not value:
+        return ''
+    v = value.lower()
+    # Values like "Virtual, In-person" -> Hybrid
+    if 'virtual' in v and ('in-person' in v or 'in person' in v):
+        return 'Hybrid'
+    if 'virtual' in v or 'zoom' in v or 'google meet' in v:
+        return 'Remote'
+    if 'in-person' in v or 'in person' in v:
+        return 'In-Person'
+    if 'no preference' in v:
+        return 'Hybrid'
+    return ''
+
+
+def map_capacity(value):
+    """Map the 'open to mentoring multiple students?' answer to max_mentees"""
+    answer = (value or '').lower()
+    if answer.startswith('yes'):
+        return 3
+    if answer.startswith('maybe'):
+        return 2
+    return 1
+
+
+def _first_value(record, columns):
+    for column in columns:
+        if record.get(column):
+            return record[column]
+    return ''
+
+
+def normalize_record(record, data_type):
+    """
+    Add the normalized matching fields to a raw CSV record
+
+    All original columns are preserved, same as the CSV upload on the Data
+    Management page.
+
+    Args:
+        record: Dict of lowercased header -> trimmed value
+        data_type: 'mentor' or 'mentee'
+
+    Returns:
+        dict: The record with discipline, location, mode and status
+            (plus max_mentees and current_mentees for mentors)
+    """
+    normalized = dict(record)
+    field_columns = MENTOR_FIELD_COLUMNS if data_type == 'mentor' else MENTEE_FIELD_COLUMNS
+    for field, columns in field_columns.items():
+        normalized[field] = _first_value(record, columns)
+
+    if data_type == 'mentor':
+        normalized['mode'] = record.get('mode') or map_mode(record.get(MENTOR_MODE_COLUMN))
+        normalized['max_mentees'] = map_capacity(record.get(MENTOR_CAPACITY_COLUMN))
+        normalized['current_mentees'] = 0
+    else:
+        normalized['mode'] = record.get('mode') or map_mode(record.get(MENTEE_MODE_COLUMN))
+
+    normalized['status'] = record.get('status') or 'active'
+    return normalized
+
+
+def iter_csv_records(stream, data_type, stats=None):
+    """
+    Parse a CSV byte stream one row at a time
+
+    Quoted fields may contain commas and newlines. Blank rows and rows
+    without a name (or first/last name) are skipped. Only the current row
+    is held in memory.
+
+    Args:
+        stream: Binary file-like object with the CSV export
+        data_type: 'mentor' or 'mentee'
+        stats: Optional dict; 'rows' and 'skipped' counters are updated in it
+
+    Yields:
+        dict: Normalized records in file order
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('rows', 0)
+    stats.setdefault('skipped', 0)
+
+    reader = csv.reader(codecs.getreader('utf-8-sig')(stream, errors='replace'))
+    headers = None
+    for row in reader:
+        if headers is None:
+            headers = [header.strip().lower() for header in row]
+            continue
+        if not any(value.strip() for value in row):
+            continue
+
+        stats['rows'] += 1
+        record = {
+            header: (row[i] if i < len(row) else '').strip()
+            for i, header in enumerate(headers)
+        }
+
+        # Derive a generic "name" field if the CSV uses first/last name columns
+        if not record.get('name'):
+            first_name = record.get('first name') or record.get('firstname') or ''
+            last_name = record.get('last name') or record.get('lastname') or ''
+            combined = f'{first_name} {last_name}'.strip()
+            if combined:
+                record['name'] = combined
+
+        # Skip rows that still don't have a name field
+        if not record.get('name'):
+            stats['skipped'] += 1
+            continue
+
+        yield normalize_record(record, data_type)
@@ -0,0 +1,228 @@
+"""
+Background Matching Jobs for Alumni Mentorship Matching Platform
+Runs matching outside the request and tracks progress for polling
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from matching_logic import execute_matching, summarize_scores
+from metrics import observe_matching_phases
+from run_history import input_hash
+
+
+# Job states reported by /api/matching-jobs/<job_id>
+ACTIVE_STATES = ('queued', 'running')
+
+
+class MatchingJobManager:
+    """
+    Runs matching jobs on a small worker pool
+
+    A job reads mentors and mentees through the cache, runs the matcher
+    with a progress callback and saves the whole match document with one
+    save_match_data call, so readers see either the old or the new result.
+    If mentors or mentees change while the job runs, the result is
+    discarded instead of saved.
+
+    Jobs are identified by a key built from the weights, options and data
+    versions; submitting a job whose key matches a queued or running job
+    returns that job instead of starting another one. With a result cache,
+    a job whose inputs were matched before reuses that result. With a run
+    history, each saved result is recorded as a version.
+    """
+
+    def __init__(self, storage, cache, max_workers=2, max_finished_jobs=50, result_cache=None,
+                 run_history=None):
+        self.storage = storage
+        self.cache = cache
+        self.result_cache = result_cache
+        self.run_history = run_history
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='matching-job')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._active_by_key = {}
+
+    def _input_versions(self):
+        versions = self.storage.data_versions()
+        return {'mentor': versions['mentor'], 'mentee': versions['mentee']}
+
+    def _job_key(self, weights, algorithm, top_k, input_versions):
+        payload = json.dumps(
+            {
+                'weights': weights,
+                'algorithm': algorithm,
+                'top_k': top_k,
+                'versions': {k: str(v) for k, v in input_versions.items()}
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def submit(self, weights, algorithm, top_k, workers=1, use_cache=True):
+        """
+        Queue a matching run, or join an identical one already in progress
+
+        The worker count and use_cache only affect speed, not the result,
+        so they are not part of the job key.
+
+        Returns:
+            tuple: (job status dict, coalesced) where coalesced is True if an
+                existing job was returned
+        """
+        input_versions = self._input_versions()
+        key = self._job_key(weights, algorithm, top_k, input_versions)
+
+        with self._lock:
+            existing_id = self._active_by_key.get(key)
+            if existing_id is not None:
+                return self._describe(self._jobs[existing_id]), True
+
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'key': key,
+                'status': 'queued',
+                'algorithm': algorithm,
+                'weights': weights,
+                'top_k': top_k,
+                'workers': workers,
+                'use_cache': use_cache and self.result_cache is not None,
+                'input_versions': input_versions,
+                'processed': 0,
+                'total': None,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self._jobs[job['job_id']] = job
+            self._active_by_key[key] = job['job_id']
+            self._prune()
+
+        self._executor.submit(self._run, job)
+        return self._describe(job), False
+
+    def _run(self, job):
+        """Worker body: run the matcher and commit the result"""
+        def progress(processed, total):
+            job['processed'] = processed
+            job['total'] = total
+
+        try:
+            job['started_at'] = time.time()
+            job['status'] = 'running'
+
+            began = time.perf_counter()
+            key = cached = None
+            mentors, mentor_hash = self.cache.get_records_and_hash('mentor')
+            mentees, mentee_hash = self.cache.get_records_and_hash('mentee')
+            if job['use_cache']:
+                key = self.result_cache.key(mentor_hash, mentee_hash, job['weights'],
+                                            job['algorithm'], job['top_k'])
+                cached = self.result_cache.get(key)
+            job['total'] = len(mentees)
+            phases = {'load': time.perf_counter() - began}
+
+            parallel_stats = {}
+            if cached is not None:
+                match_data, comparison = cached
+                progress(len(mentees), len(mentees))
+            else:
+                match_data, comparison = execute_matching(
+                    mentors, mentees, job['weights'], job['algorithm'], job['top_k'], progress,
+                    workers=job['workers'], stats=parallel_stats, phases=phases
+                )
+                if key is not None:
+                    self.result_cache.put(key, match_data, comparison)
+
+            if self._input_versions() != job['input_versions']:
+                raise RuntimeError('Mentors or mentees changed while matching was running; '
+                                   'run matching again')
+
+            began = time.perf_counter()
+            if cached is None or not self.result_cache.is_saved(
+                    key, self.storage.data_versions()['matches']):
+                self.storage.save_match_data(match_data)
+                if key is not None:
+                    self.result_cache.mark_saved(key, self.storage.data_versions()['matches'])
+            phases['persist'] = time.perf_counter() - began
+            if cached is None:
+                observe_matching_phases(job['algorithm'], phases)
+
+            run_id = None
+            if self.run_history is not None:
+                run_id = self.run_history.record(
+                    match_data, input_hash(mentor_hash, mentee_hash), job['weights'],
+                    job['algorithm'], job['top_k'], 'job'
+                )['id']
+
+            job['result'] = {
+                'run_id': run_id,
+                'cached': cached is not None,
+                'total_matches': len(match_data['matches']),
+                'total_unmatched': len(match_data['unmatched_mentees']),
+                **summarize_scores(match_data['matches'])
+            }
+            if comparison:
+                job['result']['comparison'] = comparison
+            if parallel_stats:
+                job['result']['parallel'] = parallel_stats
+            job['status'] = 'completed'
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = time.time()
+            with self._lock:
+                if self._active_by_key.get(job['key']) == job['job_id']:
+                    del self._active_by_key[job['key']]
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job['status'] not in ACTIVE_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _describe(self, job):
+        """Public view of a job with elapsed time and ETA"""
+        now = time.time()
+        started_at = job['started_at']
+        finished_at = job['finished_at']
+        elapsed = ((finished_at or now) - started_at) if started_at else 0.0
+
+        eta = None
+        if job['status'] == 'running' and job['processed'] and job['total']:
+            remaining = job['total'] - job['processed']
+            eta = round(elapsed / job['processed'] * remaining, 3)
+        elif job['status'] == 'completed':
+            eta = 0.0
+
+        description = {
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'algorithm': job['algorithm'],
+            'processed': job['processed'],
+            'total': job['total'],
+            'elapsed_seconds': round(elapsed, 3),
+            'eta_seconds': eta
+        }
+        if job['result'] is not None:
+            description['result'] = job['result']
+        if job['error'] is not None:
+            description['error'] = job['error']
+        return description
+
+    def get(self, job_id):
+        """Get a job's status, or None if it is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._describe(job) if job else None
@@ -0,0 +1,503 @@
+"""
+Match Journal for Alumni Mentorship Matching Platform
+Keeps the match document as a binary snapshot plus an append-only log of changes
+"""
+
+import gc
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+
+SNAPSHOT_MAGIC = b'MMSNAP1\n'
+JOURNAL_MAGIC = b'MMJOURNAL1 '
+_GENERATION = struct.Struct('<Q')
+
+# The log is folded into a new snapshot once it is larger than both this
+# and the snapshot itself, so a replay never costs more than a snapshot load
+COMPACT_MIN_BYTES = 1 * 2 ** 20
+
+# Seconds between fsyncs of the log; appends in between share one fsync.
+# 0 syncs every append before it returns
+DEFAULT_SYNC_INTERVAL = 0.05
+
+
+def _empty_document():
+    return {'matches': [], 'unmatched_mentees': [], 'weights': {}}
+
+
+@contextmanager
+def _gc_paused():
+    # Unpickling allocates one container per match; without this the cyclic
+    # collector runs over the growing document many times and doubles the
+    # load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _copy(value):
+    # The document only holds JSON types; a pickle round trip copies it
+    # several times faster than copy.deepcopy or json
+    payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    with _gc_paused():
+        return pickle.loads(payload)
+
+
+def _pair(match):
+    return (match.get('mentee_id'), match.get('mentor_id'))
+
+
+class PairIndex:
+    """Row of the first match for each (mentee_id, mentor_id) pair"""
+
+    def __init__(self, matches):
+        self.matches = matches
+        # Built back to front so the first match of a pair wins
+        self.rows = {_pair(matches[row]): row for row in range(len(matches) - 1, -1, -1)}
+        # Saved documents have one match per pair; only with duplicates does
+        # moving a match need a scan for the pair's next match
+        self.has_duplicates = len(self.rows) < len(matches)
+
+    def first(self, pair):
+        """Row of the first match for a pair, or None"""
+        return self.rows.get(pair)
+
+    def move(self, row, old_pair, new_pair):
+        """Re-index a match whose mentee_id or mentor_id changed"""
+        if self.rows.get(old_pair) == row:
+            del self.rows[old_pair]
+            if self.has_duplicates:
+                for other, match in enumerate(self.matches):
+                    if _pair(match) == old_pair:
+                        self.rows[old_pair] = other
+                        break
+        current = self.rows.get(new_pair)
+        if current is None or row < current:
+            self.rows[new_pair] = row
+        if current is not None:
+            self.has_duplicates = True
+
+
+def apply_operation(document, operation, index=None):
+    """
+    Apply one logged operation to the match document in place
+
+    Operations:
+        update: changes is a list of [mentee_id, mentor_id, updates]; each
+            applies to the first match for that pair as it was before the
+            operation (like storage.update_matches)
+        delete_references: drop matches (and, for a mentee, the unmatched
+            entry) that reference record id of type data_type
+        clear_references: drop every match, and for 'mentee' every
+            unmatched entry
+
+    Args:
+        document: Match document
+        operation: Operation dict with 'op'
+        index: PairIndex over document['matches'], kept up to date by
+            updates; delete and clear replace the list, so the caller
+            rebuilds it after those
+
+    Returns:
+        bool: False, with the document unchanged, if an update names a pair
+            that has no match
+    """
+    kind = operation['op']
+    if kind == 'update':
+        if index is None:
+            index = PairIndex(document.get('matches', []))
+        rows = [index.first((mentee_id, mentor_id))
+                for mentee_id, mentor_id, _ in operation['changes']]
+        if any(row is None for row in rows):
+            return False
+        for row, (_, _, updates) in zip(rows, operation['changes']):
+            match = index.matches[row]
+            old_pair = _pair(match)
+            match.update(updates)
+            if _pair(match) != old_pair:
+                index.move(row, old_pair, _pair(match))
+    elif kind == 'delete_references':
+        record_id = operation['id']
+        key = 'mentor_id' if operation['data_type'] == 'mentor' else 'mentee_id'
+        document['matches'] = [m for m in document.get('matches', []) if m.get(key) != record_id]
+        if operation['data_type'] == 'mentee':
+            document['unmatched_mentees'] = [
+                m for m in document.get('unmatched_mentees', []) if m.get('id') != record_id
+            ]
+    elif kind == 'clear_references':
+        document['matches'] = []
+        if operation['data_type'] == 'mentee':
+            document['unmatched_mentees'] = []
+    else:
+        raise ValueError(f'Unknown journal operation "{kind}"')
+    return True
+
+
+def _encode_entry(operation):
+    payload = json.dumps(operation, separators=(',', ':')).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+
+def _decode_entries(data):
+    """
+    Parse complete, intact log lines from the start of data
+
+    Returns:
+        tuple: (operations, bytes consumed); parsing stops at a partial or
+            corrupt line, which is what a crash mid-append leaves behind
+    """
+    operations = []
+    consumed = 0
+    while True:
+        end = data.find(b'\n', consumed)
+        if end < 0:
+            break
+        line = data[consumed:end]
+        if len(line) < 10 or line[8:9] != b' ':
+            break
+        try:
+            checksum = int(line[:8], 16)
+        except ValueError:
+            break
+        payload = line[9:]
+        if zlib.crc32(payload) != checksum:
+            break
+        operations.append(json.loads(payload))
+        consumed = end + 1
+    return operations, consumed
+
+
+def _file_token(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _fsync_directory(path):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MatchJournal:
+    """
+    Match document stored as a snapshot plus an append-only change log
+
+    <base>.snapshot holds the whole document, pickled after a small header
+    with its generation number, and is memory-mapped to load. <base>.journal
+    starts with the generation of the snapshot it extends, followed by one
+    line per change (approve, reassign, delete, clear), each a CRC-32
+    checksum and a JSON operation. A change is a single append, and appends
+    that land within sync_interval of each other share one fsync.
+
+    Replacing the document (a matching run) or a log that has outgrown the
+    snapshot writes a new snapshot and an empty log for the next
+    generation, each to a temporary file that is fsynced and renamed into
+    place. A log whose generation is older than the snapshot's was already
+    folded in and is ignored. A crash can therefore only leave a partial
+    last log line, which fails its checksum and is dropped.
+
+    Each process keeps the document in memory and, before every read or
+    write, replays only what other processes appended since. Writers hold
+    an exclusive lock on <base>.lock (POSIX) so appends and compactions of
+    several workers don't interleave.
+    """
+
+    def __init__(self, base_path, sync_interval=DEFAULT_SYNC_INTERVAL, legacy_file=None):
+        """
+        Args:
+            base_path: Path prefix of the snapshot, journal and lock files
+            sync_interval: Seconds between fsyncs of the log (0: every append)
+            legacy_file: Whole-document JSON file (matches.json) imported as
+                the first snapshot when there is none yet
+        """
+        self.snapshot_path = f'{base_path}.snapshot'
+        self.journal_path = f'{base_path}.journal'
+        self.lock_path = f'{base_path}.lock'
+        self.sync_interval = sync_interval
+        self.legacy_file = legacy_file
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._document = None
+        self._index = None
+        self._generation = None
+        self._snapshot_token = None
+        self._journal_inode = None
+        self._offset = 0
+        self._torn = False
+        self._snapshot_size = 0
+        self._sync_pending = threading.Event()
+        self._syncer = None
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the thread lock and, where supported, the cross-process file lock"""
+        with self._lock:
+            if fcntl is None or self._lock_depth:
+                # flock isn't reentrant across two opens of the lock file
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_atomic(self, path, chunks):
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _write_generation(self, document, generation):
+        """Write the snapshot and an empty log for a new generation"""
+        payload = pickle.dumps(document, pickle.HIGHEST_PROTOCOL)
+        self._write_atomic(self.snapshot_path,
+                           (SNAPSHOT_MAGIC, _GENERATION.pack(generation), payload))
+        self._write_atomic(self.journal_path, (JOURNAL_MAGIC + b'%d\n' % generation,))
+        _fsync_directory(os.path.dirname(os.path.abspath(self.snapshot_path)))
+
+    def _read_snapshot(self):
+        """
+        Returns:
+            tuple: (generation, document, size), or None without a snapshot
+        """
+        try:
+            f = open(self.snapshot_path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header = len(SNAPSHOT_MAGIC) + _GENERATION.size
+            if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError(f'{self.snapshot_path} is not a match snapshot')
+            generation = _GENERATION.unpack(mapped[len(SNAPSHOT_MAGIC):header])[0]
+            with memoryview(mapped) as view, _gc_paused():
+                document = pickle.loads(view[header:])
+            return generation, document, len(mapped)
+
+    def _create(self):
+        """Write generation 1 from the legacy JSON file, or an empty document"""
+        document = _empty_document()
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+            if isinstance(legacy, dict):
+                document = legacy
+        self._write_generation(document, 1)
+
+    def _refresh(self, repair=False):
+        """
+        Bring the in-memory document up to date with the files
+
+        Reloads the snapshot if it was replaced and replays log lines
+        appended since the last refresh. With repair (only while holding
+        the exclusive lock), a partial last line is truncated away.
+        """
+        self.initialize()
+        snapshot_token = _file_token(self.snapshot_path)
+
+        if snapshot_token != self._snapshot_token:
+            generation, document, size = self._read_snapshot()
+            self._document = document
+            self._index = None
+            self._generation = generation
+            self._snapshot_size = size
+            self._snapshot_token = snapshot_token
+            self._journal_inode = None
+            self._offset = 0
+
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            f = None
+        if f is None or not self._read_journal(f):
+            if repair:
+                # Missing, or a log the snapshot already includes (a crash
+                # between the two renames of a compaction)
+                header = JOURNAL_MAGIC + b'%d\n' % self._generation
+                self._write_atomic(self.journal_path, (header,))
+                self._journal_inode = os.stat(self.journal_path).st_ino
+                self._offset = len(header)
+            return
+        if repair and self._torn:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self._offset)
+            self._torn = False
+
+    def _read_journal(self, f):
+        """
+        Replay log lines appended since the last read
+
+        Returns:
+            bool: False if the log doesn't belong to the current snapshot
+        """
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._journal_inode:
+                header = f.readline()
+                if (not header.startswith(JOURNAL_MAGIC) or not header.endswith(b'\n')
+                        or int(header[len(JOURNAL_MAGIC):]) != self._generation):
+                    return False
+                self._journal_inode = inode
+                self._offset = len(header)
+            f.seek(self._offset)
+            tail = f.read()
+        operations, consumed = _decode_entries(tail)
+        for operation in operations:
+            self._apply(operation)
+        self._offset += consumed
+        self._torn = consumed < len(tail)
+        return True
+
+    def _request_sync(self):
+        if self.sync_interval <= 0:
+            self.sync()
+            return
+        if self._syncer is None:
+            self._syncer = threading.Thread(target=self._sync_loop, name='match-journal-sync',
+                                            daemon=True)
+            self._syncer.start()
+        self._sync_pending.set()
+
+    def _sync_loop(self):
+        while True:
+            self._sync_pending.wait()
+            self._sync_pending.clear()
+            self.sync()
+            # Appends during the interval are covered by the next fsync
+            time.sleep(self.sync_interval)
+
+    def sync(self):
+        """fsync the log so every append so far survives a power loss"""
+        try:
+            fd = os.open(self.journal_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def version_token(self):
+        """Change token of the snapshot and log files, cheap enough to check per request"""
+        return (_file_token(self.snapshot_path), _file_token(self.journal_path))
+
+    def initialize(self):
+        """
+        Create the first snapshot if there is none yet
+
+        The document itself is loaded on first use, so starting a worker
+        doesn't read it.
+        """
+        if _file_token(self.snapshot_path) is None:
+            with self._exclusive():
+                if _file_token(self.snapshot_path) is None:
+                    self._create()
+
+    def read(self):
+        """Get a copy of the current match document"""
+        with self._lock:
+            self._refresh()
+            return _copy(self._document)
+
+    def find(self, mentee_id, mentor_id):
+        """Get a copy of the first match for a (mentee, mentor) pair, or None"""
+        with self._lock:
+            self._refresh()
+            index = self._pair_index()
+            row = index.first((mentee_id, mentor_id))
+            return _copy(index.matches[row]) if row is not None else None
+
+    def _pair_index(self):
+        # Built on first use, so loading for reads alone doesn't pay for it
+        if self._index is None:
+            self._index = PairIndex(self._document.get('matches', []))
+        return self._index
+
+    def _apply(self, operation):
+        if operation['op'] != 'update':
+            self._index = None
+            return apply_operation(self._document, operation)
+        return apply_operation(self._document, operation, self._pair_index())
+
+    def append(self, operation):
+        """
+        Apply an operation and append it to the log
+
+        Returns:
+            bool: False, with nothing written, if the operation doesn't apply
+                (see apply_operation)
+        """
+        with self._exclusive():
+            self._refresh(repair=True)
+            if not self._apply(operation):
+                return False
+            entry = _encode_entry(operation)
+            try:
+                with open(self.journal_path, 'ab') as f:
+                    f.write(entry)
+            except OSError:
+                # The in-memory document is ahead of the files; reload it
+                self._snapshot_token = None
+                raise
+            self._offset += len(entry)
+            if self._offset > max(COMPACT_MIN_BYTES, self._snapshot_size):
+                self._start_generation(self._document)
+            else:
+                self._request_sync()
+            return True
+
+    def replace(self, document):
+        """Replace the whole document with a new snapshot"""
+        with self._exclusive():
+            self._refresh(repair=True)
+            self._start_generation(_copy(document))
+
+    def compact(self):
+        """Fold the log into a new snapshot"""
+        with self._exclusive():
+            self._refresh(repair=True)
+            self._start_generation(self._document)
+
+    def _start_generation(self, document):
+        generation = self._generation + 1
+        self._write_generation(document, generation)
+        self._document = document
+        self._index = None
+        self._generation = generation
+        self._snapshot_token = _file_token(self.snapshot_path)
+        self._snapshot_size = self._snapshot_token[2]
+        self._journal_inode = None
+        self._offset = 0
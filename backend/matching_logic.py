@@ -3,6 +3,32 @@ Matching Algorithm for Alumni Mentorship Matching Platform
 Implements weighted scoring based on discipline, location, and mode preferences
 """
 
+import time
+from collections import deque
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+from feature_encoding import (
+    encode_features,
+    weight_features,
+    build_score_matrix,
+    score_mentee,
+    feature_groups,
+    build_candidate_index,
+    candidate_mentors,
+    text_weighted,
+    weighted_attributes
+)
+from attribute_bitsets import ATTRIBUTE_CRITERIA, attribute_affinity
+from geocoding import geographic_score
+from record_store import factorize_field, field_values
+from text_similarity import TEXT_VECTORIZER
+
+# Default number of ranked candidates per mentee: the match plus 3 alternatives
+DEFAULT_TOP_K = 4
+
 
 def calculate_compatibility_score(mentor, mentee, weights):
     """
@@ -11,10 +37,18 @@ def calculate_compatibility_score(mentor, mentee, weights):
     Args:
         mentor: Dict with mentor attributes (discipline, location, mode, max_mentees, current_mentees)
         mentee: Dict with mentee attributes (discipline, location, mode)
-        weights: Dict with weights for each attribute (discipline, location, mode)
+        weights: Dict with weights for each attribute (discipline, location, mode, text,
+            background, language, community)
     
     Returns:
         float: Compatibility score (0.0 to 1.0)
+    
+    The text component (TF-IDF cosine similarity of the long-form answers)
+    is only computed when weights['text'] is positive, using the IDF of
+    the records last passed to TEXT_VECTORIZER.fit(). The background,
+    language and community components (share of the mentee's "yes" answers,
+    languages other than English and volunteer communities that the mentor
+    shares) are likewise only computed when their weight is positive.
     """
     score = 0.0
     
@@ -29,17 +63,21 @@ def calculate_compatibility_score(mentor, mentee, weights):
     
     score += weights.get('discipline', 0.4) * discipline_score
     
-    # Location match (exact match = 1.0, same country/region = 0.5, no match = 0.0)
+    # Location match (exact match = 1.0; known cities decay with distance,
+    # see geocoding.py; otherwise shared word = 0.5, no match = 0.0)
     mentor_location = mentor.get('location', '').lower()
     mentee_location = mentee.get('location', '').lower()
     
     if mentor_location == mentee_location:
         location_score = 1.0
-    elif any(word in mentor_location for word in mentee_location.split()) or \
-         any(word in mentee_location for word in mentor_location.split()):
-        location_score = 0.5
     else:
-        location_score = 0.0
+        location_score = geographic_score(mentee_location, mentor_location)
+        if location_score is None:
+            if any(word in mentor_location for word in mentee_location.split()) or \
+               any(word in mentee_location for word in mentor_location.split()):
+                location_score = 0.5
+            else:
+                location_score = 0.0
     
     score += weights.get('location', 0.3) * location_score
     
@@ -57,10 +95,139 @@ def calculate_compatibility_score(mentor, mentee, weights):
     
     score += weights.get('mode', 0.3) * mode_score
     
+    # Free-text similarity (career background, goals, ...), off by default
+    if weights.get('text', 0.0) > 0:
+        score += weights['text'] * TEXT_VECTORIZER.similarity(mentor, mentee)
+    
+    # Shared first-gen/transfer/military answers, languages and volunteer
+    # communities, off by default
+    for criterion in ATTRIBUTE_CRITERIA:
+        if weights.get(criterion, 0.0) > 0:
+            score += weights[criterion] * attribute_affinity(mentor, mentee, criterion)
+    
     return min(score, 1.0)  # Cap at 1.0
 
 
-def run_matching_algorithm(mentors, mentees, weights):
+def parse_max_mentees(mentor):
+    """
+    Get max_mentees for a mentor (default to 3 if not specified).
+    Values coming from CSV uploads are strings, so we coerce to int safely.
+    """
+    return _parse_capacity(mentor.get('max_mentees', 3))
+
+
+def _parse_capacity(raw_value):
+    try:
+        return int(raw_value)
+    except (TypeError, ValueError):
+        return 3
+
+
+def _mentor_capacity_state(mentors):
+    """
+    Collect mentor IDs, names and capacity limits
+
+    Mentors sharing an ID share one capacity slot (the last record's
+    max_mentees wins), matching the original dict-based bookkeeping.
+
+    Returns:
+        tuple: (mentor_ids, mentor_names, mentor_slot, slot_capacity)
+    """
+    mentor_ids = field_values(mentors, 'id')
+    mentor_names = field_values(mentors, 'name', 'Unknown')
+    id_index = {}
+    mentor_slot = np.array(
+        [id_index.setdefault(mentor_id, len(id_index)) for mentor_id in mentor_ids],
+        dtype=np.intp
+    )
+    capacity_codes, capacities = factorize_field(mentors, 'max_mentees', _parse_capacity, 3)
+    slot_capacity = np.zeros(len(id_index), dtype=np.int64)
+    for slot, code in zip(mentor_slot.tolist(), capacity_codes.tolist()):
+        slot_capacity[slot] = capacities[code]
+    return mentor_ids, mentor_names, mentor_slot, slot_capacity
+
+
+def select_top_k(scores, k):
+    """
+    Select the indices of the k highest scores, best first
+    
+    Ties are broken by index, lower first. Mentors are always scored in
+    the order they appear in mentors.json, so when two mentors have the
+    same score the one uploaded earlier wins, and results are reproducible
+    across runs.
+    
+    Runs in O(n) with a partial partition instead of sorting every score.
+    
+    Args:
+        scores: 1-D array of candidate scores
+        k: Number of candidates to keep
+    
+    Returns:
+        numpy.ndarray: Up to k indices into scores
+    """
+    num_scores = len(scores)
+    if k <= 0 or num_scores == 0:
+        return np.zeros(0, dtype=np.intp)
+    
+    if num_scores > k:
+        # Everything strictly above the k-th best score is kept; the
+        # remaining places go to the earliest candidates tied with it
+        threshold = np.partition(scores, num_scores - k)[num_scores - k]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        selected = np.concatenate([above, tied])
+    else:
+        selected = np.arange(num_scores)
+    
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def _progress_reporter(progress, total):
+    """
+    Wrap an optional progress(processed, total) callback so it fires about
+    once per percent instead of once per mentee
+    """
+    if progress is None:
+        return lambda processed: None
+    step = max(1, total // 100)
+    
+    def report(processed):
+        if processed % step == 0 or processed == total:
+            progress(processed, total)
+    
+    return report
+
+
+def _record_phases(phases, **seconds):
+    """Add the seconds spent in each matcher phase to an optional phases dict"""
+    if phases is None:
+        return
+    for phase, value in seconds.items():
+        phases[phase] = phases.get(phase, 0.0) + value
+
+
+def _ranked_from_precomputed(rankings, row, mentor_slot, mentor_mentee_count,
+                             mentor_max_capacity, top_k):
+    """
+    Take the top_k mentors with capacity left from a precomputed ranking
+
+    Returns:
+        list: (score, mentor position) pairs, or None if the ranking was
+            truncated before top_k available mentors were found and the
+            mentee has to be scored in full
+    """
+    start, stop = rankings['offsets'][row], rankings['offsets'][row + 1]
+    positions = rankings['positions'][start:stop]
+    slots = mentor_slot[positions]
+    available = np.flatnonzero(mentor_mentee_count[slots] < mentor_max_capacity[slots])[:top_k]
+    if len(available) < top_k and rankings['truncated'][row]:
+        return None
+    scores = rankings['scores'][start:stop]
+    return [(float(scores[i]), positions[i]) for i in available]
+
+
+def run_matching_algorithm(mentors, mentees, weights, top_k=DEFAULT_TOP_K, progress=None,
+                           initial_load=None, workers=1, stats=None, phases=None):
     """
     Run the matching algorithm to pair mentors with mentees
     
@@ -68,82 +235,487 @@ def run_matching_algorithm(mentors, mentees, weights):
         mentors: List of mentor dictionaries
         mentees: List of mentee dictionaries
         weights: Dict with weights for matching criteria
+        top_k: Number of ranked candidates kept per mentee (the best match
+            plus top_k - 1 alternatives)
+        progress: Optional callback progress(processed, total) called as
+            mentees are placed
+        initial_load: Optional dict of mentor_id -> mentees already assigned,
+            counted against max_mentees (used for incremental re-matching)
+        workers: Number of processes used to score candidates; above 1,
+            mentees are ranked in parallel shards (see parallel_matching.py)
+            and then placed in order, giving the same result as a serial run
+        stats: Optional dict filled with per-shard timings of a parallel run
+        phases: Optional dict; seconds spent encoding records, scoring
+            candidates and selecting/placing matches are added to its
+            'encode', 'score' and 'select' entries
     
     Returns:
         tuple: (matches, unmatched_mentees)
             matches: List of dicts with mentee_id, mentor_id, score, and top alternatives
+                (alternatives only include mentors with a positive score)
             unmatched_mentees: List of mentee IDs that couldn't be matched
     """
     matches = []
     unmatched_mentees = []
+    began = time.perf_counter()
     
-    # Track mentor capacity
-    mentor_mentee_count = {mentor['id']: 0 for mentor in mentors}
+    # Track mentor capacity with one counter per mentor ID
+    mentor_ids, mentor_names, mentor_slot, mentor_max_capacity = _mentor_capacity_state(mentors)
+    mentor_mentee_count = np.zeros(len(mentor_max_capacity), dtype=np.int64)
+    if initial_load:
+        for mentor_id, slot in zip(mentor_ids, mentor_slot):
+            mentor_mentee_count[slot] = initial_load.get(mentor_id, 0)
     
-    # Get max_mentees for each mentor (default to 3 if not specified).
-    # Values coming from CSV uploads are strings, so we coerce to int safely.
-    mentor_max_capacity = {}
-    for mentor in mentors:
-        raw_value = mentor.get('max_mentees', 3)
-        try:
-            max_capacity = int(raw_value)
-        except (TypeError, ValueError):
-            max_capacity = 3
-        mentor_max_capacity[mentor['id']] = max_capacity
+    # Encode every record once and index which mentors each profile can reach
+    features = encode_features(mentors, mentees, text=text_weighted(weights),
+                               attributes=weighted_attributes(weights))
+    weighted = weight_features(features, weights)
+    candidate_index = build_candidate_index(features, weights)
+    report_progress = _progress_reporter(progress, len(mentees))
+    encoded = time.perf_counter()
+    encode_seconds = encoded - began
+    score_seconds = select_seconds = 0.0
+    
+    # Score shards of mentees in parallel; capacity is still applied below
+    # in mentee order, so the assignment doesn't depend on the worker count
+    rankings = None
+    if workers > 1 and len(mentees) > 0:
+        from parallel_matching import RANKING_SLACK, rank_candidates_parallel
+        rankings = rank_candidates_parallel(
+            features, weights, top_k + RANKING_SLACK, workers, stats
+        )
+        score_seconds = time.perf_counter() - encoded
+        if stats is not None:
+            stats['ranking_seconds'] = round(score_seconds, 4)
+            stats['rescored_mentees'] = 0
     
     # For each mentee, find the best matching mentors
-    for mentee in mentees:
-        mentee_id = mentee['id']
-        candidate_scores = []
+    mentee_ids = field_values(mentees, 'id')
+    mentee_names = field_values(mentees, 'name', 'Unknown')
+    for row, mentee_id in enumerate(mentee_ids):
+        began = time.perf_counter()
         
-        # Calculate compatibility with all available mentors
-        for mentor in mentors:
-            mentor_id = mentor['id']
-            
-            # Skip if mentor is at capacity
-            if mentor_mentee_count[mentor_id] >= mentor_max_capacity[mentor_id]:
-                continue
-            
-            # Calculate compatibility score
-            score = calculate_compatibility_score(mentor, mentee, weights)
-            
-            candidate_scores.append({
-                'mentor_id': mentor_id,
-                'mentor_name': mentor.get('name', 'Unknown'),
-                'score': score
-            })
+        ranked = None
+        if rankings is not None:
+            ranked = _ranked_from_precomputed(
+                rankings, row, mentor_slot, mentor_mentee_count, mentor_max_capacity, top_k
+            )
+            if ranked is None and stats is not None:
+                stats['rescored_mentees'] += 1
         
-        # Sort by score (descending)
-        candidate_scores.sort(key=lambda x: x['score'], reverse=True)
+        if ranked is None:
+            # Only score mentors that can reach a positive score and have capacity
+            candidates = candidate_mentors(candidate_index, row)
+            candidate_slots = mentor_slot[candidates]
+            available = candidates[
+                mentor_mentee_count[candidate_slots] < mentor_max_capacity[candidate_slots]
+            ]
+            row_scores = score_mentee(weighted, row, available)
+            positive = row_scores > 0
+            available, row_scores = available[positive], row_scores[positive]
+            scored = time.perf_counter()
+            score_seconds += scored - began
+            began = scored
+            
+            # Keep only the top_k (score, mentor position) pairs
+            ranked = [
+                (float(row_scores[i]), available[i])
+                for i in select_top_k(row_scores, top_k)
+            ]
         
-        if candidate_scores and candidate_scores[0]['score'] > 0:
+        if ranked:
             # Match with the best mentor
-            best_match = candidate_scores[0]
-            mentor_id = best_match['mentor_id']
+            best_score, best_position = ranked[0]
+            mentor_id = mentor_ids[best_position]
             
-            # Get top 3 alternatives (excluding the best match)
-            top_alternatives = candidate_scores[1:4]  # Next 3 best matches
+            # Get the next best candidates as alternatives
+            top_alternatives = [
+                {
+                    'mentor_id': mentor_ids[position],
+                    'mentor_name': mentor_names[position],
+                    'score': score
+                }
+                for score, position in ranked[1:]
+            ]
             
             matches.append({
                 'mentee_id': mentee_id,
-                'mentee_name': mentee.get('name', 'Unknown'),
+                'mentee_name': mentee_names[row],
                 'mentor_id': mentor_id,
-                'mentor_name': best_match['mentor_name'],
-                'score': best_match['score'],
+                'mentor_name': mentor_names[best_position],
+                'score': best_score,
                 'top_alternatives': top_alternatives,
                 'status': 'pending',  # Pending verification
                 'verified': False
             })
             
             # Update mentor capacity
-            mentor_mentee_count[mentor_id] += 1
+            mentor_mentee_count[mentor_slot[best_position]] += 1
         else:
             # No suitable mentor found
             unmatched_mentees.append({
                 'id': mentee_id,
+                'name': mentee_names[row]
+            })
+        
+        select_seconds += time.perf_counter() - began
+        report_progress(row + 1)
+    
+    _record_phases(phases, encode=encode_seconds, score=score_seconds, select=select_seconds)
+    return matches, unmatched_mentees
+
+
+
+
+def _solve_transportation(group_scores, mentee_counts, mentor_capacities):
+    """
+    Solve the capacitated assignment between mentee and mentor groups as a
+    min-cost flow (transportation) linear program
+
+    Only group pairs with a positive score become edges. The constraint
+    matrix is totally unimodular, so the simplex vertex returned by HiGHS
+    is integral.
+
+    Returns:
+        numpy.ndarray: Integer flow matrix with the same shape as group_scores
+    """
+    flow = np.zeros(group_scores.shape, dtype=np.int64)
+    rows, cols = np.nonzero(group_scores > 0)
+    if len(rows) == 0:
+        return flow
+    
+    num_edges = len(rows)
+    edge_ids = np.arange(num_edges)
+    num_mentee_groups = group_scores.shape[0]
+    constraints = coo_matrix(
+        (
+            np.ones(2 * num_edges),
+            (np.concatenate([rows, num_mentee_groups + cols]),
+             np.concatenate([edge_ids, edge_ids]))
+        ),
+        shape=(num_mentee_groups + group_scores.shape[1], num_edges)
+    ).tocsr()
+    limits = np.concatenate([mentee_counts, mentor_capacities]).astype(float)
+    
+    result = linprog(
+        -group_scores[rows, cols],
+        A_ub=constraints,
+        b_ub=limits,
+        bounds=(0, None),
+        method='highs-ds'
+    )
+    if not result.success:
+        raise RuntimeError(f'Optimal matching failed: {result.message}')
+    
+    flow[rows, cols] = np.rint(result.x).astype(np.int64)
+    return flow
+
+
+def run_optimal_matching_algorithm(mentors, mentees, weights, top_k=DEFAULT_TOP_K,
+                                   progress=None, features=None, phases=None):
+    """
+    Pair mentors with mentees by maximizing the total compatibility score
+    
+    Unlike run_matching_algorithm, the result does not depend on the order
+    of the mentees. Records with identical discipline, location and mode
+    (and text or bitset criteria, when weighted) are grouped, so the min-cost flow is solved over groups and its size depends
+    on the number of distinct profiles rather than the number of records.
+    
+    Args:
+        mentors: List of mentor dictionaries
+        mentees: List of mentee dictionaries
+        weights: Dict with weights for matching criteria
+        top_k: Number of ranked mentors considered for top_alternatives
+        progress: Optional callback progress(processed, total) called as
+            mentees are placed after the flow has been solved
+        features: Optional encode_features(mentors, mentees) result to reuse
+            across runs on the same records
+        phases: Optional dict; seconds spent in the 'encode', 'score',
+            'solve' and 'select' phases are added to it
+    
+    Returns:
+        tuple: (matches, unmatched_mentees) in the same format as
+            run_matching_algorithm. top_alternatives lists the next best
+            mentors with a positive score, regardless of their remaining
+            capacity.
+    """
+    matches = []
+    unmatched_mentees = []
+    began = time.perf_counter()
+    
+    mentor_ids, mentor_names, mentor_slot, slot_capacity = _mentor_capacity_state(mentors)
+    
+    # Capacity is tracked per ID, so only the first record of an ID carries it
+    _, first_position = np.unique(mentor_slot, return_index=True)
+    mentor_capacity = np.zeros(len(mentors), dtype=np.int64)
+    mentor_capacity[first_position] = np.maximum(slot_capacity[mentor_slot[first_position]], 0)
+    
+    if features is None:
+        features = encode_features(mentors, mentees, text=text_weighted(weights),
+                                   attributes=weighted_attributes(weights))
+    mentee_reps, mentee_group = feature_groups(features, 'mentee')
+    mentor_reps, mentor_group = feature_groups(features, 'mentor')
+    encoded = time.perf_counter()
+    group_scores = build_score_matrix(features, weights, mentee_reps, mentor_reps)
+    scored = time.perf_counter()
+    
+    flow = _solve_transportation(
+        group_scores,
+        np.bincount(mentee_group, minlength=len(mentee_reps)),
+        np.bincount(mentor_group, weights=mentor_capacity, minlength=len(mentor_reps))
+    )
+    
+    solved = time.perf_counter()
+    
+    # Hand out each group's flow to individual mentors in list order
+    mentors_by_group = [deque() for _ in range(len(mentor_reps))]
+    for position, group in enumerate(mentor_group):
+        if mentor_capacity[position] > 0:
+            mentors_by_group[group].append(position)
+    remaining = mentor_capacity.copy()
+    
+    ranked_by_group = {}
+    report_progress = _progress_reporter(progress, len(mentees))
+    for row, mentee in enumerate(mentees):
+        report_progress(row)
+        group = mentee_group[row]
+        assigned = None
+        for mentor_group_id in np.flatnonzero(flow[group]):
+            flow[group, mentor_group_id] -= 1
+            pool = mentors_by_group[mentor_group_id]
+            assigned = pool[0]
+            remaining[assigned] -= 1
+            if remaining[assigned] == 0:
+                pool.popleft()
+            break
+        
+        if assigned is None:
+            unmatched_mentees.append({
+                'id': mentee['id'],
                 'name': mentee.get('name', 'Unknown')
             })
+            continue
+        
+        # Mentees in the same group share one ranking of all mentors
+        if group not in ranked_by_group:
+            mentor_scores = group_scores[group, mentor_group]
+            ranked_by_group[group] = [
+                (float(mentor_scores[position]), position)
+                for position in select_top_k(mentor_scores, top_k)
+                if mentor_scores[position] > 0
+            ]
+        top_alternatives = [
+            {
+                'mentor_id': mentor_ids[position],
+                'mentor_name': mentor_names[position],
+                'score': score
+            }
+            for score, position in ranked_by_group[group]
+            if position != assigned
+        ][:top_k - 1]
+        
+        matches.append({
+            'mentee_id': mentee['id'],
+            'mentee_name': mentee.get('name', 'Unknown'),
+            'mentor_id': mentor_ids[assigned],
+            'mentor_name': mentor_names[assigned],
+            'score': float(group_scores[group, mentor_group[assigned]]),
+            'top_alternatives': top_alternatives,
+            'status': 'pending',  # Pending verification
+            'verified': False
+        })
     
+    report_progress(len(mentees))
+    _record_phases(phases, encode=encoded - began, score=scored - encoded,
+                   solve=solved - scored, select=time.perf_counter() - solved)
     return matches, unmatched_mentees
 
 
+def summarize_scores(matches):
+    """
+    Summarize the scores of a set of matches
+    
+    Returns:
+        dict: total_matches, total_score and average_score
+    """
+    total_score = sum(match.get('score', 0) for match in matches)
+    return {
+        'total_matches': len(matches),
+        'total_score': round(total_score, 4),
+        'average_score': round(total_score / len(matches), 4) if matches else 0.0
+    }
+
+
+def execute_matching(mentors, mentees, weights, algorithm='greedy', top_k=DEFAULT_TOP_K,
+                     progress=None, workers=1, stats=None, phases=None):
+    """
+    Run the selected matching algorithm and build the match document
+    
+    Args:
+        mentors: List of mentor dictionaries
+        mentees: List of mentee dictionaries
+        weights: Dict with weights for matching criteria
+        algorithm: 'greedy' or 'optimal'
+        top_k: Number of ranked candidates kept per mentee
+        progress: Optional callback progress(processed, total)
+        workers: Number of processes for greedy candidate scoring
+        stats: Optional dict filled with parallel shard timings
+        phases: Optional dict; seconds per matcher phase are added to it,
+            with the greedy comparison of an optimal run under 'compare'
+    
+    Returns:
+        tuple: (match_data, comparison)
+            match_data: match document (matches, unmatched_mentees, weights, algorithm)
+            comparison: optimal vs greedy score summary, or None for greedy runs
+    """
+    comparison = None
+    if algorithm == 'optimal':
+        began = time.perf_counter()
+        greedy_matches, _ = run_matching_algorithm(
+            mentors, mentees, weights, top_k, workers=workers, stats=stats
+        )
+        _record_phases(phases, compare=time.perf_counter() - began)
+        matches, unmatched_mentees = run_optimal_matching_algorithm(
+            mentors, mentees, weights, top_k, progress, phases=phases
+        )
+        comparison = {
+            'optimal': summarize_scores(matches),
+            'greedy': summarize_scores(greedy_matches)
+        }
+    else:
+        matches, unmatched_mentees = run_matching_algorithm(
+            mentors, mentees, weights, top_k, progress, workers=workers, stats=stats,
+            phases=phases
+        )
+    
+    match_data = {
+        'matches': matches,
+        'unmatched_mentees': unmatched_mentees,
+        'weights': weights,
+        'algorithm': algorithm
+    }
+    return match_data, comparison
+
+
+def _greedy_assignment(features, weights, mentor_slot, slot_capacity):
+    """
+    Reproduce the mentor choice of run_matching_algorithm at the level of
+    feature groups, without scoring individual mentor records
+
+    Mentors with identical discipline, location and mode always have the
+    same score, so each mentee only compares one candidate per mentor
+    group: that group's earliest mentor with capacity left. Mentor groups
+    are visited in descending score order and ties go to the earliest
+    mentor, as in the per-record matcher.
+
+    Returns:
+        tuple: (assigned, scores) arrays with the chosen mentor position
+            (-1 if unmatched) and score for each mentee
+    """
+    mentee_reps, mentee_group = feature_groups(features, 'mentee')
+    mentor_reps, mentor_group = feature_groups(features, 'mentor')
+    group_scores = build_score_matrix(features, weights, mentee_reps, mentor_reps)
+    
+    # Every mentee group's mentor groups by descending score, ties in group order
+    group_order = np.argsort(-group_scores, axis=1, kind='stable')
+    sorted_scores = np.take_along_axis(group_scores, group_order, axis=1)
+    positive_counts = (sorted_scores > 0).sum(axis=1)
+    
+    remaining = np.maximum(slot_capacity, 0).tolist()
+    slot_of = mentor_slot.tolist()
+    pools = [deque() for _ in range(len(mentor_reps))]
+    for position, group in enumerate(mentor_group.tolist()):
+        pools[group].append(position)
+    
+    assigned = np.full(len(mentee_group), -1, dtype=np.intp)
+    scores = np.zeros(len(mentee_group))
+    rankings = {}
+    for row, group in enumerate(mentee_group.tolist()):
+        # Mentor groups with a positive score, best first, split into runs
+        # of equal score; ranking[3] is the first run that may have capacity
+        ranking = rankings.get(group)
+        if ranking is None:
+            count = positive_counts[group]
+            order = group_order[group, :count]
+            ordered_scores = sorted_scores[group, :count]
+            bounds = np.concatenate(
+                [[0], np.flatnonzero(np.diff(ordered_scores)) + 1, [len(order)]]
+            )
+            ranking = [order.tolist(), ordered_scores.tolist(), bounds.tolist(), 0]
+            rankings[group] = ranking
+        order, ordered_scores, bounds, level = ranking
+        
+        # Mentors never regain capacity, so exhausted runs are skipped for good
+        while level < len(bounds) - 1:
+            best = None
+            for mentor_group_id in order[bounds[level]:bounds[level + 1]]:
+                pool = pools[mentor_group_id]
+                while pool and remaining[slot_of[pool[0]]] <= 0:
+                    pool.popleft()
+                if pool and (best is None or pool[0] < best):
+                    best = pool[0]
+            if best is not None:
+                remaining[slot_of[best]] -= 1
+                assigned[row] = best
+                scores[row] = ordered_scores[bounds[level]]
+                break
+            level += 1
+        ranking[3] = level
+    
+    return assigned, scores
+
+
+def run_weight_sweep(mentors, mentees, weight_sets, algorithm='greedy'):
+    """
+    Evaluate several weight vectors on the same records without saving anything
+    
+    Records are encoded once and the per-pair discipline, location and mode
+    components are only re-weighted for each vector. Greedy runs are
+    replayed over groups of identical profiles (see _greedy_assignment),
+    so each vector costs a fraction of a full matching run while giving
+    the same assignment.
+    
+    Args:
+        mentors: List of mentor dictionaries
+        mentees: List of mentee dictionaries
+        weight_sets: List of weight dicts
+        algorithm: 'greedy' or 'optimal'
+    
+    Returns:
+        list: One dict per weight vector with the weights, total_matches,
+            total_unmatched, total_score, average_score, mentors_used and
+            capacity_utilization (matches / total mentor capacity)
+    """
+    features = encode_features(mentors, mentees, text=text_weighted(*weight_sets),
+                               attributes=weighted_attributes(*weight_sets))
+    _, _, mentor_slot, slot_capacity = _mentor_capacity_state(mentors)
+    total_capacity = int(np.maximum(slot_capacity, 0).sum())
+    
+    results = []
+    for weights in weight_sets:
+        if algorithm == 'optimal':
+            # Only the assignment matters here, so skip ranking alternatives
+            matches, _ = run_optimal_matching_algorithm(
+                mentors, mentees, weights, top_k=1, features=features
+            )
+            scores = [match['score'] for match in matches]
+            mentors_used = len({match['mentor_id'] for match in matches})
+        else:
+            assigned, scores = _greedy_assignment(features, weights, mentor_slot, slot_capacity)
+            matched = assigned >= 0
+            scores = scores[matched].tolist()
+            mentors_used = len(np.unique(mentor_slot[assigned[matched]]))
+        
+        total_score = sum(scores)
+        results.append({
+            'weights': weights,
+            'total_matches': len(scores),
+            'total_unmatched': len(mentees) - len(scores),
+            'total_score': round(total_score, 4),
+            'average_score': round(total_score / len(scores), 4) if scores else 0.0,
+            'mentors_used': mentors_used,
+            'capacity_utilization': (
+                round(len(scores) / total_capacity, 4) if total_capacity else 0.0
+            )
+        })
+    return results
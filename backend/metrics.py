@@ -0,0 +1,338 @@
+"""
+Metrics for Alumni Mentorship Matching Platform
+Request, storage and matcher timings exposed in Prometheus text format
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import request
+
+
+# Histogram buckets (upper bounds); +Inf is added when rendering
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+METRIC_PREFIX = 'mentormatch_'
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    ]
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterMetric:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class HistogramMetric:
+    """Cumulative histogram with labels, rendered with _bucket/_sum/_count series"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            entry['counts'][index] += 1
+            entry['sum'] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, list(entry['counts']), entry['sum']) for key, entry in self._values.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for /api/metrics"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = CounterMetric(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = HistogramMetric(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status code',
+    ['endpoint', 'method', 'status']
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['endpoint', 'method']
+)
+HTTP_REQUEST_SIZE = REGISTRY.histogram(
+    'http_request_size_bytes', 'HTTP request body size', ['endpoint'], SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    'http_response_size_bytes', 'HTTP response body size', ['endpoint'], SIZE_BUCKETS
+)
+HTTP_STORAGE_TIME = REGISTRY.histogram(
+    'http_request_storage_seconds', 'Time spent in storage (file/database I/O) per request',
+    ['endpoint']
+)
+STORAGE_OPERATIONS = REGISTRY.histogram(
+    'storage_operation_seconds', 'Storage backend call latency', ['operation']
+)
+MATCHING_PHASES = REGISTRY.histogram(
+    'matching_phase_seconds', 'Time spent in each phase of a matching run',
+    ['algorithm', 'phase']
+)
+
+# Storage time of the request handled by the current thread
+_request_state = threading.local()
+
+
+def cache_collector(cache, name='cache', description='Read cache'):
+    """Collector exposing the hit/miss counters of a cache with get_stats()"""
+    def collect():
+        stats = cache.get_stats()
+        lines = []
+        for field in ('hits', 'misses'):
+            metric = f'{METRIC_PREFIX}{name}_{field}_total'
+            lines += [f'# HELP {metric} {description} {field}', f'# TYPE {metric} counter',
+                      f'{metric} {stats[field]}']
+        return lines
+    return collect
+
+
+def observe_matching_phases(algorithm, phases):
+    """Record the per-phase seconds of one matching run"""
+    for phase, seconds in phases.items():
+        MATCHING_PHASES.observe(seconds, algorithm=algorithm, phase=phase)
+
+
+class InstrumentedStorage:
+    """
+    Storage backend wrapper that times every method call
+
+    Each call is recorded in the storage_operation_seconds histogram and
+    added to the storage time of the request running on the same thread.
+    Attribute access and the backend's API are otherwise unchanged.
+    """
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __getattr__(self, name):
+        attribute = getattr(self._storage, name)
+        if not callable(attribute):
+            return attribute
+
+        def timed(*args, **kwargs):
+            began = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - began
+                STORAGE_OPERATIONS.observe(elapsed, operation=name)
+                if getattr(_request_state, 'storage_seconds', None) is not None:
+                    _request_state.storage_seconds += elapsed
+
+        return timed
+
+
+class SlowRequestProfiler:
+    """
+    Sampling profiler for slow requests
+
+    While enabled, a background thread samples the stack of every thread
+    that is handling a request every interval seconds. When a request takes
+    at least threshold_ms, its samples are kept as folded stacks
+    ("module:function:line;..." -> count, the flame graph input format)
+    in a bounded list of recent slow requests. Requests under the
+    threshold are discarded, and nothing is sampled while disabled.
+    """
+
+    def __init__(self, threshold_ms=1000, interval=0.005, max_profiles=20, max_stacks=25):
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._active = {}
+        self._profiles = deque(maxlen=max_profiles)
+        self._thread = None
+
+    def configure(self, enabled, threshold_ms=None):
+        """Turn sampling on or off and optionally change the threshold"""
+        with self._lock:
+            self.enabled = bool(enabled)
+            if threshold_ms is not None:
+                self.threshold_ms = threshold_ms
+            if self.enabled and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._sample_loop, name='slow-request-profiler',
+                                                daemon=True)
+                self._thread.start()
+
+    def start(self, thread_id):
+        if self.enabled:
+            with self._lock:
+                self._active[thread_id] = Counter()
+
+    def finish(self, thread_id, endpoint, method, duration):
+        with self._lock:
+            samples = self._active.pop(thread_id, None)
+            if samples is None or duration * 1000 < self.threshold_ms:
+                return
+            self._profiles.append({
+                'endpoint': endpoint,
+                'method': method,
+                'duration_ms': round(duration * 1000, 3),
+                'samples': sum(samples.values()),
+                'stacks': [
+                    {'stack': stack, 'count': count}
+                    for stack, count in samples.most_common(self.max_stacks)
+                ],
+                'captured_at': time.time()
+            })
+
+    def profiles(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def _sample_loop(self):
+        while self.enabled:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            stacks = {}
+            for thread_id in active:
+                frame = frames.get(thread_id)
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    parts.append(f'{module}:{code.co_name}:{frame.f_lineno}')
+                    frame = frame.f_back
+                if parts:
+                    stacks[thread_id] = ';'.join(reversed(parts))
+            with self._lock:
+                for thread_id, stack in stacks.items():
+                    samples = self._active.get(thread_id)
+                    if samples is not None:
+                        samples[stack] += 1
+
+
+class RequestMetrics:
+    """
+    Flask before/after-request hooks that record per-endpoint metrics
+
+    Endpoints are labelled by their URL rule (e.g. /api/matching-jobs/<job_id>),
+    so label cardinality stays bounded; unknown URLs are labelled 'unmatched'.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def init_app(self, app):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def before_request(self):
+        _request_state.began = time.perf_counter()
+        _request_state.storage_seconds = 0.0
+        self.profiler.start(threading.get_ident())
+
+    def after_request(self, response):
+        began = getattr(_request_state, 'began', None)
+        if began is None:
+            return response
+        duration = time.perf_counter() - began
+        storage_seconds = _request_state.storage_seconds
+        _request_state.began = None
+        _request_state.storage_seconds = None
+
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        HTTP_LATENCY.observe(duration, endpoint=endpoint, method=request.method)
+        HTTP_STORAGE_TIME.observe(storage_seconds, endpoint=endpoint)
+        if request.content_length:
+            HTTP_REQUEST_SIZE.observe(request.content_length, endpoint=endpoint)
+        if response.content_length is not None:
+            HTTP_RESPONSE_SIZE.observe(response.content_length, endpoint=endpoint)
+
+        self.profiler.finish(threading.get_ident(), endpoint, request.method, duration)
+        return response
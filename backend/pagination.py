@@ -0,0 +1,131 @@
+"""
+Pagination Helpers for Alumni Mentorship Matching Platform
+Cursor pagination, filtering, field projection and ETags for list endpoints
+"""
+
+import base64
+import hashlib
+import json
+
+
+# Upper bound for the limit query parameter
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Invalid paging parameters; status is the HTTP status to return"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def make_etag(versions, query_items):
+    """
+    Build a weak ETag from data versions and the request's query parameters
+
+    Args:
+        versions: Data version tokens of every collection the response reads
+        query_items: Iterable of (name, value) query parameter pairs
+
+    Returns:
+        str: ETag value (unquoted; sent as a weak validator)
+    """
+    payload = json.dumps(
+        {
+            'versions': {key: str(value) for key, value in versions.items()},
+            'args': sorted(query_items)
+        },
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _version_tag(versions):
+    payload = json.dumps({k: str(v) for k, v in versions.items()}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(position, versions):
+    """Opaque cursor holding the next list position and the data version"""
+    payload = json.dumps({'p': position, 'v': _version_tag(versions)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, versions):
+    """
+    Get the list position stored in a cursor
+
+    Raises:
+        PaginationError: If the cursor is malformed (400) or was issued for
+            a different data version (409), in which case paging must restart
+    """
+    if not cursor:
+        return 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        position = int(payload['p'])
+        tag = payload['v']
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('Invalid cursor')
+    if tag != _version_tag(versions):
+        raise PaginationError('Data changed since this cursor was issued; restart from the first page', 409)
+    return position
+
+
+def parse_limit(value):
+    """Parse the limit query parameter; None means no pagination"""
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('Invalid limit. Must be a positive integer')
+    if limit < 1:
+        raise PaginationError('Invalid limit. Must be a positive integer')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(args):
+    """
+    Parse the fields/exclude projection parameters
+
+    Returns:
+        tuple: (include, exclude) sets; include is None when not given
+    """
+    include = args.get('fields')
+    exclude = args.get('exclude')
+    include = {f.strip() for f in include.split(',') if f.strip()} if include else None
+    exclude = {f.strip() for f in exclude.split(',') if f.strip()} if exclude else set()
+    return include, exclude
+
+
+def project(item, include, exclude):
+    """Copy of item with only the requested fields"""
+    if include is None and not exclude:
+        return item
+    return {
+        key: value for key, value in item.items()
+        if (include is None or key in include) and key not in exclude
+    }
+
+
+def paginate(items, predicate, start, limit):
+    """
+    Collect one page of items that satisfy predicate, scanning from start
+
+    Scanning stops as soon as the page is full and one more matching item
+    has been seen, so early pages don't walk the whole list.
+
+    Returns:
+        tuple: (page, next_position) where next_position is None on the last page
+    """
+    page = []
+    for position in range(start, len(items)):
+        item = items[position]
+        if not predicate(item):
+            continue
+        if limit is not None and len(page) == limit:
+            return page, position
+        page.append(item)
+    return page, None
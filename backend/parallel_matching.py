@@ -0,0 +1,207 @@
+"""
+Parallel Candidate Scoring for Alumni Mentorship Matching Platform
+Scores shards of mentees on a process pool against a shared mentor table
+"""
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy import sparse
+
+from feature_encoding import (
+    CRITERIA,
+    weight_features,
+    score_mentee,
+    build_candidate_index,
+    candidate_mentors
+)
+from matching_logic import select_top_k
+
+# Shards per worker, so a slow shard doesn't leave the other workers idle
+SHARDS_PER_WORKER = 4
+
+# Ranked candidates kept per mentee beyond top_k, for when the best
+# mentors are already full by the time the mentee is placed
+RANKING_SLACK = 32
+
+# Workers start from a clean server process rather than a fork of the
+# (multi-threaded) web worker
+_MP_CONTEXT = multiprocessing.get_context('forkserver')
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def _share_arrays(arrays):
+    """
+    Copy named arrays into one shared memory block
+
+    Returns:
+        tuple: (SharedMemory, layout) where layout maps each name to
+            (dtype, shape, offset) inside the block
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, array.shape, offset)
+        offset += math.ceil(array.nbytes / 8) * 8
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        dtype, shape, start = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+    return block, layout
+
+
+def _attach_arrays(block, layout):
+    """Read-only array views over a block created by _share_arrays"""
+    arrays = {}
+    for name, (dtype, shape, start) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays
+
+
+def _feature_arrays(features):
+    """
+    Flatten encoded features into named arrays for _share_arrays
+
+    Sparse tables (text) are split into their CSR data, indices and indptr.
+
+    Returns:
+        tuple: (arrays, sparse_shapes) where sparse_shapes maps each
+            criterion with a sparse table to its shape
+    """
+    arrays = {}
+    sparse_shapes = {}
+    for criterion, encoded in features.items():
+        arrays[f'{criterion}.mentor_codes'] = encoded['mentor_codes']
+        arrays[f'{criterion}.mentee_codes'] = encoded['mentee_codes']
+        table = encoded['table']
+        if sparse.issparse(table):
+            sparse_shapes[criterion] = table.shape
+            for part in ('data', 'indices', 'indptr'):
+                arrays[f'{criterion}.table.{part}'] = getattr(table, part)
+        else:
+            arrays[f'{criterion}.table'] = table
+    return arrays, sparse_shapes
+
+
+def _init_worker(block_name, layout, criteria, sparse_shapes, weights):
+    """Attach to the shared feature tables and build this worker's index"""
+    block = shared_memory.SharedMemory(name=block_name)
+    arrays = _attach_arrays(block, layout)
+    features = {}
+    for criterion in criteria:
+        if criterion in sparse_shapes:
+            table = sparse.csr_matrix(
+                tuple(arrays[f'{criterion}.table.{part}'] for part in ('data', 'indices', 'indptr')),
+                shape=sparse_shapes[criterion], copy=False
+            )
+            table.has_sorted_indices = True
+        else:
+            table = arrays[f'{criterion}.table']
+        features[criterion] = {
+            'mentor_codes': arrays[f'{criterion}.mentor_codes'],
+            'mentee_codes': arrays[f'{criterion}.mentee_codes'],
+            'table': table,
+        }
+    _worker['block'] = block
+    _worker['weighted'] = weight_features(features, weights)
+    _worker['index'] = build_candidate_index(features, weights)
+
+
+def _rank_shard(start, stop, depth):
+    """
+    Rank the positive-score mentors of mentees start..stop-1, best first
+
+    Ties are ordered by mentor position, as in the serial matcher, and each
+    list is cut to depth entries.
+
+    Returns:
+        tuple: (positions, scores, counts, truncated, seconds)
+    """
+    began = time.perf_counter()
+    positions = []
+    scores = []
+    counts = np.zeros(stop - start, dtype=np.int64)
+    truncated = np.zeros(stop - start, dtype=bool)
+    for i, row in enumerate(range(start, stop)):
+        candidates = candidate_mentors(_worker['index'], row)
+        row_scores = score_mentee(_worker['weighted'], row, candidates)
+        positive = row_scores > 0
+        candidates, row_scores = candidates[positive], row_scores[positive]
+        order = select_top_k(row_scores, depth)
+        truncated[i] = len(row_scores) > depth
+        positions.append(candidates[order])
+        scores.append(row_scores[order])
+        counts[i] = len(order)
+
+    positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.intp)
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    return positions, scores, counts, truncated, time.perf_counter() - began
+
+
+def rank_candidates_parallel(features, weights, depth, workers, stats=None):
+    """
+    Rank every mentee's candidate mentors on a pool of worker processes
+
+    The encoded mentor and mentee tables are placed in shared memory once
+    and each worker attaches to them read-only, so only shard bounds and
+    the truncated rankings cross process boundaries. Mentees are split
+    into contiguous shards and results are reassembled in mentee order,
+    independent of which worker finishes first.
+
+    Args:
+        features: Output of encode_features
+        weights: Dict with weights for matching criteria
+        depth: Number of ranked candidates kept per mentee
+        workers: Number of worker processes
+        stats: Optional dict; 'workers' and per-shard 'shards' timings
+            (first mentee row, mentees, seconds) are recorded in it
+
+    Returns:
+        dict: {'positions', 'scores', 'offsets', 'truncated'} where the
+            ranking of mentee row is positions/scores[offsets[row]:offsets[row + 1]]
+            and truncated[row] means candidates beyond depth were dropped
+    """
+    num_mentees = len(features[CRITERIA[0]]['mentee_codes'])
+    num_shards = max(1, min(num_mentees, workers * SHARDS_PER_WORKER))
+    bounds = np.linspace(0, num_mentees, num_shards + 1).astype(int).tolist()
+    shards = [(bounds[i], bounds[i + 1]) for i in range(num_shards) if bounds[i] < bounds[i + 1]]
+
+    arrays, sparse_shapes = _feature_arrays(features)
+    block, layout = _share_arrays(arrays)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT,
+                                 initializer=_init_worker,
+                                 initargs=(block.name, layout, list(features), sparse_shapes,
+                                           weights)) as executor:
+            results = list(executor.map(
+                _rank_shard,
+                [start for start, _ in shards],
+                [stop for _, stop in shards],
+                [depth] * len(shards)
+            ))
+    finally:
+        block.close()
+        block.unlink()
+
+    if stats is not None:
+        stats['workers'] = workers
+        stats['shards'] = [
+            {'start': start, 'mentees': stop - start, 'seconds': round(result[4], 4)}
+            for (start, stop), result in zip(shards, results)
+        ]
+
+    counts = np.concatenate([r[2] for r in results]) if results else np.zeros(0, dtype=np.int64)
+    return {
+        'positions': np.concatenate([r[0] for r in results]) if results else np.zeros(0, dtype=np.intp),
+        'scores': np.concatenate([r[1] for r in results]) if results else np.zeros(0),
+        'offsets': np.concatenate([[0], np.cumsum(counts)]),
+        'truncated': np.concatenate([r[3] for r in results]) if results else np.zeros(0, dtype=bool)
+    }
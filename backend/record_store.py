@@ -0,0 +1,292 @@
+"""
+Columnar Record Store for Alumni Mentorship Matching Platform
+Holds cached mentors and mentees as typed columns instead of one dict per record
+"""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+
+# A column is dictionary-encoded when it has at most this share of distinct
+# values (discipline, location, mode, yes/no answers); mostly-unique columns
+# such as names, e-mails and long answers are packed as UTF-8 instead
+CATEGORICAL_MAX_DISTINCT = 0.5
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def first_appearance_codes(codes):
+    """
+    Renumber integer codes in order of first appearance
+
+    Returns:
+        tuple: (codes, order) where order[new_code] is the old code
+    """
+    uniques, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty(len(uniques), dtype=np.intp)
+    rank[order] = np.arange(len(uniques))
+    return rank[inverse.reshape(-1)], uniques[order]
+
+
+class _CodedColumn:
+    """Distinct values stored once, rows hold int32 codes into them"""
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def factorize(self, transform, present, default_value):
+        transformed = [transform(value) for value in self.values]
+        index = {}
+        remap = np.array([index.setdefault(value, len(index)) for value in transformed],
+                         dtype=np.intp)
+        codes = remap[self.codes] if len(remap) else np.zeros(len(self.codes), dtype=np.intp)
+        if not present.all():
+            codes[~present] = index.setdefault(default_value, len(index))
+        return codes, list(index)
+
+
+class _IntColumn:
+    """Integer values (IDs, capacities) in an int64 array"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, row):
+        return int(self.values[row])
+
+    def factorize(self, transform, present, default_value):
+        uniques, inverse = np.unique(self.values, return_inverse=True)
+        return _CodedColumn(uniques.tolist(), inverse.reshape(-1)).factorize(
+            transform, present, default_value
+        )
+
+
+class _StringColumn:
+    """
+    Mostly-unique strings (names, e-mails, long answers) packed into one
+    UTF-8 buffer with an offsets array; a value is decoded when it is read
+    """
+
+    def __init__(self, values):
+        encoded = [value.encode('utf-8', 'surrogatepass') if value is not None else b''
+                   for value in values]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+
+    def get(self, row):
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].decode('utf-8', 'surrogatepass')
+
+    def all_values(self):
+        buffer, offsets = self.buffer, self.offsets.tolist()
+        return [buffer[start:stop].decode('utf-8', 'surrogatepass')
+                for start, stop in zip(offsets, offsets[1:])]
+
+    def factorize(self, transform, present, default_value):
+        return _ObjectColumn(self.all_values()).factorize(transform, present, default_value)
+
+
+class _ObjectColumn:
+    """Any other values as a list"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, row):
+        return self.values[row]
+
+    def factorize(self, transform, present, default_value):
+        index = {}
+        codes = np.fromiter(
+            (index.setdefault(transform(value) if is_present else default_value, len(index))
+             for value, is_present in zip(self.values, present)),
+            dtype=np.intp, count=len(self.values)
+        )
+        return codes, list(index)
+
+
+def _build_column(values, present):
+    """Pick the column type for one field; values of missing rows are None"""
+    if present.any() and all(
+        type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+        for value, is_present in zip(values, present.tolist()) if is_present
+    ):
+        return _IntColumn(np.array([0 if value is None else value for value in values],
+                                   dtype=np.int64))
+    index = {}
+    try:
+        # Keyed by type too, so 1, 1.0 and True stay distinct
+        codes = [index.setdefault((type(value), value), len(index)) for value in values]
+    except TypeError:
+        return _ObjectColumn(values)
+    if len(index) > max(CATEGORICAL_MAX_DISTINCT * len(values), 1):
+        if all(type(value) is str for value, is_present in zip(values, present.tolist())
+               if is_present):
+            return _StringColumn(values)
+        return _ObjectColumn(values)
+    return _CodedColumn([value for _, value in index], np.array(codes, dtype=np.int32))
+
+
+class RecordStore(Sequence):
+    """
+    Read-only sequence of records stored column by column
+
+    Each field is one column aligned with the rows: integer fields in an
+    int64 array, low-cardinality fields as int32 codes into a list of
+    distinct values, mostly-unique text (names, e-mails, long answers) as
+    one UTF-8 buffer that is only decoded when read, and anything else as
+    a plain list. The set and order of keys of each record is stored once
+    per distinct key layout, so column names aren't repeated per record.
+
+    Indexing or iterating builds a new dict for each record, so callers
+    can't modify the store. The matcher reads columns directly through
+    values() and factorize().
+    """
+
+    def __init__(self, records):
+        records = records if isinstance(records, list) else list(records)
+        layout_index = {}
+        layout_codes = np.empty(len(records), dtype=np.int32)
+        for row, record in enumerate(records):
+            layout_codes[row] = layout_index.setdefault(tuple(record), len(layout_index))
+        self._layouts = list(layout_index)
+        self._layout_codes = layout_codes
+        self._num_rows = len(records)
+
+        names = list(dict.fromkeys(name for layout in self._layouts for name in layout))
+        self._columns = {}
+        for name in names:
+            values = [record.get(name) for record in records]
+            self._columns[name] = _build_column(values, self.present(name))
+
+    def __len__(self):
+        return self._num_rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self._num_rows))]
+        if row < 0:
+            row += self._num_rows
+        if not 0 <= row < self._num_rows:
+            raise IndexError('record index out of range')
+        columns = self._columns
+        return {name: columns[name].get(row) for name in self._layouts[self._layout_codes[row]]}
+
+    def __iter__(self):
+        columns = self._columns
+        layouts = [[(name, columns[name]) for name in layout] for layout in self._layouts]
+        for row, layout_code in enumerate(self._layout_codes.tolist()):
+            yield {name: column.get(row) for name, column in layouts[layout_code]}
+
+    def names(self):
+        """Names of every field held by at least one record, in order of first appearance"""
+        return list(self._columns)
+
+    def present(self, name):
+        """Boolean array: which records have the field"""
+        has_field = np.array([name in layout for layout in self._layouts], dtype=bool)
+        return has_field[self._layout_codes] if len(has_field) else np.zeros(0, dtype=bool)
+
+    def values(self, name, default=None):
+        """Values of one field for every record, like [r.get(name, default) for r in records]"""
+        column = self._columns.get(name)
+        if column is None:
+            return [default] * self._num_rows
+        present = self.present(name).tolist()
+        if isinstance(column, _ObjectColumn):
+            values = column.values
+        elif isinstance(column, _StringColumn):
+            values = column.all_values()
+        elif isinstance(column, _IntColumn):
+            values = column.values.tolist()
+        else:
+            values = [column.values[code] for code in column.codes.tolist()]
+        return [value if is_present else default for value, is_present in zip(values, present)]
+
+    def factorize(self, name, transform, default=None):
+        """
+        Integer codes of transform(value) for one field, without visiting each record
+
+        transform is called once per distinct value. Records without the
+        field get the code of transform(default). Codes are numbered in
+        order of first appearance.
+
+        Returns:
+            tuple: (codes, uniques) where uniques[codes[i]] == transform(records[i].get(name, default))
+        """
+        column = self._columns.get(name)
+        if column is None:
+            if not self._num_rows:
+                return np.zeros(0, dtype=np.intp), []
+            return np.zeros(self._num_rows, dtype=np.intp), [transform(default)]
+        codes, uniques = column.factorize(transform, self.present(name), transform(default))
+        if not len(codes):
+            return codes, []
+        codes, order = first_appearance_codes(codes)
+        return codes, [uniques[i] for i in order.tolist()]
+
+    def index(self, name='id'):
+        """Mapping from a field's value to its record (the first record wins)"""
+        return RecordIndex(self, name)
+
+
+class RecordIndex(Mapping):
+    """Read-only mapping from key to record, built over a RecordStore"""
+
+    def __init__(self, store, name):
+        self._store = store
+        self._rows = {}
+        for row, key in enumerate(store.values(name)):
+            self._rows.setdefault(key, row)
+
+    def __getitem__(self, key):
+        return self._store[self._rows[key]]
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def field_values(records, name, default=None):
+    """[record.get(name, default) for record in records], read from the column of a RecordStore"""
+    if isinstance(records, RecordStore):
+        return records.values(name, default)
+    return [record.get(name, default) for record in records]
+
+
+def field_names(records):
+    """Names of every field held by at least one record of a list or RecordStore"""
+    if isinstance(records, RecordStore):
+        return records.names()
+    return list(dict.fromkeys(name for record in records for name in record))
+
+
+def factorize_field(records, name, transform, default=None):
+    """
+    Integer codes of transform(record.get(name, default)) over a list or RecordStore
+
+    For a RecordStore, transform runs once per distinct value instead of
+    once per record.
+
+    Returns:
+        tuple: (codes, uniques) numbered in order of first appearance
+    """
+    if isinstance(records, RecordStore):
+        return records.factorize(name, transform, default)
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(transform(record.get(name, default)), len(index)) for record in records),
+        dtype=np.intp, count=len(records)
+    )
+    return codes, list(index)
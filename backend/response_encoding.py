@@ -0,0 +1,200 @@
+"""
+Response Encoding for Alumni Mentorship Matching Platform
+Fast JSON, compression, MessagePack and streamed lists for API responses
+"""
+
+import gzip
+import json
+import zlib
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional accelerators; without them the standard library is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# Fast settings: large responses are compressed on every request, so
+# speed matters more than the last few percent of size
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# Lists with at least this many items are serialized while they are sent,
+# STREAM_BATCH_SIZE items at a time
+STREAM_MIN_ITEMS = 1000
+STREAM_BATCH_SIZE = 500
+
+
+def dumps(obj, sort_keys=False):
+    """
+    Serialize to compact JSON bytes, with orjson when it is installed
+
+    Values orjson can't encode (e.g. integers beyond 64 bits) fall back to
+    the json module.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from bytes or str, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson when it can
+
+    jsonify() answers with MessagePack instead when the client prefers
+    application/msgpack in its Accept header and msgpack is installed.
+    Pretty-printed output (debug mode) still goes through the json module.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and kwargs.get('indent') is None:
+            try:
+                return orjson.dumps(
+                    obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+                ).decode('utf-8')
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if wants_msgpack():
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(msgpack.packb(obj), mimetype=MSGPACK_MIMETYPE)
+        return super().response(*args, **kwargs)
+
+
+def wants_msgpack():
+    """Whether the current request asked for MessagePack (and it can be produced)"""
+    if msgpack is None:
+        return False
+    accept = request.accept_mimetypes
+    return accept.quality(MSGPACK_MIMETYPE) > accept.quality(JSON_MIMETYPE)
+
+
+def negotiate_encoding():
+    """Best Content-Encoding the client accepts: 'br', 'gzip' or None"""
+    accept = request.accept_encodings
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best = max(candidates, key=lambda encoding: accept[encoding], default=None)
+    return best if best is not None and accept[best] > 0 else None
+
+
+def _compressor(encoding):
+    """(compress(chunk), finish()) functions for a streamed body"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress, compressor.flush
+
+
+def _compress_chunks(chunks, encoding):
+    compress, finish = _compressor(encoding)
+    for chunk in chunks:
+        compressed = compress(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def json_stream_response(fields, list_key, items, transform=None):
+    """
+    Response for {**fields, list_key: [transform(item) for item in items]}
+
+    A list of at least STREAM_MIN_ITEMS is serialized in batches while the
+    response is sent, so the full JSON text never exists in memory and the
+    first bytes go out before the last item is encoded. items can be any
+    sequence that supports slicing, such as a RecordStore, whose records
+    are then only built a batch at a time. Shorter lists, and clients that
+    asked for MessagePack, get an ordinary jsonify() response.
+    """
+    transform = transform or (lambda item: item)
+    if len(items) < STREAM_MIN_ITEMS or wants_msgpack():
+        return _jsonify({**fields, list_key: [transform(item) for item in items]})
+
+    def generate():
+        head = dumps(fields, sort_keys=True)
+        yield head[:-1] + (b',' if len(head) > 2 else b'') + dumps(list_key) + b':['
+        for start in range(0, len(items), STREAM_BATCH_SIZE):
+            batch = [transform(item) for item in items[start:start + STREAM_BATCH_SIZE]]
+            yield (b',' if start else b'') + dumps(batch)[1:-1]
+        yield b']}\n'
+
+    from flask import current_app
+    return current_app.response_class(generate(), mimetype=JSON_MIMETYPE)
+
+
+def _jsonify(body):
+    from flask import jsonify
+    return jsonify(body)
+
+
+class ResponseEncoding:
+    """
+    Installs FastJSONProvider and compresses JSON/MessagePack responses
+
+    Compression is negotiated from Accept-Encoding (brotli when installed,
+    else gzip) and skipped for bodies under MIN_COMPRESS_BYTES. Streamed
+    responses are compressed chunk by chunk as they are sent.
+    """
+
+    def init_app(self, app):
+        app.json = FastJSONProvider(app)
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        if (response.mimetype not in (JSON_MIMETYPE, MSGPACK_MIMETYPE)
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_chunks(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < MIN_COMPRESS_BYTES:
+                return response
+            response.set_data(_compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,195 @@
+"""
+Matching Result Cache for Alumni Mentorship Matching Platform
+Keeps finished matching results on disk, keyed by their inputs
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+
+# Files whose contents determine matching results; a change to any of them
+# (a new scoring rule, an updated gazetteer) gives every key a new value
+_MATCHING_SOURCES = (
+    'matching_logic.py',
+    'feature_encoding.py',
+    'text_similarity.py',
+    'attribute_bitsets.py',
+    'geocoding.py',
+    'us_cities.csv',
+)
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+def _code_fingerprint():
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _MATCHING_SOURCES:
+        with open(os.path.join(base_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def content_hash(records):
+    """
+    SHA-256 of a list of records in canonical JSON (sorted keys, list order kept)
+
+    Record order is part of the hash because the greedy matcher places
+    mentees in order.
+    """
+    digest = hashlib.sha256()
+    for record in records:
+        digest.update(json.dumps(record, sort_keys=True, separators=(',', ':'),
+                                 default=str).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class MatchResultCache:
+    """
+    Content-addressed store of matching results
+
+    A result is stored under the hash of everything it depends on: the
+    mentor and mentee records, the weights, the algorithm options and the
+    matching code. Each result is one JSON file in the cache directory,
+    written atomically, so several server processes can share it. Reading
+    an entry touches its mtime, and after each write the least recently
+    used files are deleted until the directory fits in max_bytes.
+
+    Changing records gives a new content hash and therefore a new key, so
+    entries never need to be invalidated explicitly; results for record
+    sets that are no longer current age out of the LRU.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._code = _code_fingerprint()
+        self._saved = None
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, mentor_hash, mentee_hash, weights, algorithm, top_k):
+        """Cache key of one matching run"""
+        payload = json.dumps(
+            {
+                'mentors': mentor_hash,
+                'mentees': mentee_hash,
+                'weights': weights,
+                'algorithm': algorithm,
+                'top_k': top_k,
+                'code': self._code
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        """
+        Look up a stored result
+
+        Returns:
+            tuple: (match_data, comparison), or None on a miss
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry['match_data'], entry.get('comparison')
+
+    def put(self, key, match_data, comparison):
+        """Store a result and evict least recently used entries over max_bytes"""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'match_data': match_data, 'comparison': comparison}, f)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every stored result, oldest first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def mark_saved(self, key, matches_version):
+        """Remember that the result for key is the saved match document at matches_version"""
+        with self._lock:
+            self._saved = (key, matches_version)
+
+    def is_saved(self, key, matches_version):
+        """Whether the saved match document is still the result for key"""
+        with self._lock:
+            return self._saved == (key, matches_version)
+
+    def clear(self):
+        """Delete every stored result"""
+        if not self.enabled:
+            return
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._saved = None
+
+    def get_stats(self):
+        """Hit/miss counters and the number and size of stored results"""
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes
+            }
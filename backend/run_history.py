@@ -0,0 +1,356 @@
+"""
+Matching Run History for Alumni Mentorship Matching Platform
+Keeps every matching result as a version, delta-encoded against the run before it
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+
+# Every KEYFRAME_INTERVAL-th version is stored in full, so loading any
+# version applies at most KEYFRAME_INTERVAL - 1 deltas
+KEYFRAME_INTERVAL = 16
+
+# Score changes smaller than this are rounding noise, not a moved match
+SCORE_TOLERANCE = 1e-9
+
+
+def input_hash(mentor_hash, mentee_hash):
+    """Hash identifying the mentor and mentee records a run was given"""
+    return hashlib.sha256(f'{mentor_hash}:{mentee_hash}'.encode('utf-8')).hexdigest()
+
+
+def _keyed(items, key):
+    """Map key -> item, or None if two items share a key"""
+    by_key = {item.get(key): item for item in items}
+    return by_key if len(by_key) == len(items) else None
+
+
+def encode_list_delta(parent_items, items, key):
+    """
+    Encode a list of dicts as changes to its parent list
+
+    Items are identified by their key field. The delta has the items that
+    are new or differ from the parent, the keys that were dropped and,
+    only if it isn't the parent order with new items appended, the order.
+    Lists with a repeated key are stored in full.
+
+    Returns:
+        dict: {'changed', 'removed', 'order'} or {'full'}
+    """
+    parent_by_key = _keyed(parent_items, key)
+    by_key = _keyed(items, key)
+    if parent_by_key is None or by_key is None:
+        return {'full': items}
+    changed = [item for k, item in by_key.items() if parent_by_key.get(k) != item]
+    removed = [k for k in parent_by_key if k not in by_key]
+    keys = list(by_key)
+    expected = [k for k in parent_by_key if k in by_key] + [k for k in by_key if k not in parent_by_key]
+    return {'changed': changed, 'removed': removed, 'order': keys if keys != expected else None}
+
+
+def apply_list_delta(parent_items, delta, key):
+    """Rebuild a list from its parent list and encode_list_delta's output"""
+    if 'full' in delta:
+        return delta['full']
+    by_key = {item.get(key): item for item in parent_items}
+    for k in delta['removed']:
+        del by_key[k]
+    order = delta['order']
+    if order is None:
+        order = list(by_key) + [item.get(key) for item in delta['changed']
+                                if item.get(key) not in by_key]
+    for item in delta['changed']:
+        by_key[item.get(key)] = item
+    return [by_key[k] for k in order]
+
+
+def _assignment_delta(matches_delta):
+    """(mentee_id, mentor_id, score) changes for the diff, taken from a matches delta"""
+    if 'full' in matches_delta:
+        return {'full': [[m.get('mentee_id'), m.get('mentor_id'), m.get('score', 0)]
+                         for m in matches_delta['full']]}
+    return {
+        'set': [[m.get('mentee_id'), m.get('mentor_id'), m.get('score', 0)]
+                for m in matches_delta['changed']],
+        'removed': matches_delta['removed']
+    }
+
+
+class RunHistory:
+    """
+    Versioned history of matching results in a directory
+
+    Each run is a version with the weights, algorithm, top_k, source
+    (run-matching, job or rematch) and the hash of the mentor and mentee
+    records it was given. Its result is stored as a delta against the
+    previous version: the matches and unmatched mentees that changed,
+    keyed by mentee ID, plus the dropped IDs. Every KEYFRAME_INTERVAL-th
+    version is a full copy.
+
+    Per version, <id>.data.json.gz holds the delta of the whole match document
+    and <id>.assign.json.gz only the (mentee_id, mentor_id, score) triples
+    that changed. Diffs read the triples, so comparing two runs never
+    loads match details such as names and alternatives. index.jsonl has
+    one metadata line per version and is appended last, so a version
+    exists once its line is written. Writers from several processes are
+    serialized with a lock file (POSIX).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        self.lock_path = os.path.join(directory, 'index.lock')
+        self._lock = threading.Lock()
+        # (version id, match document) of the newest version, the parent of the next
+        self._latest = None
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, version_id, kind):
+        return os.path.join(self.directory, f'{version_id}.{kind}.json.gz')
+
+    def _write_file(self, path, data):
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        return os.path.getsize(path)
+
+    def _read_file(self, path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_versions(self):
+        """Metadata of every version, oldest first"""
+        if not os.path.exists(self.index_path):
+            return []
+        versions = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # A line cut short by a crash was never committed
+                if line.endswith('\n'):
+                    versions.append(json.loads(line))
+        return versions
+
+    def _drop_partial_line(self):
+        """Cut a line left unfinished by a crash, so the next one starts cleanly"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb+') as f:
+            content = f.read()
+            if content and not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+
+    def get(self, version_id):
+        """Metadata of one version, or None"""
+        for version in self.list_versions():
+            if version['id'] == version_id:
+                return version
+        return None
+
+    def _chain(self, version_id, versions_by_id):
+        """Versions from the nearest keyframe up to version_id"""
+        chain = []
+        version = versions_by_id[version_id]
+        while True:
+            chain.append(version)
+            if version['keyframe']:
+                return chain[::-1]
+            version = versions_by_id[version['parent_id']]
+
+    def _load(self, version_id, versions_by_id):
+        match_data = {'matches': [], 'unmatched_mentees': []}
+        for version in self._chain(version_id, versions_by_id):
+            delta = self._read_file(self._path(version['id'], 'data'))
+            match_data = {
+                **delta['extra'],
+                'matches': apply_list_delta(match_data['matches'], delta['matches'], 'mentee_id'),
+                'unmatched_mentees': apply_list_delta(
+                    match_data['unmatched_mentees'], delta['unmatched_mentees'], 'id'
+                )
+            }
+        return match_data
+
+    def load(self, version_id):
+        """
+        Rebuild the match document of a version
+
+        Returns:
+            dict: Match document, or None if there is no such version
+        """
+        versions_by_id = {v['id']: v for v in self.list_versions()}
+        if version_id not in versions_by_id:
+            return None
+        return self._load(version_id, versions_by_id)
+
+    def _assignments(self, version_id, versions_by_id):
+        """{mentee_id: (mentor_id, score)} of a version, from the triples files only"""
+        assignments = {}
+        for version in self._chain(version_id, versions_by_id):
+            delta = self._read_file(self._path(version['id'], 'assign'))
+            if 'full' in delta:
+                assignments = {mentee_id: (mentor_id, score)
+                               for mentee_id, mentor_id, score in delta['full']}
+                continue
+            for mentee_id in delta['removed']:
+                del assignments[mentee_id]
+            for mentee_id, mentor_id, score in delta['set']:
+                assignments[mentee_id] = (mentor_id, score)
+        return assignments
+
+    def record(self, match_data, data_hash, weights, algorithm, top_k, source):
+        """
+        Store a matching result as a new version
+
+        Args:
+            match_data: Match document that was saved
+            data_hash: input_hash() of the mentor and mentee records
+            weights, algorithm, top_k: Options of the run
+            source: 'run-matching', 'job' or 'rematch'
+
+        Returns:
+            dict: Metadata of the new version
+        """
+        matches = match_data.get('matches', [])
+        unmatched = match_data.get('unmatched_mentees', [])
+        extra = {k: v for k, v in match_data.items() if k not in ('matches', 'unmatched_mentees')}
+
+        with self._exclusive():
+            self._drop_partial_line()
+            versions = self.list_versions()
+            parent = versions[-1] if versions else None
+            keyframe = parent is None or parent['depth'] + 1 >= KEYFRAME_INTERVAL
+            if keyframe:
+                parent_data = {'matches': [], 'unmatched_mentees': []}
+            elif self._latest is not None and self._latest[0] == parent['id']:
+                parent_data = self._latest[1]
+            else:
+                parent_data = self._load(parent['id'], {v['id']: v for v in versions})
+
+            version_id = parent['id'] + 1 if parent else 1
+            matches_delta = encode_list_delta(parent_data['matches'], matches, 'mentee_id')
+            stored_bytes = self._write_file(self._path(version_id, 'data'), {
+                'extra': extra,
+                'matches': matches_delta,
+                'unmatched_mentees': encode_list_delta(parent_data['unmatched_mentees'],
+                                                       unmatched, 'id')
+            })
+            stored_bytes += self._write_file(self._path(version_id, 'assign'),
+                                             _assignment_delta(matches_delta))
+
+            total_score = sum(match.get('score', 0) for match in matches)
+            version = {
+                'id': version_id,
+                'parent_id': parent['id'] if parent else None,
+                'keyframe': keyframe,
+                'depth': 0 if keyframe else parent['depth'] + 1,
+                'created_at': time.time(),
+                'source': source,
+                'algorithm': algorithm,
+                'weights': weights,
+                'top_k': top_k,
+                'input_hash': data_hash,
+                'total_matches': len(matches),
+                'total_unmatched': len(unmatched),
+                'average_score': round(total_score / len(matches), 4) if matches else 0.0,
+                'changed_matches': (len(matches) if 'full' in matches_delta
+                                    else len(matches_delta['changed']) + len(matches_delta['removed'])),
+                'stored_bytes': stored_bytes
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(version, separators=(',', ':')) + '\n')
+
+            # Keep our own copy: callers may go on to modify match_data
+            self._latest = (version_id, json.loads(json.dumps(
+                {'matches': matches, 'unmatched_mentees': unmatched}
+            )))
+            return version
+
+    def diff(self, from_id, to_id):
+        """
+        Compare the matches of two versions mentee by mentee
+
+        Returns:
+            dict: from and to metadata, counts, and 'changes': one entry per
+                mentee whose mentor or score differs (or who is matched in
+                only one of the versions), largest score movement first;
+                None if either version doesn't exist
+        """
+        versions_by_id = {v['id']: v for v in self.list_versions()}
+        if from_id not in versions_by_id or to_id not in versions_by_id:
+            return None
+        before = self._assignments(from_id, versions_by_id)
+        after = self._assignments(to_id, versions_by_id)
+
+        changes = []
+        counts = {'unchanged': 0, 'mentor_changed': 0, 'score_changed': 0,
+                  'newly_matched': 0, 'no_longer_matched': 0}
+        for mentee_id, (mentor_id, score) in after.items():
+            old = before.get(mentee_id)
+            if old is None:
+                counts['newly_matched'] += 1
+                changes.append((mentee_id, None, mentor_id, None, score))
+            elif old[0] != mentor_id:
+                counts['mentor_changed'] += 1
+                changes.append((mentee_id, old[0], mentor_id, old[1], score))
+            elif abs(old[1] - score) > SCORE_TOLERANCE:
+                counts['score_changed'] += 1
+                changes.append((mentee_id, mentor_id, mentor_id, old[1], score))
+            else:
+                counts['unchanged'] += 1
+        for mentee_id, (mentor_id, score) in before.items():
+            if mentee_id not in after:
+                counts['no_longer_matched'] += 1
+                changes.append((mentee_id, mentor_id, None, score, None))
+
+        def movement(change):
+            return abs((change[4] or 0) - (change[3] or 0))
+
+        changes.sort(key=movement, reverse=True)
+        return {
+            'from': versions_by_id[from_id],
+            'to': versions_by_id[to_id],
+            **counts,
+            'changes': [
+                {
+                    'mentee_id': mentee_id,
+                    'old_mentor_id': old_mentor,
+                    'new_mentor_id': new_mentor,
+                    'old_score': old_score,
+                    'new_score': new_score,
+                    'score_change': round((new_score or 0) - (old_score or 0), 4)
+                }
+                for mentee_id, old_mentor, new_mentor, old_score, new_score in changes
+            ]
+        }
+
+    def get_stats(self):
+        """Number of versions and bytes stored"""
+        versions = self.list_versions()
+        return {
+            'versions': len(versions),
+            'stored_bytes': sum(v['stored_bytes'] for v in versions)
+        }
@@ -0,0 +1,422 @@
+"""
+Dashboard Statistics for Alumni Mentorship Matching Platform
+Counters for /api/stats kept up to date as records and matches are written
+"""
+
+import threading
+from collections import Counter, defaultdict
+
+from matching_logic import parse_max_mentees
+
+
+# Score histogram bins: [0.0, 0.1), [0.1, 0.2), ..., [0.9, 1.0]
+SCORE_BINS = 10
+
+
+def _score_bin(score):
+    return min(max(int((score or 0) * SCORE_BINS), 0), SCORE_BINS - 1)
+
+
+def _discipline(mentee):
+    return str(mentee.get('discipline') or '').strip() or 'Unknown'
+
+
+def _is_verified(match):
+    return match.get('status') == 'verified'
+
+
+class StatsCounters:
+    """
+    Aggregates behind /api/stats
+
+    Mentors and mentees are tracked by ID and matches by (mentee_id,
+    mentor_id) pair. Every change is applied as remove-then-add on the
+    affected entries, so each write costs O(changed entries). Per-discipline
+    coverage counts mentees with at least one match ('matched') and with a
+    verified match ('verified').
+
+    exact is cleared when IDs or pairs repeat; the counters then no longer
+    follow the backend's first-match-wins updates and must be recounted.
+    """
+
+    def __init__(self):
+        self.exact = True
+        self.mentors = {}
+        self.mentees = {}
+        self.matches = {}
+        self.pairs_by_mentor = defaultdict(set)
+        self.pairs_by_mentee = defaultdict(set)
+        self.status = Counter()
+        self.load = Counter()
+        self.verified_load = Counter()
+        self.mentee_matches = Counter()
+        self.mentee_verified = Counter()
+        self.score_bins = [0] * SCORE_BINS
+        self.discipline_mentees = Counter()
+        self.discipline_matched = Counter()
+        self.discipline_verified = Counter()
+
+    @classmethod
+    def from_data(cls, mentors, mentees, matches):
+        """Count everything from scratch"""
+        counters = cls()
+        for mentor in mentors:
+            counters.set_mentor(mentor.get('id'), mentor)
+        for mentee in mentees:
+            counters.set_mentee(mentee.get('id'), mentee)
+        counters.set_matches(matches)
+        if len(counters.mentors) != len(mentors) or len(counters.mentees) != len(mentees):
+            counters.exact = False
+        return counters
+
+    # Records
+
+    def set_mentor(self, mentor_id, mentor):
+        """Add, replace (mentor dict) or remove (None) a mentor"""
+        if mentor is None:
+            self.mentors.pop(mentor_id, None)
+        else:
+            self.mentors[mentor_id] = parse_max_mentees(mentor)
+
+    def set_mentee(self, mentee_id, mentee):
+        """Add, replace (mentee dict) or remove (None) a mentee, moving its coverage"""
+        old = self.mentees.pop(mentee_id, None)
+        new = _discipline(mentee) if mentee is not None else None
+        for discipline, sign in ((old, -1), (new, 1)):
+            if discipline is None:
+                continue
+            self.discipline_mentees[discipline] += sign
+            if self.mentee_matches[mentee_id]:
+                self.discipline_matched[discipline] += sign
+            if self.mentee_verified[mentee_id]:
+                self.discipline_verified[discipline] += sign
+        if new is not None:
+            self.mentees[mentee_id] = new
+
+    # Matches
+
+    def _add_match(self, match):
+        pair = (match.get('mentee_id'), match.get('mentor_id'))
+        if pair in self.matches:
+            self.exact = False
+            return
+        mentee_id, mentor_id = pair
+        verified = _is_verified(match)
+        self.matches[pair] = (match.get('status'), match.get('score', 0), verified)
+        self.pairs_by_mentor[mentor_id].add(pair)
+        self.pairs_by_mentee[mentee_id].add(pair)
+        self.status[match.get('status')] += 1
+        self.load[mentor_id] += 1
+        self.score_bins[_score_bin(match.get('score', 0))] += 1
+        discipline = self.mentees.get(mentee_id)
+        self.mentee_matches[mentee_id] += 1
+        if self.mentee_matches[mentee_id] == 1 and discipline is not None:
+            self.discipline_matched[discipline] += 1
+        if verified:
+            self.verified_load[mentor_id] += 1
+            self.mentee_verified[mentee_id] += 1
+            if self.mentee_verified[mentee_id] == 1 and discipline is not None:
+                self.discipline_verified[discipline] += 1
+
+    def _remove_match(self, pair):
+        status, score, verified = self.matches.pop(pair)
+        mentee_id, mentor_id = pair
+        self.pairs_by_mentor[mentor_id].discard(pair)
+        self.pairs_by_mentee[mentee_id].discard(pair)
+        self.status[status] -= 1
+        self.load[mentor_id] -= 1
+        self.score_bins[_score_bin(score)] -= 1
+        discipline = self.mentees.get(mentee_id)
+        self.mentee_matches[mentee_id] -= 1
+        if self.mentee_matches[mentee_id] == 0 and discipline is not None:
+            self.discipline_matched[discipline] -= 1
+        if verified:
+            self.verified_load[mentor_id] -= 1
+            self.mentee_verified[mentee_id] -= 1
+            if self.mentee_verified[mentee_id] == 0 and discipline is not None:
+                self.discipline_verified[discipline] -= 1
+
+    def set_matches(self, matches):
+        """Replace every match"""
+        for pair in list(self.matches):
+            self._remove_match(pair)
+        for match in matches:
+            self._add_match(match)
+
+    def update_matches(self, changes):
+        """Apply (mentee_id, mentor_id, updates) changes like storage.update_matches"""
+        # Look every pair up before changing any, since updates change pairs
+        if not all((m, n) in self.matches for m, n, _ in changes):
+            self.exact = False
+            return
+        current = [(pair, self.matches[pair]) for pair in ((m, n) for m, n, _ in changes)]
+        for pair, _ in current:
+            self._remove_match(pair)
+        for (pair, (status, score, _)), (_, _, updates) in zip(current, changes):
+            match = {'mentee_id': pair[0], 'mentor_id': pair[1], 'status': status, 'score': score}
+            match.update(updates)
+            self._add_match(match)
+
+    def remove_matches_of(self, data_type, record_id):
+        """Drop the matches of a deleted mentor or mentee"""
+        index = self.pairs_by_mentor if data_type == 'mentor' else self.pairs_by_mentee
+        for pair in list(index.get(record_id, ())):
+            self._remove_match(pair)
+
+    def render(self):
+        """The /api/stats payload"""
+        verified_mentees = sum(self.discipline_verified.values())
+        mentor_load = {}
+        for mentor_id, count in self.load.items():
+            if count:
+                mentor_load[mentor_id] = {
+                    'matches': count,
+                    'verified': self.verified_load[mentor_id],
+                    'max_mentees': self.mentors.get(mentor_id)
+                }
+        mentors_full = mentors_over_capacity = 0
+        for mentor_id, capacity in self.mentors.items():
+            load = self.load[mentor_id]
+            mentors_full += load >= capacity
+            mentors_over_capacity += load > capacity
+        return {
+            'total_mentors': len(self.mentors),
+            'total_mentees': len(self.mentees),
+            'total_matches': len(self.matches),
+            'verified_matches': self.status['verified'],
+            'unmatched_mentees': len(self.mentees) - verified_mentees,
+            'mentor_capacity_usage': {
+                mentor_id: count for mentor_id, count in self.verified_load.items() if count
+            },
+            'status_counts': {
+                str(status): count for status, count in self.status.items() if count
+            },
+            'mentor_load': mentor_load,
+            'capacity': {
+                'total_slots': sum(max(capacity, 0) for capacity in self.mentors.values()),
+                'mentors_full': mentors_full,
+                'mentors_over_capacity': mentors_over_capacity
+            },
+            'score_histogram': [
+                {'min': i / SCORE_BINS, 'max': (i + 1) / SCORE_BINS, 'count': count}
+                for i, count in enumerate(self.score_bins)
+            ],
+            'discipline_coverage': {
+                discipline: {
+                    'mentees': count,
+                    'matched': self.discipline_matched[discipline],
+                    'verified': self.discipline_verified[discipline]
+                }
+                for discipline, count in sorted(self.discipline_mentees.items()) if count
+            }
+        }
+
+
+class StatsTracker:
+    """
+    Storage backend wrapper that keeps StatsCounters in step with writes
+
+    Each write method is forwarded to the backend and the same change is
+    applied to the counters, so get_stats() never rereads the collections.
+    The counters are tagged with the data versions they reflect. A write
+    only updates them when the versions before it matched and the backend
+    reports exactly one write to each collection it touches; anything else
+    (a write from another worker, an exception, repeated IDs) leaves them
+    stale, and the next get_stats() recounts from storage.
+
+    Writes through the wrapper are serialized within the process.
+    """
+
+    def __init__(self, storage):
+        self._storage = storage
+        self._lock = threading.RLock()
+        self._counters = None
+        self._versions = None
+        self._payload = None
+        self.recounts = 0
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+    def _recount(self):
+        """Replace the counters with a count from storage"""
+        # Versions are read first, so a write racing the reads only makes
+        # the counters look stale
+        versions = self._storage.data_versions()
+        self._counters = StatsCounters.from_data(
+            self._storage.get_records('mentor'),
+            self._storage.get_records('mentee'),
+            self._storage.get_match_data().get('matches', [])
+        )
+        self._versions = versions if self._counters.exact else None
+        self._payload = None
+        self.recounts += 1
+
+    def _fresh_counters(self):
+        """The counters, recounted first if storage changed behind our back"""
+        if self._counters is None or self._versions != self._storage.data_versions():
+            self._recount()
+        return self._counters
+
+    def get_stats(self):
+        """Current /api/stats payload, recounted only if storage changed behind our back"""
+        with self._lock:
+            self._fresh_counters()
+            if self._payload is None:
+                self._payload = self._counters.render()
+            return self._payload
+
+    def mentor_availability(self, mentor_ids, mentee_id=None):
+        """
+        Live load and capacity of some mentors
+
+        Returns:
+            tuple: (loads, capacities, matched) where loads and capacities
+                are aligned with mentor_ids (capacity None for an unknown
+                mentor) and matched is the set of mentor IDs already matched
+                with mentee_id
+        """
+        with self._lock:
+            counters = self._fresh_counters()
+            loads = [counters.load[mentor_id] for mentor_id in mentor_ids]
+            capacities = [counters.mentors.get(mentor_id) for mentor_id in mentor_ids]
+            matched = {mentor_id for _, mentor_id in counters.pairs_by_mentee.get(mentee_id, ())}
+            return loads, capacities, matched
+
+    def check(self):
+        """
+        Recount from storage and compare with the tracked counters
+
+        The recount replaces the tracked counters either way.
+
+        Returns:
+            dict: consistent flag and the fields that differed
+        """
+        with self._lock:
+            tracked = self._counters.render() if self._counters is not None else None
+            tracked_versions = self._versions
+            self._recount()
+            expected = self._counters.render()
+            versions = self._storage.data_versions()
+
+        if tracked is None or tracked_versions != versions:
+            return {'consistent': None, 'reason': 'Counters were stale and have been recounted',
+                    'differences': {}}
+        differences = {
+            field: {'tracked': tracked.get(field), 'recounted': value}
+            for field, value in expected.items() if tracked.get(field) != value
+        }
+        return {'consistent': not differences, 'differences': differences}
+
+    def _write(self, collections, call, apply):
+        """Run a write and, if it was the only change, apply it to the counters"""
+        with self._lock:
+            before = self._storage.data_versions()
+            try:
+                result = call()
+            except BaseException:
+                self._versions = None
+                raise
+            after = self._storage.data_versions()
+            in_step = self._counters is not None and self._versions == before and all(
+                after[c] == before[c]
+                or (c in collections and self._storage.is_next_version(before[c], after[c]))
+                for c in after
+            )
+            if in_step:
+                apply(result)
+                self._versions = after if self._counters.exact else None
+                self._payload = None
+            else:
+                self._versions = None
+            return result
+
+    def _set_record(self, data_type, record_id, record):
+        if data_type == 'mentor':
+            self._counters.set_mentor(record_id, record)
+        else:
+            self._counters.set_mentee(record_id, record)
+
+    # Write methods of the storage backends
+
+    def upsert_records(self, data_type, records):
+        def apply(_):
+            # IDs were assigned in place by the backend
+            for record in records:
+                self._set_record(data_type, record['id'], record)
+        return self._write((data_type,), lambda: self._storage.upsert_records(data_type, records),
+                           apply)
+
+    def upsert_records_stream(self, data_type, records):
+        # Keep only what the counters need, not the streamed records; the
+        # backend assigns a record's ID before reading the next record
+        summaries = []
+
+        def summarized(records):
+            previous = None
+            for record in records:
+                if previous is not None:
+                    summaries.append((previous['id'], self._summary(data_type, previous)))
+                previous = record
+                yield record
+            if previous is not None:
+                summaries.append((previous['id'], self._summary(data_type, previous)))
+
+        def apply(_):
+            for record_id, summary in summaries:
+                self._set_record(data_type, record_id, summary)
+
+        return self._write(
+            (data_type,),
+            lambda: self._storage.upsert_records_stream(data_type, summarized(records)),
+            apply
+        )
+
+    @staticmethod
+    def _summary(data_type, record):
+        key = 'max_mentees' if data_type == 'mentor' else 'discipline'
+        return {key: record.get(key)} if key in record else {}
+
+    def update_record(self, data_type, record_id, record):
+        def apply(updated):
+            if updated:
+                self._set_record(data_type, record_id, record)
+        return self._write((data_type,),
+                           lambda: self._storage.update_record(data_type, record_id, record), apply)
+
+    def delete_record(self, data_type, record_id):
+        def apply(_):
+            self._counters.remove_matches_of(data_type, record_id)
+            self._set_record(data_type, record_id, None)
+        return self._write((data_type, 'matches'),
+                           lambda: self._storage.delete_record(data_type, record_id), apply)
+
+    def clear_records(self, data_type):
+        def apply(_):
+            self._counters.set_matches([])
+            for record_id in list(getattr(self._counters, f'{data_type}s')):
+                self._set_record(data_type, record_id, None)
+        return self._write((data_type, 'matches'),
+                           lambda: self._storage.clear_records(data_type), apply)
+
+    def save_match_data(self, match_data):
+        def apply(_):
+            self._counters.set_matches(match_data.get('matches', []))
+        return self._write(('matches',), lambda: self._storage.save_match_data(match_data), apply)
+
+    def update_match(self, mentee_id, mentor_id, updates):
+        def apply(updated):
+            if updated:
+                self._counters.update_matches([(mentee_id, mentor_id, updates)])
+        return self._write(('matches',),
+                           lambda: self._storage.update_match(mentee_id, mentor_id, updates), apply)
+
+    def update_matches(self, changes):
+        def apply(updated):
+            if updated:
+                self._counters.update_matches(changes)
+        return self._write(('matches',), lambda: self._storage.update_matches(changes), apply)
+
+    def clear_matches(self):
+        return self._write(('matches',), self._storage.clear_matches,
+                           lambda _: self._counters.set_matches([]))
@@ -0,0 +1,751 @@
+"""
+Storage Backends for Alumni Mentorship Matching Platform
+Pluggable persistence for mentors, mentees and matches (JSON files or SQLite)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from match_journal import DEFAULT_SYNC_INTERVAL, MatchJournal
+
+
+# Record types and the names used for their files/tables
+RECORD_TABLES = {'mentor': 'mentors', 'mentee': 'mentees'}
+
+# Keys of the match document that are stored as rows rather than metadata
+MATCH_LIST_KEYS = ('matches', 'unmatched_mentees')
+
+# Collections tracked by data_versions(): the two record types and the match document
+COLLECTIONS = ('mentor', 'mentee', 'matches')
+
+
+def encode_json(value):
+    """Compact JSON text (no indentation or spaces) for stored files and rows"""
+    return json.dumps(value, separators=(',', ':'))
+
+
+def empty_match_data():
+    """Match document used before any matching run"""
+    return {'matches': [], 'unmatched_mentees': [], 'weights': {}}
+
+
+# Rows written per executemany call when streaming an upload into SQLite
+UPSERT_BATCH_SIZE = 1000
+
+
+def _with_ids(records, max_id):
+    """
+    Give records without an ID a new one after the current maximum
+
+    Works on any iterable and yields records one at a time, so uploads can
+    be streamed.
+    """
+    for i, record in enumerate(records):
+        if 'id' not in record:
+            record['id'] = max_id + i + 1
+        yield record
+
+
+class JsonStorage:
+    """
+    Stores each collection as a whole JSON document in the data directory
+
+    Every write rewrites the full file. Kept for compatibility with existing
+    deployments; use SQLiteStorage for large cohorts or multiple workers.
+    """
+
+    def __init__(self, data_dir, initialize=True):
+        self.data_dir = data_dir
+        self.mentors_file = os.path.join(data_dir, 'mentors.json')
+        self.mentees_file = os.path.join(data_dir, 'mentees.json')
+        self.matches_file = os.path.join(data_dir, 'matches.json')
+        self._local_writes = {path: 0 for path in self._collection_files().values()}
+        if initialize:
+            self._init_data_files()
+
+    def _init_data_files(self):
+        """Initialize JSON data files if they don't exist"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for path in (self.mentors_file, self.mentees_file, self.matches_file):
+            if not os.path.exists(path):
+                with open(path, 'w') as f:
+                    json.dump([], f)
+
+    def _records_file(self, data_type):
+        return self.mentors_file if data_type == 'mentor' else self.mentees_file
+
+    def _collection_files(self):
+        return {
+            'mentor': self.mentors_file,
+            'mentee': self.mentees_file,
+            'matches': self.matches_file
+        }
+
+    def _read(self, path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write(self, path, data):
+        # Write to a temporary file and rename it so readers never see a
+        # partially written document
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(encode_json(data))
+        os.replace(temp_path, path)
+        self._local_writes[path] += 1
+
+    def data_versions(self):
+        """
+        Cheap change tokens for each collection
+
+        A file's token is its mtime, size and inode plus the number of writes
+        made through this process, so edits by other workers are detected
+        by stat() and back-to-back local writes can't share a token.
+
+        Returns:
+            dict: {collection: token} for 'mentor', 'mentee' and 'matches'
+        """
+        versions = {}
+        for collection, path in self._collection_files().items():
+            try:
+                stat = os.stat(path)
+                file_token = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except FileNotFoundError:
+                file_token = None
+            versions[collection] = (file_token, self._local_writes[path])
+        return versions
+
+    @staticmethod
+    def is_next_version(before, after):
+        """Whether after is the token of a collection right after one write by this process"""
+        return after[1] == before[1] + 1
+
+    def get_records(self, data_type):
+        """Get all mentors or mentees in upload order"""
+        return self._read(self._records_file(data_type), [])
+
+    def upsert_records(self, data_type, records):
+        """
+        Add new records and replace existing ones with the same ID
+
+        Returns:
+            int: Total number of records after the upload
+        """
+        return self.upsert_records_stream(data_type, records)[1]
+
+    def upsert_records_stream(self, data_type, records):
+        """
+        Upsert records from any iterable in a single pass
+
+        Returns:
+            tuple: (records uploaded, total number of records after the upload)
+        """
+        target_file = self._records_file(data_type)
+        existing_data = self._read(target_file, [])
+        max_id = max([r.get('id', 0) for r in existing_data], default=0)
+
+        # Merge with existing data (update if ID exists, append if new)
+        position = {}
+        for i, existing in enumerate(existing_data):
+            position.setdefault(existing['id'], i)
+        uploaded = 0
+        for record in _with_ids(records, max_id):
+            if record['id'] in position:
+                existing_data[position[record['id']]] = record
+            else:
+                position[record['id']] = len(existing_data)
+                existing_data.append(record)
+            uploaded += 1
+
+        self._write(target_file, existing_data)
+        return uploaded, len(existing_data)
+
+    def update_record(self, data_type, record_id, record):
+        """
+        Replace a single record, preserving its ID
+
+        Returns:
+            bool: False if no record has that ID
+        """
+        target_file = self._records_file(data_type)
+        records = self._read(target_file, [])
+
+        for i, existing in enumerate(records):
+            if existing.get('id') == record_id:
+                record['id'] = record_id  # Preserve ID
+                records[i] = record
+                self._write(target_file, records)
+                return True
+        return False
+
+    def delete_record(self, data_type, record_id):
+        """Delete a mentor or mentee record and the matches that reference it"""
+        target_file = self._records_file(data_type)
+        records = [r for r in self._read(target_file, []) if r.get('id') != record_id]
+        self._write(target_file, records)
+
+        if not os.path.exists(self.matches_file):
+            return
+        match_data = self.get_match_data()
+
+        # Remove matches that reference the deleted mentor or mentee
+        key = 'mentor_id' if data_type == 'mentor' else 'mentee_id'
+        match_data['matches'] = [
+            m for m in match_data.get('matches', []) if m.get(key) != record_id
+        ]
+
+        # Also clean up unmatched_mentees if a mentee was deleted
+        if data_type == 'mentee':
+            match_data['unmatched_mentees'] = [
+                m for m in match_data.get('unmatched_mentees', []) if m.get('id') != record_id
+            ]
+
+        self._write(self.matches_file, match_data)
+
+    def clear_records(self, data_type):
+        """Delete all mentors or mentees and the matches that reference them"""
+        self._write(self._records_file(data_type), [])
+
+        if not os.path.exists(self.matches_file):
+            return
+        match_data = self.get_match_data()
+
+        # Every match references a mentor and a mentee, so all of them go
+        match_data['matches'] = []
+        if data_type == 'mentee':
+            match_data['unmatched_mentees'] = []
+
+        self._write(self.matches_file, match_data)
+
+    def get_match_data(self):
+        """Get the match document (matches, unmatched_mentees, weights, ...)"""
+        data = self._read(self.matches_file, None)
+        # A freshly initialized file holds an empty list
+        if not isinstance(data, dict):
+            return empty_match_data()
+        return data
+
+    def save_match_data(self, match_data):
+        """Replace the match document"""
+        self._write(self.matches_file, match_data)
+
+    def get_match(self, mentee_id, mentor_id):
+        """Get the first match for a (mentee, mentor) pair, or None"""
+        for match in self.get_match_data().get('matches', []):
+            if match.get('mentee_id') == mentee_id and match.get('mentor_id') == mentor_id:
+                return match
+        return None
+
+    def update_match(self, mentee_id, mentor_id, updates):
+        """
+        Apply field updates to the first match for a (mentee, mentor) pair
+
+        Returns:
+            bool: False if no such match exists
+        """
+        match_data = self.get_match_data()
+        for match in match_data.get('matches', []):
+            if match.get('mentee_id') == mentee_id and match.get('mentor_id') == mentor_id:
+                match.update(updates)
+                self._write(self.matches_file, match_data)
+                return True
+        return False
+
+    def update_matches(self, changes):
+        """
+        Apply field updates to many matches with a single file write
+
+        Args:
+            changes: List of (mentee_id, mentor_id, updates); each applies
+                to the first match for that pair as it was before the call
+
+        Returns:
+            bool: False, with nothing written, if any pair has no match
+        """
+        match_data = self.get_match_data()
+        by_pair = {}
+        for match in match_data.get('matches', []):
+            by_pair.setdefault((match.get('mentee_id'), match.get('mentor_id')), match)
+        targets = [by_pair.get((mentee_id, mentor_id)) for mentee_id, mentor_id, _ in changes]
+        if any(match is None for match in targets):
+            return False
+        for match, (_, _, updates) in zip(targets, changes):
+            match.update(updates)
+        self._write(self.matches_file, match_data)
+        return True
+
+    def clear_matches(self):
+        """Clear all matches"""
+        self._write(self.matches_file, empty_match_data())
+
+
+class JournalStorage(JsonStorage):
+    """
+    JSON storage for mentors and mentees, with matches kept in a MatchJournal
+
+    Approving, reassigning and deleting append a small entry to
+    matches.journal instead of rewriting the whole match document; a
+    matching run writes a new matches.snapshot. Each process keeps the
+    document in memory and only replays what other workers appended, so a
+    new worker loads the snapshot and the log tail rather than parsing
+    matches.json. An existing matches.json is imported on first start.
+    """
+
+    def __init__(self, data_dir, sync_interval=DEFAULT_SYNC_INTERVAL, initialize=True):
+        super().__init__(data_dir, initialize)
+        self.journal = MatchJournal(os.path.join(data_dir, 'matches'), sync_interval,
+                                    legacy_file=self.matches_file)
+        if initialize:
+            self.journal.initialize()
+
+    def _init_data_files(self):
+        """Initialize the mentor and mentee files; the journal creates its own"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for path in (self.mentors_file, self.mentees_file):
+            if not os.path.exists(path):
+                with open(path, 'w') as f:
+                    json.dump([], f)
+
+    def _append(self, operation):
+        if not self.journal.append(operation):
+            return False
+        self._local_writes[self.matches_file] += 1
+        return True
+
+    def data_versions(self):
+        """Like JsonStorage.data_versions, with the journal's files as the token of 'matches'"""
+        versions = super().data_versions()
+        versions['matches'] = (self.journal.version_token(), self._local_writes[self.matches_file])
+        return versions
+
+    def delete_record(self, data_type, record_id):
+        """Delete a mentor or mentee record and the matches that reference it"""
+        target_file = self._records_file(data_type)
+        records = [r for r in self._read(target_file, []) if r.get('id') != record_id]
+        self._write(target_file, records)
+        self._append({'op': 'delete_references', 'data_type': data_type, 'id': record_id})
+
+    def clear_records(self, data_type):
+        """Delete all mentors or mentees and the matches that reference them"""
+        self._write(self._records_file(data_type), [])
+        self._append({'op': 'clear_references', 'data_type': data_type})
+
+    def get_match_data(self):
+        """Get the match document (matches, unmatched_mentees, weights, ...)"""
+        return self.journal.read()
+
+    def save_match_data(self, match_data):
+        """Replace the match document with a new snapshot"""
+        self.journal.replace(match_data)
+        self._local_writes[self.matches_file] += 1
+
+    def get_match(self, mentee_id, mentor_id):
+        """Get the first match for a (mentee, mentor) pair, or None"""
+        return self.journal.find(mentee_id, mentor_id)
+
+    def update_match(self, mentee_id, mentor_id, updates):
+        """
+        Apply field updates to the first match for a (mentee, mentor) pair
+
+        Returns:
+            bool: False if no such match exists
+        """
+        return self.update_matches([(mentee_id, mentor_id, updates)])
+
+    def update_matches(self, changes):
+        """
+        Apply field updates to many matches with a single journal entry
+
+        Returns:
+            bool: False, with nothing written, if any pair has no match
+        """
+        return self._append({'op': 'update', 'changes': [list(change) for change in changes]})
+
+    def clear_matches(self):
+        """Clear all matches"""
+        self.save_match_data(empty_match_data())
+
+
+class SQLiteStorage:
+    """
+    Stores records and matches as indexed rows in a SQLite database
+
+    The database runs in WAL mode so readers never block the writer, and
+    every write is a short IMMEDIATE transaction, so concurrent gunicorn
+    workers serialize their writes instead of overwriting each other's
+    files. Records are indexed by ID and matches by mentee_id, mentor_id
+    and status, so single-record updates touch O(log n) pages.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS mentors (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id NOT NULL UNIQUE,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mentees (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id NOT NULL UNIQUE,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS matches (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            mentee_id,
+            mentor_id,
+            status TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_matches_pair ON matches (mentee_id, mentor_id);
+        CREATE INDEX IF NOT EXISTS idx_matches_mentor ON matches (mentor_id);
+        CREATE INDEX IF NOT EXISTS idx_matches_status ON matches (status);
+        CREATE TABLE IF NOT EXISTS unmatched_mentees (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            mentee_id,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_unmatched_mentee ON unmatched_mentees (mentee_id);
+        CREATE TABLE IF NOT EXISTS match_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS data_versions (
+            collection TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+    '''
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        """One connection per thread, opened lazily"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self, *collections):
+        """
+        Run a block of statements as one write transaction
+
+        The version counter of every collection named is bumped in the same
+        transaction, so readers in any worker see the change atomically.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+            connection.executemany(
+                'INSERT INTO data_versions (collection, version) VALUES (?, 1) '
+                'ON CONFLICT(collection) DO UPDATE SET version = version + 1',
+                [(collection,) for collection in collections]
+            )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def data_versions(self):
+        """
+        Change counters for each collection
+
+        Returns:
+            dict: {collection: version} for 'mentor', 'mentee' and 'matches'
+        """
+        versions = dict.fromkeys(COLLECTIONS, 0)
+        versions.update(
+            self._connection().execute('SELECT collection, version FROM data_versions')
+        )
+        return versions
+
+    @staticmethod
+    def is_next_version(before, after):
+        """Whether after is the version of a collection right after one write transaction"""
+        return after == before + 1
+
+    def is_empty(self):
+        """True if no records or matches have been stored yet"""
+        connection = self._connection()
+        for table in ('mentors', 'mentees', 'matches', 'unmatched_mentees', 'match_meta', 'data_versions'):
+            if connection.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone():
+                return False
+        return True
+
+    def get_records(self, data_type):
+        """Get all mentors or mentees in upload order"""
+        rows = self._connection().execute(
+            f'SELECT data FROM {RECORD_TABLES[data_type]} ORDER BY seq'
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def upsert_records(self, data_type, records):
+        """
+        Add new records and replace existing ones with the same ID
+
+        Returns:
+            int: Total number of records after the upload
+        """
+        return self.upsert_records_stream(data_type, records)[1]
+
+    def upsert_records_stream(self, data_type, records):
+        """
+        Upsert records from any iterable in a single transaction
+
+        Records are written in batches of UPSERT_BATCH_SIZE as they are
+        consumed, so memory stays bounded for very large uploads.
+
+        Returns:
+            tuple: (records uploaded, total number of records after the upload)
+        """
+        table = RECORD_TABLES[data_type]
+        uploaded = 0
+        with self._transaction(data_type) as connection:
+            (max_id,) = connection.execute(f'SELECT MAX(id) FROM {table}').fetchone()
+            rows = (
+                (record['id'], encode_json(record))
+                for record in _with_ids(records, max_id or 0)
+            )
+
+            # Updated records keep their position (seq); new ones are appended
+            while True:
+                batch = list(islice(rows, UPSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                connection.executemany(
+                    f'INSERT INTO {table} (id, data) VALUES (?, ?) '
+                    f'ON CONFLICT(id) DO UPDATE SET data = excluded.data',
+                    batch
+                )
+                uploaded += len(batch)
+            (total,) = connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()
+        return uploaded, total
+
+    def update_record(self, data_type, record_id, record):
+        """
+        Replace a single record, preserving its ID
+
+        Returns:
+            bool: False if no record has that ID
+        """
+        record['id'] = record_id  # Preserve ID
+        with self._transaction(data_type) as connection:
+            cursor = connection.execute(
+                f'UPDATE {RECORD_TABLES[data_type]} SET data = ? WHERE id = ?',
+                (encode_json(record), record_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete_record(self, data_type, record_id):
+        """Delete a mentor or mentee record and the matches that reference it"""
+        key = 'mentor_id' if data_type == 'mentor' else 'mentee_id'
+        with self._transaction(data_type, 'matches') as connection:
+            connection.execute(
+                f'DELETE FROM {RECORD_TABLES[data_type]} WHERE id = ?', (record_id,)
+            )
+            connection.execute(f'DELETE FROM matches WHERE {key} = ?', (record_id,))
+            if data_type == 'mentee':
+                connection.execute(
+                    'DELETE FROM unmatched_mentees WHERE mentee_id = ?', (record_id,)
+                )
+
+    def clear_records(self, data_type):
+        """Delete all mentors or mentees and the matches that reference them"""
+        with self._transaction(data_type, 'matches') as connection:
+            connection.execute(f'DELETE FROM {RECORD_TABLES[data_type]}')
+            connection.execute('DELETE FROM matches')
+            if data_type == 'mentee':
+                connection.execute('DELETE FROM unmatched_mentees')
+
+    def get_match_data(self):
+        """Get the match document (matches, unmatched_mentees, weights, ...)"""
+        connection = self._connection()
+        match_data = empty_match_data()
+        for key, value in connection.execute('SELECT key, value FROM match_meta'):
+            match_data[key] = json.loads(value)
+        match_data['matches'] = [
+            json.loads(data)
+            for (data,) in connection.execute('SELECT data FROM matches ORDER BY seq')
+        ]
+        match_data['unmatched_mentees'] = [
+            json.loads(data)
+            for (data,) in connection.execute('SELECT data FROM unmatched_mentees ORDER BY seq')
+        ]
+        return match_data
+
+    def save_match_data(self, match_data):
+        """Replace the match document"""
+        with self._transaction('matches') as connection:
+            connection.execute('DELETE FROM matches')
+            connection.execute('DELETE FROM unmatched_mentees')
+            connection.execute('DELETE FROM match_meta')
+            connection.executemany(
+                'INSERT INTO matches (mentee_id, mentor_id, status, data) VALUES (?, ?, ?, ?)',
+                [
+                    (m.get('mentee_id'), m.get('mentor_id'), m.get('status'), encode_json(m))
+                    for m in match_data.get('matches', [])
+                ]
+            )
+            connection.executemany(
+                'INSERT INTO unmatched_mentees (mentee_id, data) VALUES (?, ?)',
+                [(m.get('id'), encode_json(m)) for m in match_data.get('unmatched_mentees', [])]
+            )
+            connection.executemany(
+                'INSERT INTO match_meta (key, value) VALUES (?, ?)',
+                [
+                    (key, encode_json(value))
+                    for key, value in match_data.items() if key not in MATCH_LIST_KEYS
+                ]
+            )
+
+    def _find_match(self, connection, mentee_id, mentor_id):
+        return connection.execute(
+            'SELECT seq, data FROM matches WHERE mentee_id = ? AND mentor_id = ? '
+            'ORDER BY seq LIMIT 1',
+            (mentee_id, mentor_id)
+        ).fetchone()
+
+    def get_match(self, mentee_id, mentor_id):
+        """Get the first match for a (mentee, mentor) pair, or None"""
+        row = self._find_match(self._connection(), mentee_id, mentor_id)
+        return json.loads(row[1]) if row else None
+
+    def update_match(self, mentee_id, mentor_id, updates):
+        """
+        Apply field updates to the first match for a (mentee, mentor) pair
+
+        Returns:
+            bool: False if no such match exists
+        """
+        with self._transaction('matches') as connection:
+            row = self._find_match(connection, mentee_id, mentor_id)
+            if row is None:
+                return False
+            seq, data = row
+            match = json.loads(data)
+            match.update(updates)
+            connection.execute(
+                'UPDATE matches SET mentee_id = ?, mentor_id = ?, status = ?, data = ? '
+                'WHERE seq = ?',
+                (match.get('mentee_id'), match.get('mentor_id'), match.get('status'),
+                 encode_json(match), seq)
+            )
+        return True
+
+    def update_matches(self, changes):
+        """
+        Apply field updates to many matches in one transaction
+
+        Args:
+            changes: List of (mentee_id, mentor_id, updates); each applies
+                to the first match for that pair as it was before the call
+
+        Returns:
+            bool: False, with nothing written, if any pair has no match
+        """
+        with self._transaction('matches') as connection:
+            # Find every row before updating any, since updates change pairs
+            rows = [self._find_match(connection, mentee_id, mentor_id)
+                    for mentee_id, mentor_id, _ in changes]
+            if any(row is None for row in rows):
+                return False
+            params = []
+            for (seq, data), (_, _, updates) in zip(rows, changes):
+                match = json.loads(data)
+                match.update(updates)
+                params.append((match.get('mentee_id'), match.get('mentor_id'), match.get('status'),
+                               encode_json(match), seq))
+            connection.executemany(
+                'UPDATE matches SET mentee_id = ?, mentor_id = ?, status = ?, data = ? '
+                'WHERE seq = ?',
+                params
+            )
+        return True
+
+    def clear_matches(self):
+        """Clear all matches"""
+        self.save_match_data(empty_match_data())
+
+
+def import_json_files(target, data_dir):
+    """
+    Copy the JSON data files from data_dir into another storage backend
+
+    Args:
+        target: Storage backend to import into (e.g. SQLiteStorage)
+        data_dir: Directory containing mentors.json, mentees.json and matches.json
+
+    Returns:
+        dict: Number of mentors, mentees and matches imported
+    """
+    source = JsonStorage(data_dir, initialize=False)
+    mentors = source.get_records('mentor')
+    mentees = source.get_records('mentee')
+    match_data = source.get_match_data()
+
+    target.upsert_records('mentor', mentors)
+    target.upsert_records('mentee', mentees)
+    target.save_match_data(match_data)
+
+    return {
+        'mentors': len(mentors),
+        'mentees': len(mentees),
+        'matches': len(match_data.get('matches', []))
+    }
+
+
+def create_storage(data_dir):
+    """
+    Create the storage backend selected by the STORAGE_BACKEND env variable
+
+    'sqlite' (default) stores data in DATABASE_PATH (default
+    <data_dir>/mentor_match.db). On first start, existing JSON files in
+    data_dir are imported once. 'json' keeps the whole-file JSON storage.
+    'journal' keeps mentors and mentees in JSON files and matches in a
+    snapshot plus append-only log, fsynced every JOURNAL_SYNC_MS
+    milliseconds (default 50; 0 syncs every write).
+    """
+    backend = os.environ.get('STORAGE_BACKEND', 'sqlite').lower()
+    if backend == 'json':
+        return JsonStorage(data_dir)
+    if backend == 'journal':
+        sync_ms = float(os.environ.get('JOURNAL_SYNC_MS', DEFAULT_SYNC_INTERVAL * 1000))
+        return JournalStorage(data_dir, sync_interval=sync_ms / 1000)
+    if backend != 'sqlite':
+        raise ValueError(
+            f'Unknown STORAGE_BACKEND "{backend}". Must be "sqlite", "json" or "journal"'
+        )
+
+    db_path = os.environ.get('DATABASE_PATH', os.path.join(data_dir, 'mentor_match.db'))
+    storage = SQLiteStorage(db_path)
+
+    legacy = JsonStorage(data_dir, initialize=False)
+    legacy_files = (legacy.mentors_file, legacy.mentees_file, legacy.matches_file)
+    if storage.is_empty() and any(os.path.exists(path) for path in legacy_files):
+        import_json_files(storage, data_dir)
+
+    return storage
+
+
+if __name__ == '__main__':
+    # One-shot import: python storage.py [data_dir] [db_path]
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    target_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(source_dir, 'mentor_match.db')
+    counts = import_json_files(SQLiteStorage(target_path), source_dir)
+    print(f"Imported {counts['mentors']} mentors, {counts['mentees']} mentees "
+          f"and {counts['matches']} matches into {target_path}")
@@ -0,0 +1,159 @@
+"""
+Reassignment Suggestions for Alumni Mentorship Matching Platform
+Ranks mentors for a mentee once and filters them by live capacity on every lookup
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+from feature_encoding import (
+    build_candidate_index,
+    candidate_mentors,
+    encode_features,
+    score_mentee,
+    text_weighted,
+    weight_features,
+    weighted_attributes
+)
+from matching_logic import select_top_k
+from record_store import field_values
+
+
+# Mentors kept in a mentee's precomputed ranking; a lookup that finds fewer
+# than k of them with capacity left ranks the mentee's full candidate list
+RANKING_DEPTH = 64
+
+# Rankers kept per process, one per set of weights
+MAX_RANKERS = 4
+
+
+class SuggestionRanker:
+    """
+    Capacity-blind mentor rankings for one set of mentors, mentees and weights
+
+    Records are encoded once when the ranker is built. A mentee's ranking
+    (its RANKING_DEPTH best mentors with a positive score, best first,
+    ties to the earlier mentor like the matcher) is computed the first time
+    it is asked for and kept, so later lookups only check capacity.
+    """
+
+    def __init__(self, mentors, mentees, weights):
+        self.mentors = mentors
+        self.mentees = mentees
+        features = encode_features(mentors, mentees, text=text_weighted(weights),
+                                   attributes=weighted_attributes(weights))
+        self._weighted = weight_features(features, weights)
+        self._candidate_index = build_candidate_index(features, weights)
+        self.mentor_ids = field_values(mentors, 'id')
+        self.mentor_names = field_values(mentors, 'name', 'Unknown')
+        self._mentee_rows = {}
+        for row, mentee_id in enumerate(field_values(mentees, 'id')):
+            self._mentee_rows.setdefault(mentee_id, row)
+        self._lock = threading.Lock()
+        self._rankings = {}
+
+    def has_mentee(self, mentee_id):
+        return mentee_id in self._mentee_rows
+
+    def ranking(self, mentee_id, full=False):
+        """
+        Ranked mentors for a mentee
+
+        Returns:
+            tuple: (positions, scores, truncated) where positions index the
+                mentor list and truncated means mentors beyond
+                RANKING_DEPTH were left out
+        """
+        row = self._mentee_rows[mentee_id]
+        with self._lock:
+            ranking = self._rankings.get(row)
+        if ranking is not None and (not full or not ranking[2]):
+            return ranking
+
+        candidates = candidate_mentors(self._candidate_index, row)
+        scores = score_mentee(self._weighted, row, candidates)
+        positive = scores > 0
+        candidates, scores = candidates[positive], scores[positive]
+        depth = len(scores) if full else RANKING_DEPTH
+        order = select_top_k(scores, depth)
+        ranking = (candidates[order], scores[order], len(scores) > depth)
+        with self._lock:
+            self._rankings[row] = ranking
+        return ranking
+
+
+class SuggestionService:
+    """
+    Builds and keeps SuggestionRankers for the current records
+
+    A ranker is reused while the cache hands out the same mentor and
+    mentee collections, i.e. until either changes, and rebuilt afterwards.
+    """
+
+    def __init__(self, cache, storage):
+        self.cache = cache
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._rankers = OrderedDict()
+
+    def _ranker(self, weights):
+        mentors = self.cache.get_records('mentor')
+        mentees = self.cache.get_records('mentee')
+        key = json.dumps(weights, sort_keys=True)
+        with self._lock:
+            ranker = self._rankers.get(key)
+            if ranker is not None and ranker.mentors is mentors and ranker.mentees is mentees:
+                self._rankers.move_to_end(key)
+                return ranker
+
+        ranker = SuggestionRanker(mentors, mentees, weights)
+        with self._lock:
+            self._rankers[key] = ranker
+            self._rankers.move_to_end(key)
+            while len(self._rankers) > MAX_RANKERS:
+                self._rankers.popitem(last=False)
+        return ranker
+
+    def suggest(self, mentee_id, k, weights):
+        """
+        The k best mentors for a mentee that have capacity left right now
+
+        Load counts every saved match of a mentor, pending or verified, as
+        /api/verify-matches does, and is read from the live counters that
+        every write updates. Mentors already matched with the mentee are
+        left out.
+
+        Returns:
+            dict: current_mentor_ids and suggestions (mentor_id,
+                mentor_name, score, load, max_mentees, remaining), or None
+                if the mentee doesn't exist
+        """
+        ranker = self._ranker(weights)
+        if not ranker.has_mentee(mentee_id):
+            return None
+
+        for full in (False, True):
+            positions, scores, truncated = ranker.ranking(mentee_id, full)
+            positions = positions.tolist()
+            mentor_ids = [ranker.mentor_ids[position] for position in positions]
+            loads, capacities, current = self.storage.mentor_availability(mentor_ids, mentee_id)
+            suggestions = []
+            for i, mentor_id in enumerate(mentor_ids):
+                capacity = capacities[i]
+                if capacity is None or loads[i] >= capacity or mentor_id in current:
+                    continue
+                suggestions.append({
+                    'mentor_id': mentor_id,
+                    'mentor_name': ranker.mentor_names[positions[i]],
+                    'score': float(scores[i]),
+                    'load': loads[i],
+                    'max_mentees': capacity,
+                    'remaining': capacity - loads[i]
+                })
+                if len(suggestions) == k:
+                    break
+            if len(suggestions) == k or not truncated:
+                break
+
+        return {'current_mentor_ids': sorted(current, key=str), 'suggestions': suggestions}
@@ -0,0 +1,209 @@
+"""
+Free-Text Similarity for the Matching Algorithm
+Sparse TF-IDF vectors over the long-form answers of mentor and mentee records
+"""
+
+import math
+import re
+import threading
+
+import numpy as np
+from scipy import sparse
+
+
+# Long-form Google Form answers compared for the text criterion. Headers are
+# lowercased by ingestion; a column is used when it starts with one of these.
+TEXT_COLUMNS = {
+    'mentor': (
+        'current job title',
+        'please briefly describe your career background',
+        'what do you hope to provide as a mentor',
+        'is there any other information you would like to share',
+    ),
+    'mentee': (
+        'remember that alumni have gone through their senior year',  # desired job title
+        'as a mentee what would you like to gain from this experience',
+        'is there any other information you would like to share',
+    ),
+}
+
+# Terms used by more than this share of all records carry no signal
+# ("career", "advice" on a mentorship form) and are left out of the vectors
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each etc few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my myself no nor not now of off
+on once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why will
+with would yes you your yours
+""".split())
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase words of two or more characters, without stop words"""
+    return [
+        token for token in _TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+class TextVectorizer:
+    """
+    TF-IDF vectorizer with a per-record cache
+
+    Tokenizing is the expensive part, so each record's term counts are kept
+    under its type and ID and only recomputed when its text changes. The
+    IDF is refitted on the whole current corpus by fit() (one vectorized
+    pass over the cached counts), and records that are no longer in the
+    corpus are dropped from the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vocabulary = {}
+        self._column_is_text = {'mentor': {}, 'mentee': {}}
+        self._vectors = {}
+        self.idf = np.zeros(0)
+        self.num_documents = 0
+
+    def record_text(self, record, data_type):
+        """Concatenate the text columns of one record"""
+        is_text = self._column_is_text[data_type]
+        parts = []
+        for column, value in record.items():
+            flag = is_text.get(column)
+            if flag is None:
+                flag = is_text[column] = column.startswith(TEXT_COLUMNS[data_type])
+            if flag and value:
+                parts.append(str(value))
+        return ' '.join(parts)
+
+    def _count_terms(self, text):
+        term_ids, counts = np.unique(
+            np.array([self._vocabulary.setdefault(token, len(self._vocabulary))
+                      for token in tokenize(text)], dtype=np.int64),
+            return_counts=True
+        )
+        return term_ids, counts.astype(np.float64)
+
+    def term_counts(self, record, data_type):
+        """
+        Term counts of one record, from the cache when its text is unchanged
+
+        Returns:
+            tuple: (text, term_ids, counts) with term_ids sorted
+        """
+        text = self.record_text(record, data_type)
+        key = (data_type, record.get('id'))
+        with self._lock:
+            cached = self._vectors.get(key)
+            if cached is not None and cached[0] == text:
+                return cached
+            entry = (text,) + self._count_terms(text)
+            if key[1] is not None:
+                self._vectors[key] = entry
+            return entry
+
+    def fit(self, mentors, mentees):
+        """
+        Refresh the cached term counts and refit the IDF on these records
+
+        Uses the smoothed IDF ln((1 + n) / (1 + df)) + 1; terms above
+        MAX_DOCUMENT_FREQUENCY get an IDF of 0.
+
+        Returns:
+            tuple: (mentor_entries, mentee_entries) term_counts() results
+                aligned with the records
+        """
+        mentor_entries = [self.term_counts(mentor, 'mentor') for mentor in mentors]
+        mentee_entries = [self.term_counts(mentee, 'mentee') for mentee in mentees]
+        entries = mentor_entries + mentee_entries
+        with self._lock:
+            live = {('mentor', m.get('id')) for m in mentors} | {('mentee', m.get('id')) for m in mentees}
+            for key in [key for key in self._vectors if key not in live]:
+                del self._vectors[key]
+
+            num_terms = len(self._vocabulary)
+            term_ids = [entry[1] for entry in entries]
+            document_frequency = np.bincount(
+                np.concatenate(term_ids) if term_ids else np.zeros(0, dtype=np.int64),
+                minlength=num_terms
+            )
+            num_documents = len(entries)
+            idf = np.log((1 + num_documents) / (1 + document_frequency)) + 1
+            idf[document_frequency > MAX_DOCUMENT_FREQUENCY * max(num_documents, 1)] = 0.0
+            self.idf = idf
+            self.num_documents = num_documents
+        return mentor_entries, mentee_entries
+
+    def _idf_for(self, term_ids):
+        """IDF of term IDs, treating terms first seen after fit() as unseen"""
+        idf = np.full(len(term_ids), math.log(1 + self.num_documents) + 1)
+        known = term_ids < len(self.idf)
+        idf[known] = self.idf[term_ids[known]]
+        return idf
+
+    def matrix(self, entries, num_terms):
+        """
+        L2-normalized TF-IDF rows for a list of term_counts() entries
+
+        Args:
+            entries: term_counts() results
+            num_terms: Number of columns (vocabulary size when the entries
+                were counted, or later)
+
+        Returns:
+            scipy.sparse.csr_matrix: one row per entry, one column per term
+        """
+        lengths = np.array([len(entry[1]) for entry in entries], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        if indptr[-1]:
+            indices = np.concatenate([entry[1] for entry in entries])
+            data = np.concatenate([entry[2] for entry in entries]) * self._idf_for(indices)
+        else:
+            indices = np.zeros(0, dtype=np.int64)
+            data = np.zeros(0)
+
+        # Rows without text, or with only very common terms, stay all zero
+        starts = indptr[:-1][lengths > 0]
+        norms = np.zeros(len(entries))
+        norms[lengths > 0] = np.sqrt(np.add.reduceat(data * data, starts)) if len(starts) else 0.0
+        row_norms = np.repeat(norms, lengths)
+        data = np.divide(data, row_norms, out=np.zeros_like(data), where=row_norms > 0)
+        result = sparse.csr_matrix((data, indices, indptr), shape=(len(entries), num_terms))
+        result.eliminate_zeros()
+        return result
+
+    def similarity_table(self, mentee_entries, mentor_entries):
+        """
+        Cosine similarity of every mentee entry with every mentor entry
+
+        One sparse matrix product; pairs without a shared term are not stored.
+
+        Returns:
+            scipy.sparse.csr_matrix: (mentees, mentors) with sorted indices
+        """
+        num_terms = len(self._vocabulary)
+        table = (
+            self.matrix(mentee_entries, num_terms) @ self.matrix(mentor_entries, num_terms).T
+        ).tocsr()
+        table.sort_indices()
+        return table
+
+    def similarity(self, mentor, mentee):
+        """Cosine similarity of one pair, equal to its entry in similarity_table"""
+        table = self.similarity_table(
+            [self.term_counts(mentee, 'mentee')], [self.term_counts(mentor, 'mentor')]
+        )
+        return float(table[0, 0])
+
+
+# Shared by every matching run in the process, so unchanged records are
+# only tokenized once
+TEXT_VECTORIZER = TextVectorizer()
@@ -0,0 +1,119 @@
+"""
+Match Verification for Alumni Mentorship Matching Platform
+Plans approvals and reassignments of saved matches, one or many at a time
+"""
+
+from collections import Counter
+
+from matching_logic import calculate_compatibility_score, parse_max_mentees
+
+
+VERIFY_ACTIONS = ('approve', 'reassign')
+
+
+def reassignment_updates(new_mentor_id, new_mentor, mentee, weights):
+    """
+    Field updates that move a match to another mentor
+
+    The mentor name and score follow the new mentor so a later rematch
+    doesn't treat the reassignment as stale.
+    """
+    updates = {'mentor_id': new_mentor_id, 'status': 'pending'}
+    if new_mentor is not None and mentee is not None:
+        updates['mentor_name'] = new_mentor.get('name', 'Unknown')
+        updates['score'] = calculate_compatibility_score(new_mentor, mentee, weights)
+    return updates
+
+
+def plan_bulk_verification(operations, matches, mentors_by_id, mentees_by_id, weights,
+                           approve_min_score=None):
+    """
+    Validate a batch of approve/reassign operations against the saved matches
+
+    Operations are applied in order to a working copy, so a later operation
+    sees the effect of earlier ones (e.g. approving a pair that was just
+    reassigned). Each match counts against its mentor's max_mentees,
+    whatever its status; a reassignment that would take the new mentor over
+    capacity fails. Failed operations change nothing. Afterwards, with
+    approve_min_score, every pending match scoring at least that much is
+    approved as well.
+
+    Args:
+        operations: List of dicts with mentee_id, mentor_id, action and
+            new_mentor_id (for 'reassign')
+        matches: Saved matches
+        mentors_by_id: Map from mentor ID to record
+        mentees_by_id: Map from mentee ID to record
+        weights: Weights used to score reassigned pairs
+        approve_min_score: Optional score threshold for bulk approval
+
+    Returns:
+        tuple: (changes, results, approved_by_score)
+            changes: List of (mentee_id, mentor_id, updates) keyed by each
+                touched match's saved pair, for storage.update_matches
+            results: One dict per operation with success and error
+            approved_by_score: Number of matches approved by the threshold
+    """
+    # Working copy of the first match for each pair, like storage.update_match
+    by_pair = {}
+    for match in matches:
+        pair = (match.get('mentee_id'), match.get('mentor_id'))
+        by_pair.setdefault(pair, {'pair': pair, 'match': dict(match), 'updates': {}})
+    load = Counter(match.get('mentor_id') for match in matches)
+    touched = {}
+
+    def apply(entry, updates):
+        entry['match'].update(updates)
+        entry['updates'].update(updates)
+        touched[entry['pair']] = entry
+
+    results = []
+    for operation in operations:
+        mentee_id = operation.get('mentee_id')
+        mentor_id = operation.get('mentor_id')
+        action = operation.get('action')
+        result = {'mentee_id': mentee_id, 'mentor_id': mentor_id, 'action': action}
+        results.append(result)
+
+        entry = by_pair.get((mentee_id, mentor_id))
+        error = None
+        if action not in VERIFY_ACTIONS:
+            error = 'Invalid action. Must be "approve" or "reassign"'
+        elif entry is None:
+            error = 'Match not found'
+        elif action == 'approve':
+            apply(entry, {'status': 'verified', 'verified': True})
+        else:
+            new_mentor_id = operation.get('new_mentor_id')
+            new_mentor = mentors_by_id.get(new_mentor_id)
+            if not new_mentor_id:
+                error = 'new_mentor_id required for reassign'
+            elif new_mentor is None:
+                error = 'Mentor not found'
+            elif new_mentor_id != mentor_id and (mentee_id, new_mentor_id) in by_pair:
+                error = 'Mentee is already matched with this mentor'
+            elif new_mentor_id != mentor_id and load[new_mentor_id] >= parse_max_mentees(new_mentor):
+                error = 'Mentor is at capacity'
+            else:
+                apply(entry, reassignment_updates(
+                    new_mentor_id, new_mentor, mentees_by_id.get(mentee_id), weights
+                ))
+                load[mentor_id] -= 1
+                load[new_mentor_id] += 1
+                del by_pair[(mentee_id, mentor_id)]
+                by_pair[(mentee_id, new_mentor_id)] = entry
+
+        result['success'] = error is None
+        if error is not None:
+            result['error'] = error
+
+    approved_by_score = 0
+    if approve_min_score is not None:
+        for entry in by_pair.values():
+            match = entry['match']
+            if match.get('status') != 'verified' and match.get('score', 0) >= approve_min_score:
+                apply(entry, {'status': 'verified', 'verified': True})
+                approved_by_score += 1
+
+    changes = [(pair[0], pair[1], entry['updates']) for pair, entry in touched.items()]
+    return changes, results, approved_by_score
@@ -123,6 +123,8 @@ function MatchingEngine() {
             <li><strong>Discipline (50-60%):</strong> Most important - ensures career/field alignment for meaningful mentorship</li>
             <li><strong>Location (20-30%):</strong> Moderate importance - geographic proximity helps but remote options exist</li>
             <li><strong>Mode (10-20%):</strong> Least critical - meeting format can be flexible (Hybrid works with both)</li>
+            <li><strong>Profile Text (0-30%):</strong> Optional - compares career background and goals written in the form answers</li>
+            <li><strong>Shared Background, Languages, Communities (0-20%):</strong> Optional - first-generation, transfer and military experience, languages other than English, and Alumni Volunteer Communities the mentee has in common with the mentor</li>
           </ul>
           <p style={{ margin: '0.5rem 0 0 0', fontStyle: 'italic', color: '#666' }}>
             Current defaults prioritize discipline alignment, which is ideal for mentorship programs.
@@ -177,6 +179,70 @@ function MatchingEngine() {
               className="slider"
             />
           </div>
+
+          <div className="slider-container">
+            <div className="slider-label">
+              <span>Profile Text Similarity</span>
+              <span>{formatScore(weights.text || 0)}</span>
+            </div>
+            <input
+              type="range"
+              min="0"
+              max="1"
+              step="0.1"
+              value={weights.text || 0}
+              onChange={(e) => handleWeightChange('text', e.target.value)}
+              className="slider"
+            />
+          </div>
+
+          <div className="slider-container">
+            <div className="slider-label">
+              <span>Shared Background (First-Gen, Transfer, Military)</span>
+              <span>{formatScore(weights.background || 0)}</span>
+            </div>
+            <input
+              type="range"
+              min="0"
+              max="1"
+              step="0.1"
+              value={weights.background || 0}
+              onChange={(e) => handleWeightChange('background', e.target.value)}
+              className="slider"
+            />
+          </div>
+
+          <div className="slider-container">
+            <div className="slider-label">
+              <span>Shared Languages</span>
+              <span>{formatScore(weights.language || 0)}</span>
+            </div>
+            <input
+              type="range"
+              min="0"
+              max="1"
+              step="0.1"
+              value={weights.language || 0}
+              onChange={(e) => handleWeightChange('language', e.target.value)}
+              className="slider"
+            />
+          </div>
+
+          <div className="slider-container">
+            <div className="slider-label">
+              <span>Shared Alumni Volunteer Communities</span>
+              <span>{formatScore(weights.community || 0)}</span>
+            </div>
+            <input
+              type="range"
+              min="0"
+              max="1"
+              step="0.1"
+              value={weights.community || 0}
+              onChange={(e) => handleWeightChange('community', e.target.value)}
+              className="slider"
+            />
+          </div>
         </div>
 
         <div className="weight-summary">
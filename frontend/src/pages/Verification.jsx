@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react'
-import { getMatches, verifyMatch, getData } from '../utils/api'
+import { getMatches, verifyMatch, verifyMatches, getData, getSuggestions } from '../utils/api'
 import * as XLSX from 'xlsx'
 import './Verification.css'
 
@@ -10,6 +10,8 @@ function Verification() {
   const [message, setMessage] = useState(null)
   const [reassigning, setReassigning] = useState(null)
   const [newMentorId, setNewMentorId] = useState('')
+  const [suggestions, setSuggestions] = useState([])
+  const [minScore, setMinScore] = useState(80)
 
   useEffect(() => {
     loadData()
@@ -43,6 +45,17 @@ function Verification() {
     }
   }
 
+  const handleApproveAboveScore = async () => {
+    try {
+      const result = await verifyMatches([], minScore / 100)
+      setMessage({ type: 'success', text: `Approved ${result.approved_by_score} matches scoring ${minScore}% or more` })
+      await loadData()
+    } catch (error) {
+      console.error('Error approving matches:', error)
+      setMessage({ type: 'error', text: error.message || 'Failed to approve matches' })
+    }
+  }
+
   const handleReassign = async (menteeId, oldMentorId) => {
     if (!newMentorId) {
       setMessage({ type: 'error', text: 'Please select a new mentor' })
@@ -61,9 +74,17 @@ function Verification() {
     }
   }
 
-  const handleStartReassign = (match) => {
+  const handleStartReassign = async (match) => {
     setReassigning(match.mentee_id)
     setNewMentorId('')
+    setSuggestions([])
+    try {
+      const result = await getSuggestions(match.mentee_id, 5)
+      setSuggestions(result.suggestions || [])
+    } catch (error) {
+      // The full mentor list is still available
+      console.error('Error loading suggestions:', error)
+    }
   }
 
   const handleCancelReassign = () => {
@@ -177,6 +198,26 @@ function Verification() {
         <h2>Pending Verification ({pendingMatches.length})</h2>
         <p>Review and approve or reassign matches before finalizing.</p>
 
+        {pendingMatches.length > 0 && (
+          <div style={{ marginBottom: '1rem' }}>
+            <label style={{ marginRight: '0.5rem' }}>
+              Approve all with score of at least
+              <input
+                type="number"
+                min="0"
+                max="100"
+                value={minScore}
+                onChange={(e) => setMinScore(Number(e.target.value))}
+                style={{ width: '4.5rem', margin: '0 0.25rem 0 0.5rem' }}
+              />
+              %
+            </label>
+            <button className="btn btn-success" onClick={handleApproveAboveScore}>
+              Approve
+            </button>
+          </div>
+        )}
+
         {pendingMatches.length === 0 ? (
           <p className="text-muted">No pending matches to verify.</p>
         ) : (
@@ -210,13 +251,24 @@ function Verification() {
                               style={{ marginRight: '0.5rem', minWidth: '200px' }}
                             >
                               <option value="">Select new mentor...</option>
-                              {mentors
-                                .filter(m => m.id !== match.mentor_id)
-                                .map(mentor => (
-                                  <option key={mentor.id} value={mentor.id}>
-                                    {mentor.name} - {mentor.discipline}
-                                  </option>
-                                ))}
+                              {suggestions.length > 0 && (
+                                <optgroup label="Suggested (has capacity)">
+                                  {suggestions.map(suggestion => (
+                                    <option key={`suggested-${suggestion.mentor_id}`} value={suggestion.mentor_id}>
+                                      {suggestion.mentor_name} - {(suggestion.score * 100).toFixed(1)}% ({suggestion.remaining} of {suggestion.max_mentees} open)
+                                    </option>
+                                  ))}
+                                </optgroup>
+                              )}
+                              <optgroup label="All mentors">
+                                {mentors
+                                  .filter(m => m.id !== match.mentor_id)
+                                  .map(mentor => (
+                                    <option key={mentor.id} value={mentor.id}>
+                                      {mentor.name} - {mentor.discipline}
+                                    </option>
+                                  ))}
+                              </optgroup>
                             </select>
                             <button
                               className="btn btn-success"
@@ -72,6 +72,18 @@ export const uploadData = async (type, data) => {
   }
 }
 
+// Send a raw Google Form CSV export (File or string) to be parsed on the server
+export const uploadCSV = async (type, csv) => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/upload-csv?type=${type}`, csv, {
+      headers: { 'Content-Type': 'text/csv' }
+    })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
 export const updateRecord = async (type, recordId, record) => {
   try {
     const response = await axios.put(`${API_BASE_URL}/update-record`, {
@@ -95,9 +107,66 @@ export const deleteRecord = async (type, recordId) => {
 }
 
 // Matching
-export const runMatching = async (weights) => {
+export const runMatching = async (weights, algorithm = 'greedy') => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/run-matching`, { weights, algorithm })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+export const runMatchingAsync = async (weights, algorithm = 'greedy') => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/run-matching`, { weights, algorithm, async: true })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+export const runWhatIf = async (weightSets, algorithm = 'greedy') => {
   try {
-    const response = await axios.post(`${API_BASE_URL}/run-matching`, { weights })
+    const response = await axios.post(`${API_BASE_URL}/what-if`, { weights: weightSets, algorithm })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+export const rematch = async (weights) => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/rematch`, weights ? { weights } : {})
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+export const getMatchingJob = async (jobId) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/matching-jobs/${jobId}`)
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+// Matching run history
+export const getRuns = async (limit = null) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/runs`, { params: { limit } })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
+export const diffRuns = async (fromId = null, toId = null, limit = null) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/runs/diff`, {
+      params: { from: fromId, to: toId, limit }
+    })
     return handleResponse(response)
   } catch (error) {
     handleError(error)
@@ -113,6 +182,18 @@ export const getMatches = async () => {
   }
 }
 
+// Best mentors with capacity left right now, for reassigning a mentee
+export const getSuggestions = async (menteeId, k = 3) => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/suggestions`, {
+      params: { mentee_id: menteeId, k }
+    })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
 export const verifyMatch = async (menteeId, mentorId, action, newMentorId = null) => {
   try {
     const response = await axios.post(`${API_BASE_URL}/verify-match`, {
@@ -127,6 +208,20 @@ export const verifyMatch = async (menteeId, mentorId, action, newMentorId = null
   }
 }
 
+// Apply many approve/reassign operations, and optionally approve every
+// pending match scoring at least approveMinScore, in one request
+export const verifyMatches = async (operations, approveMinScore = null) => {
+  try {
+    const response = await axios.post(`${API_BASE_URL}/verify-matches`, {
+      operations,
+      approve_min_score: approveMinScore
+    })
+    return handleResponse(response)
+  } catch (error) {
+    handleError(error)
+  }
+}
+
 export const clearMatches = async () => {
   try {
     const response = await axios.post(`${API_BASE_URL}/clear-matches`)